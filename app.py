@@ -4,12 +4,13 @@ Flask backend for the Daily Research Digest application.
 Serves the frontend and provides API endpoints for the digest pipeline.
 """
 
-from flask import Flask, request, jsonify, send_file, send_from_directory, render_template_string
+from flask import Flask, Response, request, jsonify, send_file, send_from_directory, render_template_string, stream_with_context
 from flask_cors import CORS
 import os
 import json
 from datetime import datetime
-from src.pipelines.orchestrator import run_digest_pipeline
+from src.pipelines.orchestrator import get_run, run_digest_pipeline_coalesced, stream_digest_pipeline, PIPELINE_NODES
+from src.pipelines.jobs import JobQueueFull, job_manager_from_env
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
@@ -36,116 +37,270 @@ def script():
     except Exception:
         return "script.js not found", 404
 
+def _digest_response(final_state, query):
+    """Builds the API representation of a finished pipeline run."""
+    from src.pipelines.response import build_digest_response
+    return build_digest_response(final_state, query)
+
+def _digest_view(response):
+    """Applies the request's ?fields=, ?offset= and ?limit= to a digest response."""
+    from src.pipelines.response import digest_view
+    return digest_view(
+        response,
+        fields=request.args.get('fields'),
+        offset=request.args.get('offset', 0, type=int),
+        limit=request.args.get('limit', type=int),
+    )
+
+def _parse_view_args():
+    """Validates the field selection and paging arguments. Returns an error response or None."""
+    offset = request.args.get('offset', 0, type=int)
+    limit = request.args.get('limit', type=int)
+    if offset < 0 or (limit is not None and limit < 1):
+        return jsonify({'error': 'offset must be >= 0 and limit >= 1'}), 400
+    fields = request.args.get('fields')
+    if fields:
+        from src.pipelines.response import parse_fields
+        try:
+            parse_fields(fields)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    return None
+
+def _parse_mode(data):
+    """Reads the incremental-mode options of a request body. Returns (options, error_response)."""
+    options = {'incremental': data.get('incremental', False), 'carry_forward': data.get('carry_forward', True)}
+    for name, value in options.items():
+        if not isinstance(value, bool):
+            return None, (jsonify({'error': f'{name} must be true or false'}), 400)
+    return options, None
+
+def _parse_digest_request():
+    """Validates a digest request body. Returns (query, articles, options, error_response)."""
+    data = request.get_json(silent=True)
+
+    if not data:
+        return None, None, None, (jsonify({'error': 'No data provided'}), 400)
+
+    query = data.get('query', 'AI Trends articles')
+    articles = data.get('articles', 5)
+
+    # Validate inputs
+    if not query or not query.strip():
+        return None, None, None, (jsonify({'error': 'Query is required'}), 400)
+
+    if not isinstance(articles, int) or articles < 1 or articles > 20:
+        return None, None, None, (jsonify({'error': 'Articles must be between 1 and 20'}), 400)
+
+    options, error = _parse_mode(data)
+    return query, articles, options, error
+
+# Pipelines started through the job API run on a bounded worker pool
+job_manager = job_manager_from_env(stream_digest_pipeline, _digest_response, total_steps=len(PIPELINE_NODES))
+
 @app.route('/api/generate-digest', methods=['POST'])
 def generate_digest():
-    """API endpoint to generate a research digest."""
+    """API endpoint to generate a research digest (blocks until the pipeline finishes)."""
     try:
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({'error': 'No data provided'}), 400
-        
-        query = data.get('query', 'AI Trends articles')
-        articles = data.get('articles', 5)
-        
-        # Validate inputs
-        if not query or not query.strip():
-            return jsonify({'error': 'Query is required'}), 400
-        
-        if not isinstance(articles, int) or articles < 1 or articles > 20:
-            return jsonify({'error': 'Articles must be between 1 and 20'}), 400
+        query, articles, options, error = _parse_digest_request()
+        if error:
+            return error
+        error = _parse_view_args()
+        if error:
+            return error
         
         print(f"🌊 Generating digest for query: '{query}' with {articles} articles")
         
-        # Run the digest pipeline
-        final_state = run_digest_pipeline(query, articles)
-        
-        # Handle both DigestState object and dictionary responses
-        if hasattr(final_state, 'query'):
-            # It's a DigestState object
-            response_data = {
-                'query': final_state.query,
-                'articles_count': len(final_state.articles),
-                'articles': [
-                    {
-                        'id': article.id,
-                        'title': article.title,
-                        'url': article.url,
-                        'source': article.source,
-                        'published_date': article.published_date,
-                        'raw_text': article.raw_text[:500] + '...' if article.raw_text and len(article.raw_text) > 500 else article.raw_text
-                    }
-                    for article in final_state.articles
-                ],
-                'summaries': [
-                    {
-                        'article_id': summary.article_id,
-                        'summary': summary.summary,
-                        'sentiment': summary.sentiment,
-                        'sentiment_confidence': summary.sentiment_confidence
-                    }
-                    for summary in final_state.summaries
-                ],
-                'insights': [
-                    {
-                        'article_id': insight.article_id,
-                        'insights': insight.insights,
-                        'categories': insight.categories,
-                        'confidence': insight.confidence
-                    }
-                    for insight in final_state.insights
-                ],
-                'report_path': (final_state.report_path or '').replace('\\','/'),
-                'calendar_event_id': final_state.calendar_event_id,
-                'drive_file_id': final_state.drive_file_id,
-                'generated_at': datetime.now().isoformat()
-            }
-        else:
-            # It's a dictionary (LangGraph response)
-            response_data = {
-                'query': final_state.get('query', query),
-                'articles_count': len(final_state.get('articles', [])),
-                'articles': [
-                    {
-                        'id': article.id,
-                        'title': article.title,
-                        'url': article.url,
-                        'source': article.source,
-                        'published_date': article.published_date,
-                        'raw_text': article.raw_text[:500] + '...' if article.raw_text and len(article.raw_text) > 500 else article.raw_text
-                    }
-                    for article in final_state.get('articles', [])
-                ],
-                'summaries': [
-                    {
-                        'article_id': summary.article_id,
-                        'summary': summary.summary,
-                        'sentiment': summary.sentiment,
-                        'sentiment_confidence': summary.sentiment_confidence
-                    }
-                    for summary in final_state.get('summaries', [])
-                ],
-                'insights': [
-                    {
-                        'article_id': insight.article_id,
-                        'insights': insight.insights,
-                        'categories': insight.categories,
-                        'confidence': insight.confidence
-                    }
-                    for insight in final_state.get('insights', [])
-                ],
-                'report_path': (final_state.get('report_path', '') or '').replace('\\','/'),
-                'calendar_event_id': final_state.get('calendar_event_id', ''),
-                'drive_file_id': final_state.get('drive_file_id', ''),
-                'generated_at': datetime.now().isoformat()
-            }
+        # Run the digest pipeline (identical concurrent requests share one run)
+        final_state = run_digest_pipeline_coalesced(query, articles, **options)
         
-        return jsonify(response_data)
+        return jsonify(_digest_view(_digest_response(final_state, query)))
         
     except Exception as e:
         print(f"❌ Error generating digest: {str(e)}")
         return jsonify({'error': f'Failed to generate digest: {str(e)}'}), 500
 
+@app.route('/api/digest-batch', methods=['POST'])
+def generate_digest_batch():
+    """Queues one digest job per query, sharing downloads, LLM results and dedup; returns the batch id immediately."""
+    data = request.get_json(silent=True) or {}
+    queries = data.get('queries')
+    articles = data.get('articles', 5)
+    # A batch is admitted whole, so it can never need more slots than the job queue has
+    max_queries = min(int(os.getenv('BATCH_MAX_QUERIES', '20')), job_manager.capacity)
+
+    if not isinstance(queries, list) or not queries or not all(isinstance(q, str) and q.strip() for q in queries):
+        return jsonify({'error': 'queries must be a non-empty list of strings'}), 400
+    if len(queries) > max_queries:
+        return jsonify({'error': f'At most {max_queries} queries per batch'}), 400
+    if not isinstance(articles, int) or articles < 1 or articles > 20:
+        return jsonify({'error': 'Articles must be between 1 and 20'}), 400
+    options, error = _parse_mode(data)
+    if error:
+        return error
+
+    batch_id = data.get('batch_id')
+    if batch_id is not None and (not isinstance(batch_id, str) or not batch_id.strip()):
+        return jsonify({'error': 'batch_id must be a non-empty string'}), 400
+
+    try:
+        batch_id, jobs = job_manager.submit_batch(queries, articles, batch_id=batch_id, **options)
+    except JobQueueFull as e:
+        response = jsonify({'error': f'Too many digests in progress, please retry shortly ({e})'})
+        response.headers['Retry-After'] = '30'
+        return response, 429
+
+    print(f"🌊 Queued digest batch {batch_id} with {len(queries)} queries")
+    return jsonify({
+        'batch_id': batch_id,
+        'status_url': f'/api/digest-batches/{batch_id}',
+        'jobs': [{'query': query, 'job_id': job.id, 'status': job.status,
+                  'status_url': f'/api/digest-jobs/{job.id}'} for query, job in jobs],
+    }), 202
+
+@app.route('/api/digest-batches/<batch_id>')
+def get_digest_batch(batch_id):
+    """Returns the status of each of a batch's jobs and the digests of those that completed."""
+    jobs = job_manager.get_batch(batch_id)
+    if jobs is None:
+        return jsonify({'error': 'Batch not found'}), 404
+    error = _parse_view_args()
+    if error:
+        return error
+    results = [{**job.to_dict(result_view=_digest_view), 'query': query} if job
+               else {'query': query, 'status': 'expired'} for query, job in jobs]
+    done = all(result['status'] in ('completed', 'failed', 'expired') for result in results)
+    return jsonify({'batch_id': batch_id, 'status': 'done' if done else 'running', 'results': results})
+
+@app.route('/api/digest-jobs', methods=['POST'])
+def create_digest_job():
+    """Queues a digest pipeline run and returns its job id immediately."""
+    query, articles, options, error = _parse_digest_request()
+    if error:
+        return error
+
+    try:
+        job = job_manager.submit(query, articles, **options)
+    except JobQueueFull as e:
+        response = jsonify({'error': f'Too many digests in progress, please retry shortly ({e})'})
+        response.headers['Retry-After'] = '30'
+        return response, 429
+
+    print(f"🌊 Queued digest job {job.id} for query: '{query}' with {articles} articles")
+    return jsonify({
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': f'/api/digest-jobs/{job.id}',
+        'events_url': f'/api/digest-jobs/{job.id}/events',
+    }), 202
+
+@app.route('/api/digest-jobs/<job_id>/resume', methods=['POST'])
+def resume_digest_job(job_id):
+    """Re-queues a failed or interrupted job; it continues from its last checkpoint."""
+    # Options in the body are only used for runs stored before their options were recorded
+    requested, error = _parse_mode(request.get_json(silent=True) or {})
+    if error:
+        return error
+    job = job_manager.get(job_id)
+    if job:
+        query, articles = job.query, job.max_articles
+        options = {'incremental': job.incremental, 'carry_forward': job.carry_forward}
+    else:
+        # Not in memory (e.g. the server restarted): look the run up in the checkpoint store
+        run = get_run(job_id)
+        if not run:
+            return jsonify({'error': 'Job not found'}), 404
+        query, articles = run['query'], run['max_articles']
+        options = {name: requested[name] if run.get(name) is None else run[name] for name in requested}
+
+    try:
+        job = job_manager.resume(job_id, query, articles, **options)
+    except JobQueueFull as e:
+        response = jsonify({'error': f'Too many digests in progress, please retry shortly ({e})'})
+        response.headers['Retry-After'] = '30'
+        return response, 429
+
+    print(f"⏯️ Resuming digest job {job.id} for query: '{query}'")
+    return jsonify({
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': f'/api/digest-jobs/{job.id}',
+        'events_url': f'/api/digest-jobs/{job.id}/events',
+    }), 202
+
+@app.route('/api/digest-jobs/<job_id>')
+def get_digest_job(job_id):
+    """Returns a job's status, progress and (once completed) its digest."""
+    job = job_manager.get(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    error = _parse_view_args()
+    if error:
+        return error
+    return jsonify(job.to_dict(result_view=_digest_view))
+
+@app.route('/api/digest-jobs/<job_id>/events')
+def digest_job_events(job_id):
+    """Server-Sent Events stream of a job's status and per-node progress."""
+    job = job_manager.get(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+
+    def generate():
+        for event in job_manager.stream_events(job):
+            if event is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+@app.route('/api/drive-uploads/<upload_id>')
+def get_drive_upload(upload_id):
+    """Status of a background Drive upload, with the Drive file id once it is known."""
+    from src.pipelines.uploads import get_upload_queue
+    uploads = get_upload_queue()
+    task = uploads.get(upload_id) if uploads else None
+    if not task:
+        return jsonify({'error': 'Upload not found'}), 404
+    return jsonify(task.to_dict())
+
+@app.route('/api/side-effects')
+def list_side_effects():
+    """Recent Calendar events and Drive uploads recorded in the side-effect outbox (?status=failed etc.)."""
+    from src.pipelines.outbox import get_outbox
+    outbox = get_outbox()
+    if outbox is None:
+        return jsonify({'error': 'Side-effect outbox is disabled'}), 404
+    limit = min(request.args.get('limit', 100, type=int), 1000)
+    return jsonify({'side_effects': outbox.recent(request.args.get('status'), limit), 'counts': outbox.stats()})
+
+@app.route('/api/side-effects/<effect_id>')
+def get_side_effect(effect_id):
+    """Status of a report's background Calendar event or Drive upload, with its result once done."""
+    from src.pipelines.outbox import get_outbox
+    outbox = get_outbox()
+    effect = outbox.get(effect_id) if outbox else None
+    if not effect:
+        return jsonify({'error': 'Side effect not found'}), 404
+    return jsonify(effect)
+
+@app.route('/api/side-effects/<effect_id>/retry', methods=['POST'])
+def retry_side_effect(effect_id):
+    """Queues a failed side effect again."""
+    from src.pipelines.outbox import get_outbox
+    outbox = get_outbox()
+    effect = outbox.get(effect_id) if outbox else None
+    if not effect:
+        return jsonify({'error': 'Side effect not found'}), 404
+    if not outbox.retry(effect_id):
+        return jsonify({'error': f"Only failed side effects can be retried (this one is {effect['status']})"}), 409
+    return jsonify(outbox.get(effect_id)), 202
+
 @app.route('/download-report')
 def download_report():
     """Download the generated PDF report."""
@@ -187,6 +342,34 @@ def download_report():
         print(f"❌ Error downloading report: {str(e)}")
         return jsonify({'error': f'Failed to download report: {str(e)}'}), 500
 
+@app.route('/reports/<report_id>.<fmt>')
+def view_report(report_id, fmt):
+    """Serves a stored report as HTML, JSON, Markdown or PDF, rendering each format once."""
+    from src.utils.report_store import REPORT_FORMATS, get_report_store
+    if fmt not in REPORT_FORMATS or not report_id.isalnum():
+        return jsonify({'error': 'Report not found'}), 404
+    try:
+        path = get_report_store().path(report_id, fmt)
+    except Exception as e:
+        print(f"❌ Error rendering report {report_id}.{fmt}: {str(e)}")
+        return jsonify({'error': f'Failed to render report: {str(e)}'}), 500
+    if path is None:
+        return jsonify({'error': 'Report not found'}), 404
+
+    # Report ids are content hashes, so a given URL never changes and can be cached for good.
+    response = send_file(
+        os.path.abspath(path),
+        mimetype=REPORT_FORMATS[fmt][1],
+        as_attachment=request.args.get('download') == '1',
+        download_name=os.path.basename(path) if fmt != 'json' else f'{report_id}.json',
+        etag=f'{report_id}-{fmt}',
+        conditional=True,
+    )
+    response.cache_control.public = True
+    response.cache_control.max_age = 31536000
+    response.cache_control.immutable = True
+    return response
+
 @app.route('/api/health')
 def health_check():
     """Health check endpoint."""
@@ -196,6 +379,39 @@ def health_check():
         'service': 'Daily Research Digest API'
     })
 
+@app.route('/api/cache/stats')
+def cache_stats():
+    """Hit/miss counters for the persistent LLM and page caches."""
+    from src.utils.llm_cache import get_llm_cache
+    from src.utils.page_cache import get_page_cache
+    from src.utils.llm_gateway import get_llm_gateway
+    from src.utils.report_store import get_report_store
+    from src.utils.query_history import get_query_history
+    stats = {}
+    for name, cache in (('llm_cache', get_llm_cache()), ('page_cache', get_page_cache()),
+                        ('query_history', get_query_history())):
+        stats[name] = {'enabled': True, **cache.stats()} if cache is not None else {'enabled': False}
+    stats['llm_gateway'] = get_llm_gateway().stats()
+    stats['report_store'] = get_report_store().stats()
+    return jsonify(stats)
+
+@app.route('/api/metrics')
+def metrics():
+    """Prometheus-format timing, token and cache metrics for this process."""
+    from src.utils.llm_cache import get_llm_cache
+    from src.utils.page_cache import get_page_cache
+    from src.utils.llm_gateway import get_llm_gateway
+    from src.utils.metrics import registry
+    gauges = {}
+    for name, cache in (('llm_cache', get_llm_cache()), ('page_cache', get_page_cache())):
+        if cache is not None:
+            for key, value in cache.stats().items():
+                gauges[f'digest_{name}_{key}'] = value
+    for key, value in get_llm_gateway().stats().items():
+        gauges[f'digest_llm_gateway_{key}'] = value
+    gauges['digest_jobs_pending'] = job_manager.pending_count()
+    return Response(registry.render_prometheus(gauges), mimetype='text/plain; version=0.0.4')
+
 @app.errorhandler(404)
 def not_found(error):
     """Handle 404 errors."""
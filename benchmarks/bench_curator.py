@@ -0,0 +1,68 @@
+# benchmarks/bench_curator.py
+"""Sequential vs. concurrent CuratorAgent.fetch_articles against a local stub server.
+
+Usage:
+    python -m benchmarks.bench_curator [--latency 0.2] [--workers 8] [--sizes 5 20 100]
+"""
+import argparse
+import contextlib
+import os
+import time
+
+from benchmarks.fakes import news_results_for
+from benchmarks.stub_server import StubArticleServer
+from src.agents.curator import CuratorAgent
+
+
+class StubCuratorAgent(CuratorAgent):
+    """CuratorAgent whose SerpAPI search returns canned results pointing at the stub server."""
+
+    def __init__(self, news_items, **kwargs):
+        super().__init__(**kwargs)
+        self.api_key = "benchmark"
+        self._news_items = news_items
+
+    def _search(self, query):
+        return self._news_items
+
+
+def _time_fetch(agent: CuratorAgent, count: int) -> float:
+    start = time.perf_counter()
+    articles = agent.fetch_articles("benchmark", max_articles=count)
+    elapsed = time.perf_counter() - start
+    assert len(articles) == count, f"expected {count} articles, got {len(articles)}"
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.2, help="stub server latency per request (s)")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 20, 100])
+    args = parser.parse_args()
+    # Every run should hit the network, not the on-disk page cache.
+    os.environ["PAGE_CACHE_ENABLED"] = "0"
+
+    rows = []
+    with StubArticleServer(latency=args.latency) as server:
+        for size in args.sizes:
+            items = news_results_for(server, size)
+            sequential = StubCuratorAgent(items, max_workers=1, timeout_budget=3600)
+            concurrent = StubCuratorAgent(
+                items, max_workers=args.workers, per_host_limit=args.workers, timeout_budget=3600
+            )
+            # Silence per-article logging while timing.
+            with open(os.devnull, "w") as devnull:
+                with contextlib.redirect_stdout(devnull):
+                    seq = _time_fetch(sequential, size)
+                    con = _time_fetch(concurrent, size)
+            rows.append((size, seq, con))
+
+    print(f"latency={args.latency}s workers={args.workers}")
+    print(f"{'urls':>6} {'sequential(s)':>14} {'concurrent(s)':>14} {'speedup':>8}")
+    for size, seq, con in rows:
+        print(f"{size:>6} {seq:>14.2f} {con:>14.2f} {seq / con:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
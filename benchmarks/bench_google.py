@@ -0,0 +1,108 @@
+# benchmarks/bench_google.py
+"""Per-report cost of the Calendar + Drive calls: building clients per call vs the shared clients.
+
+Each report creates one calendar event and uploads one small PDF to a local Google API
+stand-in. "per call" reproduces the agents' former setup (read token.json, build the
+service and a new HTTP connection for every call); "shared" goes through the agents,
+which reuse the credentials, services and connections of src.utils.google_clients.
+
+Usage:
+    python -m benchmarks.bench_google [--reports 50] [--threads 1 4] [--latency 0.0]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.harness import percentile, quiet
+from benchmarks.stub_server import StubGoogleAPI
+
+
+def write_token(
+    path: str, token: str = "benchmark", token_uri: str = "https://oauth2.googleapis.com/token", expires_in: float = 3600
+) -> None:
+    """An authorized-user token; the default stays valid for the whole benchmark (no refresh calls)."""
+    from src.utils.google_clients import SCOPES
+    expiry = datetime.now(timezone.utc) + timedelta(seconds=expires_in)
+    with open(path, "w") as f:
+        json.dump({
+            "token": token, "refresh_token": "benchmark", "client_id": "benchmark",
+            "client_secret": "benchmark", "token_uri": token_uri,
+            "scopes": SCOPES, "expiry": expiry.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+        }, f)
+
+
+def _build(api: str, version: str, root_url: str, creds):
+    # What discovery.build() does with the bundled documents, but with rootUrl pointed at the stand-in
+    from googleapiclient.discovery import build_from_document
+    from googleapiclient.discovery_cache import get_static_doc
+    document = json.loads(get_static_doc(api, version))
+    document["rootUrl"] = f"{root_url}/"
+    return build_from_document(document, credentials=creds)
+
+
+def per_call_report(root_url: str, token_path: str, pdf_path: str) -> None:
+    from google.oauth2.credentials import Credentials
+    from googleapiclient.http import MediaFileUpload
+    from src.utils.google_clients import SCOPES
+
+    creds = Credentials.from_authorized_user_file(token_path, SCOPES)
+    calendar = _build("calendar", "v3", root_url, creds)
+    calendar.events().insert(calendarId="primary", body={"summary": "bench"}).execute()
+    creds = Credentials.from_authorized_user_file(token_path, SCOPES)
+    drive = _build("drive", "v3", root_url, creds)
+    media = MediaFileUpload(pdf_path, mimetype="application/pdf")
+    drive.files().create(body={"name": "bench.pdf"}, media_body=media, fields="id, webViewLink").execute()
+
+
+def shared_report(pdf_path: str) -> None:
+    from src.pipelines.orchestrator import get_agent
+    get_agent("calendar").create_report_event(report_name="bench", generation_time=datetime.now())
+    get_agent("drive").upload_report(pdf_path)
+
+
+def run(label: str, fn, reports: int, threads: int, api: StubGoogleAPI) -> None:
+    requests_before, connections_before = api.requests, api.connections
+    timings = []
+
+    def one(_):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with quiet(), ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(one, range(reports)))
+    wall = time.perf_counter() - start
+    print(f"{label:<10} {threads:>7} {percentile(timings, 50) * 1e3:>8.1f} {percentile(timings, 95) * 1e3:>8.1f} "
+          f"{reports / wall:>10.1f} {api.requests - requests_before:>9} {api.connections - connections_before:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=50)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--latency", type=float, default=0.0, help="stand-in API latency per request (s)")
+    args = parser.parse_args()
+
+    with StubGoogleAPI(latency=args.latency) as api, tempfile.TemporaryDirectory() as scratch:
+        token_path = os.path.join(scratch, "token.json")
+        pdf_path = os.path.join(scratch, "report.pdf")
+        write_token(token_path)
+        with open(pdf_path, "wb") as f:
+            f.write(b"%PDF-1.4\n" + b"0" * 20_000)
+        os.environ["GOOGLE_API_ROOT_URL"] = api.base_url
+        os.environ["GOOGLE_TOKEN_PATH"] = token_path
+
+        print(f"{'mode':<10} {'threads':>7} {'p50(ms)':>8} {'p95(ms)':>8} {'reports/s':>10} "
+              f"{'requests':>9} {'connections':>12}")
+        for threads in args.threads:
+            run("per call", lambda: per_call_report(api.base_url, token_path, pdf_path), args.reports, threads, api)
+            run("shared", lambda: shared_report(pdf_path), args.reports, threads, api)
+
+
+if __name__ == "__main__":
+    main()
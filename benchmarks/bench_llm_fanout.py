@@ -0,0 +1,98 @@
+# benchmarks/bench_llm_fanout.py
+"""Shows the insights and summarizer nodes overlapping in the LangGraph workflow.
+
+Runs the real compiled graph with a fake curator and a FakeChatModel that sleeps
+``--latency`` seconds per call, then reports when each branch was busy. Insights are
+always produced by the insight node here, even with SUMMARIZER_COMBINED_INSIGHTS=1,
+since that mode folds them into the summarizer and leaves nothing to overlap.
+Stores go to a temp directory (see benchmarks.harness.offline_environment).
+
+Usage:
+    python -m benchmarks.bench_llm_fanout [--articles 10] [--latency 0.2] [--workers 4]
+"""
+import argparse
+import threading
+import time
+
+from benchmarks.fakes import FakeChatModel
+from benchmarks.harness import offline_environment, quiet
+
+
+class _Intervals:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.spans = {}
+
+    def record(self, name, start, end):
+        with self.lock:
+            first, last = self.spans.get(name, (start, end))
+            self.spans[name] = (min(first, start), max(last, end))
+
+
+def _timed(intervals, name, fn):
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            intervals.record(name, start, time.perf_counter())
+    return wrapper
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    # Measure real (fake) LLM calls, not cache hits, and keep blobs, reports and checkpoints out of data/.
+    offline_environment()
+    from src.agents.insight_agent import InsightAgent
+    from src.agents.summarizer import SummarizerAgent
+    from src.models import Article
+    from src.pipelines import orchestrator
+
+    articles = [
+        Article(title=f"Article {i}", url=f"https://example.com/{i}", source="Bench",
+                raw_text="Researchers announced new results today. " * 20)
+        for i in range(args.articles)
+    ]
+    llm = FakeChatModel(latency=args.latency)
+    intervals = _Intervals()
+
+    summarizer = SummarizerAgent(llm=llm)
+    # The benchmark is about the two branches overlapping, so the insight node does its own calls.
+    summarizer.combined_insights = False
+    insight = InsightAgent(llm=llm)
+    summarizer.summarize = _timed(intervals, "summarizer", summarizer.summarize)
+    summarizer.summarize_combined = _timed(intervals, "summarizer", summarizer.summarize_combined)
+    insight.analyze = _timed(intervals, "insights", insight.analyze)
+
+    orchestrator.set_agent("summarizer", summarizer)
+    orchestrator.set_agent("insight", insight)
+    orchestrator.get_agent("curator").fetch_articles = lambda query, max_articles=5, **kwargs: articles[:max_articles]
+    # Calendar and Drive need OAuth; stub them like benchmarks.harness.offline_pipeline does.
+    orchestrator.get_agent("calendar").create_report_event = lambda **kwargs: "benchmark-event"
+    orchestrator.get_agent("drive").upload_report = lambda *args, **kwargs: "benchmark-file"
+
+    with quiet():
+        start = time.perf_counter()
+        orchestrator.run_digest_pipeline("benchmark", args.articles, llm_workers=args.workers)
+        wall = time.perf_counter() - start
+
+    (s_start, s_end), (i_start, i_end) = intervals.spans["summarizer"], intervals.spans["insights"]
+    overlap = max(0.0, min(s_end, i_end) - max(s_start, i_start))
+    # One call per summary in combined mode (two when separate) plus one per insight, one article at a time.
+    calls_per_article = (1 if summarizer.mode == "combined" else 2) + 1
+    serial_estimate = args.articles * calls_per_article * args.latency
+    print(f"articles={args.articles} latency={args.latency}s workers={args.workers} llm_calls={llm.calls}")
+    print(f"summarizer busy {s_start - start:6.2f}s -> {s_end - start:6.2f}s")
+    print(f"insights   busy {i_start - start:6.2f}s -> {i_end - start:6.2f}s")
+    print(f"branch overlap  {overlap:6.2f}s")
+    print(f"pipeline wall   {wall:6.2f}s (serial estimate {serial_estimate:.2f}s)")
+    if overlap <= 0:
+        raise SystemExit("insights and summarizer branches did not overlap")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# benchmarks/bench_pdf.py
+"""PDF report render time and peak RSS at 10/100/1000 articles.
+
+Each size renders in a fresh interpreter so its peak RSS isn't inflated by earlier
+runs. Articles come from a generator, as a streaming caller would supply them.
+``--concurrent N`` also renders N reports at once from threads, in-process
+versus the PDF worker pool (PDF_RENDER_PROCESSES).
+
+Usage:
+    python -m benchmarks.bench_pdf [--sizes 10 100 1000] [--repeats 3] [--concurrent 4]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.harness import percentile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _inputs(count: int):
+    from src.models import Article, ArticleInsight, ArticleSummary
+
+    def articles():
+        for i in range(count):
+            yield Article(id=f"a{i}", title=f"Article {i}: researchers announce new results",
+                          url=f"https://example.com/{i}", source="Bench", published_date="today",
+                          raw_text="Researchers announced new results today. " * 200)
+
+    summaries = [ArticleSummary(article_id=f"a{i}", sentiment="neutral", sentiment_confidence="high",
+                                summary="Researchers announced new results that could change the industry. " * 3)
+                 for i in range(count)]
+    insights = [ArticleInsight(article_id=f"a{i}", insights=["Watch the follow-up work.", "Budget for adoption."])
+                for i in range(count)]
+    return articles, summaries, insights
+
+
+def _max_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+def child(count: int, repeats: int) -> None:
+    """Runs in a fresh interpreter: renders `count` articles `repeats` times and prints JSON stats."""
+    from src.utils.pdf_generator import generate_daily_report
+
+    articles, summaries, insights = _inputs(count)
+    baseline = _max_rss_mb()
+    timings = []
+    with tempfile.TemporaryDirectory() as out:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            generate_daily_report(articles(), summaries, insights, output_dir=out)
+            timings.append(time.perf_counter() - start)
+    print(json.dumps({"timings": timings, "peak_rss_mb": _max_rss_mb(), "rss_growth_mb": _max_rss_mb() - baseline}))
+
+
+def concurrent_renders(reports: int, count: int) -> None:
+    from src.utils import pdf_generator
+
+    articles, summaries, insights = _inputs(count)
+    with tempfile.TemporaryDirectory() as out:
+        for mode, processes in (("in-process", "0"), ("worker pool", os.getenv("PDF_RENDER_PROCESSES", "2"))):
+            os.environ["PDF_RENDER_PROCESSES"] = processes
+
+            def render_all():
+                with ThreadPoolExecutor(max_workers=reports) as pool:
+                    list(pool.map(lambda n: pdf_generator.render_daily_report(
+                        list(articles()), summaries, insights, out, f"Report {n}"), range(reports)))
+
+            render_all()  # warm up (spawns the pool's workers)
+            start = time.perf_counter()
+            render_all()
+            print(f"{reports} x {count}-article reports, {mode:<11} {time.perf_counter() - start:8.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--concurrent", type=int, default=0, help="also render this many reports at once")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        child(args.child, args.repeats)
+        return
+
+    print(f"{'articles':>8} {'p50(s)':>8} {'p95(s)':>8} {'peak RSS MB':>12} {'RSS growth MB':>14}")
+    for size in args.sizes:
+        out = subprocess.run([sys.executable, "-m", "benchmarks.bench_pdf", "--child", str(size),
+                              "--repeats", str(args.repeats)], cwd=ROOT, check=True,
+                             capture_output=True, text=True).stdout
+        stats = json.loads(out.strip().splitlines()[-1])
+        timings = stats["timings"]
+        print(f"{size:>8} {percentile(timings, 50):>8.3f} {percentile(timings, 95):>8.3f} "
+              f"{stats['peak_rss_mb']:>12.1f} {stats['rss_growth_mb']:>14.1f}")
+
+    if args.concurrent:
+        print()
+        concurrent_renders(args.concurrent, max(args.sizes))
+
+
+if __name__ == "__main__":
+    main()
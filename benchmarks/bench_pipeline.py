@@ -0,0 +1,45 @@
+# benchmarks/bench_pipeline.py
+"""End-to-end run_digest_pipeline benchmark against local stand-ins.
+
+SerpAPI, the article sites and the Groq model are replaced by a canned search, a
+local HTTP server and FakeChatModel; Calendar and Drive calls are no-ops. Reports
+p50/p95 latency, throughput (articles/s) and peak memory per digest size.
+
+Usage:
+    python -m benchmarks.bench_pipeline [--sizes 5 20 100] [--repeats 5] [--llm-latency 0.1]
+        [--page-latency 0.05] [--html-dir recorded/] [--json out.json] [--baseline old.json]
+"""
+import argparse
+
+from benchmarks.harness import add_common_arguments, finish, measure, offline_pipeline, print_table, quiet
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_common_arguments(parser)
+    args = parser.parse_args()
+
+    rows = []
+    with offline_pipeline(args.llm_latency, args.tokens_per_second, args.page_latency,
+                          args.html_dir, args.curator_workers) as bench:
+        from src.pipelines.orchestrator import run_digest_pipeline
+
+        for size in args.sizes:
+            bench["set_results"](size)
+
+            def run():
+                final_state = run_digest_pipeline("benchmark", size, llm_workers=args.llm_workers)
+                if len(final_state["summaries"]) != size:
+                    raise SystemExit(f"expected {size} summaries, got {len(final_state['summaries'])}")
+
+            with quiet():
+                rows.append(measure(run, args.repeats, size, memory=not args.no_memory))
+
+    print(f"llm_latency={args.llm_latency}s page_latency={args.page_latency}s "
+          f"curator_workers={args.curator_workers} llm_workers={args.llm_workers}")
+    print_table("full pipeline", rows)
+    finish(args, {"pipeline": rows})
+
+
+if __name__ == "__main__":
+    main()
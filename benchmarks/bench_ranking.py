@@ -0,0 +1,56 @@
+# benchmarks/bench_ranking.py
+"""Times the BM25 relevance ranker on synthetic candidates.
+
+Covers both passes the curator makes: ordering SerpAPI candidates by title + snippet,
+and selecting the top articles by title + full parsed text.
+
+Usage:
+    python -m benchmarks.bench_ranking [--sizes 100 300 1000] [--words 800] [--repeats 20]
+"""
+import argparse
+import random
+import time
+
+from benchmarks.harness import percentile
+from benchmarks.stub_server import WORDS
+from src.models import Article
+from src.utils.ranking import RelevanceRanker
+
+QUERY = "battery energy startup funding"
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _time(fn, repeats: int):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return percentile(timings, 50), percentile(timings, 95)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 300, 1000])
+    parser.add_argument("--words", type=int, default=800, help="words of parsed text per article")
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    ranker = RelevanceRanker()
+    rng = random.Random(0)
+    print(f"query={QUERY!r} words/article={args.words}")
+    print(f"{'items':>6} {'candidates p50/p95 (ms)':>24} {'articles p50/p95 (ms)':>22}")
+    for size in args.sizes:
+        candidates = [{"title": _text(rng, 10), "item": {"snippet": _text(rng, 30)}} for _ in range(size)]
+        articles = [Article(title=_text(rng, 10), url=f"https://example.com/{i}", source="Bench",
+                            raw_text=_text(rng, args.words)) for i in range(size)]
+        c50, c95 = _time(lambda: ranker.rank_candidates(QUERY, candidates), args.repeats)
+        a50, a95 = _time(lambda: ranker.select(QUERY, articles, 10), args.repeats)
+        print(f"{size:>6} {c50:>12.2f} / {c95:<9.2f} {a50:>10.2f} / {a95:<9.2f}")
+
+
+if __name__ == "__main__":
+    main()
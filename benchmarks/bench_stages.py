@@ -0,0 +1,55 @@
+# benchmarks/bench_stages.py
+"""Benchmarks the curator, summarizer, insights and PDF stages on their own.
+
+Each stage runs its LangGraph node function against the same local stand-ins as
+bench_pipeline; the LLM and PDF stages start from articles fetched once up front.
+
+Usage:
+    python -m benchmarks.bench_stages [--stages curator summarizer insights pdf] [--sizes 5 20 100]
+"""
+import argparse
+
+from benchmarks.harness import add_common_arguments, finish, measure, offline_pipeline, print_table, quiet
+
+STAGES = ["curator", "summarizer", "insights", "pdf"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_common_arguments(parser)
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    args = parser.parse_args()
+
+    results = {stage: [] for stage in args.stages}
+    with offline_pipeline(args.llm_latency, args.tokens_per_second, args.page_latency,
+                          args.html_dir, args.curator_workers) as bench:
+        from src.models import DigestState
+        from src.pipelines import orchestrator
+
+        for size in args.sizes:
+            bench["set_results"](size)
+            state = DigestState(query="benchmark", max_articles=size, llm_workers=args.llm_workers)
+            with quiet():
+                state.articles = orchestrator.curator_node(state)["articles"]
+                state.summaries = orchestrator.summarizer_node(state)["summaries"]
+                state.insights = orchestrator.insights_node(state).get("insights", [])
+
+            runners = {
+                "curator": lambda: orchestrator.curator_node(state),
+                "summarizer": lambda: orchestrator.summarizer_node(state),
+                "insights": lambda: orchestrator.insights_node(state),
+                "pdf": lambda: orchestrator.report_node(state),
+            }
+            for stage in args.stages:
+                with quiet():
+                    results[stage].append(measure(runners[stage], args.repeats, size, memory=not args.no_memory))
+
+    print(f"llm_latency={args.llm_latency}s page_latency={args.page_latency}s "
+          f"curator_workers={args.curator_workers} llm_workers={args.llm_workers}")
+    for stage in args.stages:
+        print_table(stage, results[stage])
+    finish(args, results)
+
+
+if __name__ == "__main__":
+    main()
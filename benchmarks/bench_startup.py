@@ -0,0 +1,110 @@
+# benchmarks/bench_startup.py
+"""Cold-start benchmark: `python -c "import app"` and time to the first /api/health response.
+
+Every sample is a fresh interpreter, so it includes module imports and app setup.
+Also lists which heavy libraries are already imported once app.py has loaded.
+
+Usage:
+    python -m benchmarks.bench_startup [--repeats 5] [--json out.json] [--baseline old.json]
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+from benchmarks.harness import compare_to_baseline, percentile, write_results
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ["langchain", "langchain_core", "langgraph", "langchain_groq", "newspaper",
+                 "reportlab", "googleapiclient", "serpapi"]
+
+
+def _env():
+    env = dict(os.environ)
+    env.setdefault("GROQ_API_KEY", "benchmark")
+    env.setdefault("SERPAPI_API_KEY", "benchmark")
+    return env
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_import() -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import app"], cwd=ROOT, env=_env(), check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def time_first_health(timeout: float = 60.0) -> float:
+    port = _free_port()
+    code = f"import app; app.app.run(host='127.0.0.1', port={port}, threaded=True)"
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-c", code], cwd=ROOT, env=_env(),
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/health", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise SystemExit(f"/api/health did not answer within {timeout:.0f}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def heavy_modules_loaded():
+    code = ("import json, sys, app; "
+            f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=_env(), check=True,
+                         capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def _row(name, timings):
+    return {"items": 1, "runs": len(timings), "p50_s": round(percentile(timings, 50), 4),
+            "p95_s": round(percentile(timings, 95), 4), "name": name}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--json", dest="json_path", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="JSON results of a previous run to compare p95 against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 regression vs baseline")
+    args = parser.parse_args()
+
+    imports = [time_import() for _ in range(args.repeats)]
+    health = [time_first_health() for _ in range(args.repeats)]
+    loaded = heavy_modules_loaded()
+
+    print(f"{'measurement':<24} {'p50(s)':>8} {'p95(s)':>8}")
+    print(f"{'import app':<24} {percentile(imports, 50):>8.3f} {percentile(imports, 95):>8.3f}")
+    print(f"{'first /api/health':<24} {percentile(health, 50):>8.3f} {percentile(health, 95):>8.3f}")
+    print(f"heavy modules loaded by import app: {', '.join(loaded) or 'none'}")
+
+    results = {"benchmarks": {"import_app": [_row("import_app", imports)],
+                              "first_health": [_row("first_health", health)]},
+               "heavy_modules_loaded": loaded}
+    if args.json_path:
+        write_results(args.json_path, results)
+    if args.baseline:
+        regressions = compare_to_baseline(args.baseline, results, args.tolerance)
+        for message in regressions:
+            print(f"❌ Regression: {message}")
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
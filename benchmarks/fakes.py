@@ -0,0 +1,107 @@
+# benchmarks/fakes.py
+"""Offline stand-ins used by the benchmark scripts."""
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+_CALLS_LOCK = threading.Lock()
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model that answers our prompts with canned output after a configurable delay.
+
+    ``latency`` is a fixed per-call delay in seconds; ``tokens_per_second`` (optional)
+    adds a generation delay proportional to the length of the canned answer.
+    """
+
+    latency: float = 0.1
+    tokens_per_second: Optional[float] = None
+    calls: int = 0
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _answer(self, prompt: str) -> str:
+        lowered = prompt.lower()
+        if '"summary"' in lowered:
+            answer = {
+                "summary": "Researchers announced new results that could change how the industry approaches the problem.",
+                "sentiment": "neutral",
+                "confidence": "high",
+            }
+            if '"insights"' in lowered:
+                answer.update({
+                    "insights": ["Watch the follow-up announcements.", "Budget for adoption costs."],
+                    "categories": ["Technology"],
+                    "insight_confidence": "medium",
+                    "rationale": "Canned benchmark answer.",
+                })
+            return json.dumps(answer)
+        if '"insights"' in lowered or "actionable insights" in lowered:
+            return json.dumps({
+                "insights": ["Watch the follow-up announcements.", "Budget for adoption costs."],
+                "categories": ["Technology"],
+                "confidence": "medium",
+                "rationale": "Canned benchmark answer.",
+            })
+        if "sentiment" in lowered and "json" in lowered:
+            return json.dumps({"sentiment": "neutral", "confidence": "high"})
+        return "Researchers announced new results that could change how the industry approaches the problem."
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        prompt = "\n".join(str(m.content) for m in messages)
+        answer = self._answer(prompt)
+        prompt_tokens = max(1, len(prompt) // 4)
+        completion_tokens = max(1, len(answer) // 4)
+        delay = self.latency
+        if self.tokens_per_second:
+            delay += completion_tokens / self.tokens_per_second
+        time.sleep(delay)
+        with _CALLS_LOCK:
+            self.calls += 1
+        usage = {"input_tokens": prompt_tokens, "output_tokens": completion_tokens,
+                 "total_tokens": prompt_tokens + completion_tokens}
+        message = AIMessage(content=answer, usage_metadata=usage)
+        return ChatResult(
+            generations=[ChatGeneration(message=message)],
+            llm_output={"token_usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                                        "total_tokens": prompt_tokens + completion_tokens}},
+        )
+
+
+
+class FakeGoogleSearch:
+    """Drop-in for ``serpapi.google_search.GoogleSearch`` returning canned ``news_results``.
+
+    Set ``FakeGoogleSearch.news_results`` (e.g. with ``news_results_for``) before use.
+    """
+
+    news_results: List[Dict[str, Any]] = []
+
+    def __init__(self, params: Dict[str, Any]):
+        self.params = params
+
+    def get_dict(self) -> Dict[str, Any]:
+        return {"news_results": list(self.news_results)}
+
+
+def news_results_for(server, count: int) -> List[Dict[str, Any]]:
+    """SerpAPI-shaped news items pointing at ``count`` pages of a StubArticleServer."""
+    return [
+        {"title": f"Stub article {n}", "link": server.url(n), "source": {"name": "Stub"}, "date": "today"}
+        for n in range(count)
+    ]
@@ -0,0 +1,207 @@
+# benchmarks/harness.py
+"""Shared plumbing for the offline pipeline benchmarks: stand-ins, timing and reporting."""
+import argparse
+import contextlib
+import json
+import math
+import os
+import resource
+import statistics
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from benchmarks.fakes import FakeChatModel, FakeGoogleSearch, news_results_for
+from benchmarks.stub_server import StubArticleServer
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile; good enough for the handful of repeats a benchmark runs."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+@contextlib.contextmanager
+def quiet() -> Iterator[None]:
+    """Silences the agents' progress printing while timing."""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def offline_environment() -> None:
+    """Disables the persistent caches and fills in the API keys the agents check for.
+
+    Checkpoints, article blobs, reports and the query history stay on (they are part of a run's
+    cost) but go to a temp directory, never the real data/.
+    """
+    os.environ["LLM_CACHE_ENABLED"] = "0"
+    os.environ["PAGE_CACHE_ENABLED"] = "0"
+    scratch = tempfile.mkdtemp(prefix="digest-bench-")
+    os.environ.setdefault("CHECKPOINT_PATH", os.path.join(scratch, "checkpoints.sqlite"))
+    os.environ.setdefault("BLOB_STORE_PATH", os.path.join(scratch, "blobs"))
+    os.environ.setdefault("QUERY_HISTORY_PATH", os.path.join(scratch, "query_history.sqlite"))
+    os.environ.setdefault("REPORT_STORE_PATH", os.path.join(scratch, "reports"))
+    # Calendar and Drive calls are stubbed out, so make them inline rather than batched in the background.
+    os.environ.setdefault("SIDE_EFFECTS_OUTBOX", "0")
+    os.environ.setdefault("DRIVE_UPLOAD_ASYNC", "0")
+    os.environ.setdefault("CALENDAR_SINK_ENABLED", "0")
+    os.environ.setdefault("SERPAPI_API_KEY", "benchmark")
+    os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+
+def measure(fn: Callable[[], Any], repeats: int, items: int, memory: bool = True) -> Dict[str, float]:
+    """Runs fn ``repeats`` times and reports latency percentiles, throughput and peak memory.
+
+    Latency runs are untraced; peak Python heap is taken from one extra run under
+    tracemalloc so its overhead doesn't skew the timings.
+    """
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    result = {
+        "items": items,
+        "runs": repeats,
+        "p50_s": round(percentile(timings, 50), 4),
+        "p95_s": round(percentile(timings, 95), 4),
+        "mean_s": round(statistics.mean(timings), 4),
+        "throughput_per_s": round(items / statistics.mean(timings), 2) if items else 0.0,
+    }
+    if memory:
+        tracemalloc.start()
+        try:
+            fn()
+            result["peak_mem_mb"] = round(tracemalloc.get_traced_memory()[1] / 1e6, 2)
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def max_rss_mb() -> float:
+    """Peak resident set size of this process so far (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1e6 if os.uname().sysname == "Darwin" else 1e3), 1)
+
+
+@contextlib.contextmanager
+def offline_pipeline(
+    llm_latency: float = 0.1,
+    tokens_per_second: Optional[float] = None,
+    page_latency: float = 0.05,
+    html_dir: Optional[str] = None,
+    curator_workers: int = 8,
+) -> Iterator[Dict[str, Any]]:
+    """Wires the orchestrator to local stand-ins for SerpAPI, article sites, Groq and Google.
+
+    Yields a context dict with the stub ``server``, the shared fake ``llm`` and a
+    ``set_results(count)`` helper that points the fake search at ``count`` stub pages.
+    """
+    offline_environment()
+    from src.agents import curator as curator_module
+    from src.agents.insight_agent import InsightAgent
+    from src.agents.summarizer import SummarizerAgent
+    from src.pipelines import orchestrator
+    from src.utils import report_store
+
+    llm = FakeChatModel(latency=llm_latency, tokens_per_second=tokens_per_second)
+    saved_agents = {name: orchestrator.get_agent(name) for name in ("summarizer", "insight")}
+    saved_search = curator_module.GoogleSearch
+    curator = orchestrator.get_agent("curator")
+    saved_curator = (curator.api_key, curator.max_workers, curator.per_host_limit, curator.timeout_budget)
+    saved_store = report_store._shared_store
+    calendar, drive = orchestrator.get_agent("calendar"), orchestrator.get_agent("drive")
+
+    with StubArticleServer(latency=page_latency, html_dir=html_dir) as server, \
+            tempfile.TemporaryDirectory(prefix="digest-bench-") as report_dir:
+        curator_module.GoogleSearch = FakeGoogleSearch
+        curator.api_key = "benchmark"
+        # Every stub page lives on one host, so lift the per-host cap to the worker count.
+        curator.max_workers = curator.per_host_limit = curator_workers
+        curator.timeout_budget = 3600
+        orchestrator.set_agent("summarizer", SummarizerAgent(llm=llm))
+        orchestrator.set_agent("insight", InsightAgent(llm=llm))
+        report_store._shared_store = report_store.ReportStore(root=report_dir)
+        # Calendar and Drive need OAuth; the benchmark measures everything up to them.
+        calendar.create_report_event = lambda **kwargs: "benchmark-event"
+        drive.upload_report = lambda *args, **kwargs: "benchmark-file"
+
+        def set_results(count: int) -> None:
+            FakeGoogleSearch.news_results = news_results_for(server, count)
+
+        try:
+            yield {"server": server, "llm": llm, "set_results": set_results, "report_dir": report_dir}
+        finally:
+            curator_module.GoogleSearch = saved_search
+            curator.api_key, curator.max_workers, curator.per_host_limit, curator.timeout_budget = saved_curator
+            for name, agent in saved_agents.items():
+                orchestrator.set_agent(name, agent)
+            report_store._shared_store = saved_store
+            del calendar.create_report_event
+            del drive.upload_report
+
+
+def print_table(title: str, rows: List[Dict[str, Any]]) -> None:
+    print(f"\n{title}")
+    print(f"{'items':>6} {'p50(s)':>8} {'p95(s)':>8} {'items/s':>9} {'peak MB':>8}")
+    for row in rows:
+        print(f"{row['items']:>6} {row['p50_s']:>8.3f} {row['p95_s']:>8.3f} "
+              f"{row['throughput_per_s']:>9.1f} {row.get('peak_mem_mb', float('nan')):>8.1f}")
+
+
+def write_results(path: str, results: Dict[str, Any]) -> None:
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print(f"\n📝 Results written to {path}")
+
+
+def compare_to_baseline(path: str, results: Dict[str, Dict[str, List[Dict[str, Any]]]], tolerance: float) -> List[str]:
+    """Returns a message for every (benchmark, size) whose p95 regressed by more than ``tolerance``."""
+    with open(path) as f:
+        baseline = json.load(f)
+    regressions = []
+    for name, rows in results.get("benchmarks", {}).items():
+        previous = {row["items"]: row for row in baseline.get("benchmarks", {}).get(name, [])}
+        for row in rows:
+            before = previous.get(row["items"])
+            if before and row["p95_s"] > before["p95_s"] * (1 + tolerance):
+                regressions.append(
+                    f"{name} @ {row['items']} items: p95 {before['p95_s']:.3f}s -> {row['p95_s']:.3f}s"
+                )
+    return regressions
+
+
+def add_common_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 20, 100], help="articles per digest")
+    parser.add_argument("--repeats", type=int, default=5, help="timed runs per size")
+    parser.add_argument("--llm-latency", type=float, default=0.1, help="fake LLM latency per call (s)")
+    parser.add_argument("--tokens-per-second", type=float, default=None, help="fake LLM generation speed")
+    parser.add_argument("--page-latency", type=float, default=0.05, help="stub article server latency (s)")
+    parser.add_argument("--html-dir", default=None, help="directory of recorded article *.html to serve")
+    parser.add_argument("--curator-workers", type=int, default=8)
+    parser.add_argument("--llm-workers", type=int, default=4)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak-memory run")
+    parser.add_argument("--json", dest="json_path", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="JSON results of a previous run to compare p95 against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 regression vs baseline")
+
+
+def finish(args: argparse.Namespace, benchmarks: Dict[str, List[Dict[str, Any]]]) -> None:
+    """Prints the max RSS, writes --json and fails the process on --baseline regressions."""
+    results = {
+        "benchmarks": benchmarks,
+        "max_rss_mb": max_rss_mb(),
+        "settings": {k: v for k, v in vars(args).items() if k not in ("json_path", "baseline")},
+    }
+    print(f"\nmax RSS {results['max_rss_mb']} MB")
+    if args.json_path:
+        write_results(args.json_path, results)
+    if args.baseline:
+        regressions = compare_to_baseline(args.baseline, results, args.tolerance)
+        for message in regressions:
+            print(f"❌ Regression: {message}")
+        if regressions:
+            raise SystemExit(1)
+        print(f"✅ No p95 regressions beyond {args.tolerance:.0%} of {args.baseline}")
@@ -0,0 +1,291 @@
+# benchmarks/stub_server.py
+"""Local HTTP servers: fake article pages with configurable latency, and a Google API stand-in."""
+import glob
+import json
+import os
+import random
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+ARTICLE_HTML = """<html>
+<head><title>Stub article {n}</title></head>
+<body>
+<article>
+<h1>Stub article {n}</h1>
+{paragraphs}
+</article>
+</body>
+</html>"""
+
+PARAGRAPH = (
+    "<p>Paragraph {i} of stub article {n}. Researchers announced new results today that "
+    "could change how the industry approaches the problem, according to people familiar "
+    "with the matter, and analysts expect follow-up work over the coming months.</p>"
+)
+
+
+WORDS = (
+    "market policy research model data chip energy climate vaccine court election startup funding "
+    "satellite battery robot network privacy tariff merger earnings launch study trial regulator"
+).split()
+
+
+def render_article(n: int, paragraphs: int = 8) -> str:
+    # Article-specific wording keeps generated pages distinct for near-duplicate detection.
+    rng = random.Random(n)
+    body = "\n".join(
+        PARAGRAPH.format(i=i, n=n).replace("</p>", " " + " ".join(rng.choice(WORDS) for _ in range(30)) + ".</p>")
+        for i in range(paragraphs)
+    )
+    return ARTICLE_HTML.format(n=n, paragraphs=body)
+
+
+class StubArticleServer:
+    """Serves ``/article/<n>`` pages after sleeping ``latency`` seconds per request.
+
+    Pages are generated from a template unless ``html_dir`` points at recorded
+    article HTML (``*.html``), in which case page n is file ``n % len(files)``.
+    """
+
+    def __init__(self, latency: float = 0.2, paragraphs: int = 8, html_dir: Optional[str] = None):
+        self.latency = latency
+        self.paragraphs = paragraphs
+        self.requests = 0
+        self.recorded: List[str] = []
+        if html_dir:
+            for path in sorted(glob.glob(os.path.join(html_dir, "*.html"))):
+                with open(path, encoding="utf-8", errors="replace") as f:
+                    self.recorded.append(f.read())
+            if not self.recorded:
+                raise FileNotFoundError(f"No recorded *.html pages found in {html_dir}")
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                time.sleep(server.latency)
+                try:
+                    n = int(self.path.rstrip("/").rsplit("/", 1)[-1])
+                except ValueError:
+                    self.send_error(404)
+                    return
+                body = server.page(n).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def page(self, n: int) -> str:
+        if self.recorded:
+            return self.recorded[n % len(self.recorded)]
+        return render_article(n, self.paragraphs)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, n: int) -> str:
+        return f"{self.base_url}/article/{n}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class StubGoogleAPI:
+    """Stand-in for the Calendar and Drive APIs (point GOOGLE_API_ROOT_URL at ``base_url``).
+
+    Supports event inserts (409 for a taken id), reads and patches, simple and resumable (chunked) file uploads, and multipart
+    batch requests. ``fail_chunks`` makes that many upload chunks fail with a 503 first.
+    ``token_uri`` is an OAuth token endpoint that grants a new access token per refresh.
+    Counts requests (a batch is one) and TCP connections, so connection reuse shows up as
+    connections < requests; ``files`` maps file ids to the bytes uploaded into them.
+    """
+
+    def __init__(self, latency: float = 0.0, fail_chunks: int = 0):
+        self.latency = latency
+        self.fail_chunks = fail_chunks
+        self.requests = 0
+        self.batches = 0
+        self.token_refreshes = 0
+        self.connections = 0
+        self.created: List[str] = []
+        self.files: Dict[str, bytes] = {}
+        self.events: Dict[str, Dict[str, Any]] = {}
+        self._sessions: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+
+            def setup(self):
+                super().setup()
+                # Headers and body are separate writes; without this, Nagle + delayed ACKs stall reused connections.
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                with server._lock:
+                    server.connections += 1
+
+            def _serve(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                time.sleep(server.latency)
+                with server._lock:
+                    server.requests += 1
+                status, headers, data = server.handle(self.command, self.path, dict(self.headers), body)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PUT = do_PATCH = _serve
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def handle(self, method: str, url: str, headers: Dict[str, str], body: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        path, _, query = url.partition("?")
+        headers = {k.lower(): v for k, v in headers.items()}
+        if method == "POST" and path == "/token":
+            with self._lock:
+                self.token_refreshes += 1
+                token = f"stub-token-{self.token_refreshes}"
+            return self._json({"access_token": token, "expires_in": 3600, "token_type": "Bearer"})
+        if method == "POST" and path.startswith("/batch/"):
+            return self._batch(headers, body)
+        if path.startswith("/calendar/v3/calendars/"):
+            return self._event(method, path, json.loads(body or b"{}"))
+        if path == "/drive/v3/files" and method == "POST":
+            return self._json(self._new_file(json.loads(body or b"{}"), b""))
+        if path == "/upload/drive/v3/files" and "uploadType=resumable" in query:
+            return self._open_session(None, body)
+        if path.startswith("/upload/drive/v3/files/") and method == "PATCH":
+            return self._open_session(path.rsplit("/", 1)[-1], body)
+        if path == "/upload/drive/v3/files" and method == "POST":
+            # multipart upload: the content is everything after the metadata part
+            return self._json(self._new_file({}, body))
+        if path.startswith("/upload/session/") and method == "PUT":
+            return self._chunk(path.rsplit("/", 1)[-1], headers, body)
+        return 404, {"Content-Type": "application/json"}, b'{"error": {"code": 404, "message": "not found"}}'
+
+    def _event(self, method: str, path: str, body: Dict[str, Any]) -> Tuple[int, Dict[str, str], bytes]:
+        parts = path.split("/")  # /calendar/v3/calendars/<calendar>/events[/<event id>]
+        with self._lock:
+            if method == "POST" and len(parts) == 6:
+                event_id = body.get("id") or f"stubevent{len(self.created) + 1}"
+                if event_id in self.events:
+                    return self._json({"error": {"code": 409, "message": "The requested identifier already exists."}}, 409)
+                self.created.append(path)
+                self.events[event_id] = {**body, "id": event_id}
+            elif method == "PATCH" and len(parts) == 7 and parts[6] in self.events:
+                event_id = parts[6]
+                self.events[event_id].update(body)
+            elif method == "GET" and len(parts) == 7 and parts[6] in self.events:
+                event_id = parts[6]
+            else:
+                return self._json({"error": {"code": 404, "message": "not found"}}, 404)
+            event = self.events[event_id]
+        return self._json({**event, "htmlLink": f"{self.base_url}/event/{event_id}"})
+
+    def _json(self, body: Dict[str, Any], status: int = 200) -> Tuple[int, Dict[str, str], bytes]:
+        return status, {"Content-Type": "application/json; charset=utf-8"}, json.dumps(body).encode("utf-8")
+
+    def _new_file(self, metadata: Dict[str, Any], content: bytes) -> Dict[str, Any]:
+        with self._lock:
+            self.created.append("/drive/v3/files")
+            file_id = f"stubfile{len(self.created)}"
+            self.files[file_id] = content
+        return {"id": file_id, "name": metadata.get("name"), "webViewLink": f"{self.base_url}/file/{file_id}"}
+
+    def _open_session(self, file_id: Optional[str], body: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        if file_id is None:
+            file_id = self._new_file(json.loads(body or b"{}"), b"")["id"]
+        elif file_id not in self.files:
+            return self._json({"error": {"code": 404, "message": "file not found"}}, 404)
+        with self._lock:
+            session = f"s{len(self._sessions)}"
+            self._sessions[session] = {"file_id": file_id, "data": b""}
+        return 200, {"Location": f"{self.base_url}/upload/session/{session}", "Content-Type": "application/json"}, b""
+
+    def _chunk(self, session_id: str, headers: Dict[str, str], body: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        session = self._sessions.get(session_id)
+        if session is None:
+            return self._json({"error": {"code": 404, "message": "unknown upload session"}}, 404)
+        with self._lock:
+            if body and self.fail_chunks > 0:
+                self.fail_chunks -= 1
+                return self._json({"error": {"code": 503, "message": "backend error"}}, 503)
+            unit, _, spec = headers.get("content-range", "bytes */0").partition(" ")
+            span, _, total = spec.partition("/")
+            if span != "*":
+                start = int(span.split("-")[0])
+                session["data"] = session["data"][:start] + body
+            received = len(session["data"])
+        if total != "*" and received >= int(total):
+            self.files[session["file_id"]] = session["data"]
+            file_id = session["file_id"]
+            return self._json({"id": file_id, "webViewLink": f"{self.base_url}/file/{file_id}"})
+        range_header = {"Range": f"bytes=0-{received - 1}"} if received else {}
+        return 308, range_header, b""
+
+    def _batch(self, headers: Dict[str, str], body: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        from email.parser import BytesParser
+        with self._lock:
+            self.batches += 1
+        message = BytesParser().parsebytes(b"Content-Type: " + headers["content-type"].encode() + b"\r\n\r\n" + body)
+        boundary = "batch_stub_boundary"
+        out = []
+        for part in message.get_payload():
+            request = part.get_payload(decode=False).encode("utf-8")
+            head, _, sub_body = request.replace(b"\r\n", b"\n").partition(b"\n\n")
+            lines = head.decode("utf-8").split("\n")
+            method, url, _ = lines[0].split(" ", 2)
+            sub_headers = dict(line.split(": ", 1) for line in lines[1:] if ": " in line)
+            status, resp_headers, data = self.handle(method, url, sub_headers, sub_body)
+            content_id = " ".join(part["Content-ID"].split()).strip("<>")  # long headers arrive folded
+            out.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\nContent-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} {'OK' if status < 300 else 'Error'}\r\n"
+                + "".join(f"{k}: {v}\r\n" for k, v in resp_headers.items())
+                + f"\r\n{data.decode('utf-8')}\r\n"
+            )
+        payload = ("".join(out) + f"--{boundary}--\r\n").encode("utf-8")
+        return 200, {"Content-Type": f"multipart/mixed; boundary={boundary}"}, payload
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def token_uri(self) -> str:
+        return f"{self.base_url}/token"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -67,7 +67,7 @@ async function handleFormSubmission(e) {
         result.style.display = 'block';
         
         // Display the report
-        displayReport(response);
+        await displayReport(response);
         
     } catch (error) {
         // Show error result
@@ -83,12 +83,14 @@ async function handleFormSubmission(e) {
         submitBtn.disabled = false;
         submitBtn.textContent = '🚀 Generate Digest';
         loading.style.display = 'none';
+        updateProgress('Fetching articles and generating insights...');
     }
 }
 
 async function callBackendAPI(query, articles) {
     try {
-        const response = await fetch('/api/generate-digest', {
+        // Queue the digest as a background job; the server answers immediately with a job id
+        const response = await fetch('/api/digest-jobs', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
@@ -99,12 +101,21 @@ async function callBackendAPI(query, articles) {
             })
         });
 
+        if (response.status === 429) {
+            throw new Error('The server is busy with other digests. Please try again in a moment.');
+        }
+
         if (!response.ok) {
             throw new Error(`HTTP error! status: ${response.status}`);
         }
 
-        const data = await response.json();
-        return data;
+        const job = await response.json();
+        const finishedJob = await waitForJob(job);
+
+        if (finishedJob.status === 'failed') {
+            throw new Error(finishedJob.error || 'Failed to generate digest.');
+        }
+        return finishedJob.result;
     } catch (error) {
         console.error('API call failed:', error);
         
@@ -114,10 +125,74 @@ async function callBackendAPI(query, articles) {
             return await simulateBackendCall(query, articles);
         }
         
-        throw new Error('Failed to connect to backend. Please try again.');
+        throw new Error(error.message || 'Failed to connect to backend. Please try again.');
     }
 }
 
+// Follow a digest job until it finishes: Server-Sent Events when available, polling otherwise
+function waitForJob(job) {
+    if (!window.EventSource) {
+        return pollJob(job.status_url);
+    }
+
+    return new Promise((resolve, reject) => {
+        const source = new EventSource(job.events_url);
+
+        source.addEventListener('progress', (e) => {
+            const event = JSON.parse(e.data);
+            updateProgress(event.message, event.completed, event.total);
+        });
+
+        source.addEventListener('status', async (e) => {
+            const event = JSON.parse(e.data);
+            if (event.status === 'queued' && event.queue_position > 0) {
+                updateProgress(`Waiting in queue (position ${event.queue_position})...`);
+            } else if (event.status === 'running') {
+                updateProgress('Digest started...');
+            } else if (event.status === 'completed' || event.status === 'failed') {
+                source.close();
+                try {
+                    const statusResponse = await fetch(job.status_url);
+                    resolve(await statusResponse.json());
+                } catch (err) {
+                    reject(err);
+                }
+            }
+        });
+
+        source.onerror = () => {
+            // Connection dropped (e.g. proxy timeout): fall back to polling
+            source.close();
+            pollJob(job.status_url).then(resolve, reject);
+        };
+    });
+}
+
+async function pollJob(statusUrl, intervalMs = 2000) {
+    while (true) {
+        const response = await fetch(statusUrl);
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+        const job = await response.json();
+        if (job.status === 'completed' || job.status === 'failed') {
+            return job;
+        }
+        const last = job.completed_nodes[job.completed_nodes.length - 1];
+        updateProgress(last ? `Finished ${last}...` : 'Waiting for the digest to start...', job.completed_nodes.length);
+        await new Promise(resolve => setTimeout(resolve, intervalMs));
+    }
+}
+
+function updateProgress(message, completed, total) {
+    const loadingText = document.querySelector('#loading .loading-text');
+    if (!loadingText) {
+        return;
+    }
+    const step = total ? ` (${completed}/${total})` : '';
+    loadingText.textContent = `🌊 ${message}${step}`;
+}
+
 // Simulate backend API call for development
 function simulateBackendCall(query, articles) {
     return new Promise((resolve, reject) => {
@@ -181,10 +256,62 @@ function generateMockReportData(query, articles) {
     };
 }
 
-function displayReport(data) {
+async function displayReport(data) {
     const reportSection = document.getElementById('reportSection');
     const reportContent = document.getElementById('reportContent');
-    
+
+    // Stored reports are rendered once on the server; fall back to building the view here
+    let reportHTML = data.report_urls && data.report_urls.html
+        ? await fetchRenderedReport(data.report_urls.html)
+        : null;
+    if (reportHTML === null) {
+        reportHTML = buildReportHTML(data);
+    }
+
+    reportHTML += reportDownloadLinks(data);
+
+    reportContent.innerHTML = reportHTML;
+    reportSection.style.display = 'block';
+
+    // Scroll to report section
+    reportSection.scrollIntoView({ behavior: 'smooth' });
+}
+
+async function fetchRenderedReport(url) {
+    try {
+        const response = await fetch(url);
+        if (!response.ok) {
+            return null;
+        }
+        const page = new DOMParser().parseFromString(await response.text(), 'text/html');
+        const report = page.getElementById('digest-report');
+        return report ? report.innerHTML : null;
+    } catch (error) {
+        console.error('Failed to load rendered report:', error);
+        return null;
+    }
+}
+
+function reportDownloadLinks(data) {
+    const links = [];
+    if (data.report_urls && data.report_urls.pdf) {
+        links.push(`<a href="${data.report_urls.pdf}?download=1" class="download-btn" download>📥 Download PDF Report</a>`);
+        links.push(`<a href="${data.report_urls.md}?download=1" class="download-btn" download>📝 Markdown</a>`);
+        links.push(`<a href="${data.report_urls.json}?download=1" class="download-btn" download>🧾 JSON</a>`);
+    } else if (data.report_path) {
+        links.push(`<a href="/download-report?path=${encodeURIComponent(data.report_path)}" class="download-btn" download>📥 Download PDF Report</a>`);
+    }
+    if (!links.length) {
+        return '';
+    }
+    return `
+        <div style="text-align: center; margin-top: 30px;">
+            ${links.join('\n')}
+        </div>
+    `;
+}
+
+function buildReportHTML(data) {
     // Generate HTML for the report
     let reportHTML = `
         <h2>📊 Daily Research Digest: ${data.query}</h2>
@@ -224,23 +351,7 @@ function displayReport(data) {
         });
     }
     
-    // Add download button if report path exists
-    if (data.report_path) {
-        reportHTML += `
-            <div style="text-align: center; margin-top: 30px;">
-                <a href="/download-report?path=${encodeURIComponent(data.report_path)}" 
-                   class="download-btn" download>
-                    📥 Download PDF Report
-                </a>
-            </div>
-        `;
-    }
-    
-    reportContent.innerHTML = reportHTML;
-    reportSection.style.display = 'block';
-    
-    // Scroll to report section
-    reportSection.scrollIntoView({ behavior: 'smooth' });
+    return reportHTML;
 }
 
 // Utility function to format dates
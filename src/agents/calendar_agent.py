@@ -1,23 +1,25 @@
 # src/agents/calendar_agent.py
+import base64
+import hashlib
 import os
-from datetime import datetime, timedelta
-from typing import Optional
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
 from dotenv import load_dotenv
 
-from googleapiclient.discovery import build
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
 from tzlocal import get_localzone_name # <-- ADDED: Import to get local timezone
 
+from src.utils.google_clients import get_google_clients
+
 load_dotenv()
 
+# Google recommends at most 50 calls per Calendar batch request
+MAX_BATCH_REQUESTS = 50
+
 
-SCOPES = [
-    "https://www.googleapis.com/auth/drive.file",
-    "https://www.googleapis.com/auth/calendar.events",
-    "https://www.googleapis.com/auth/calendar"
-]
+def event_id_for(key: str) -> str:
+    """Deterministic Calendar event id for ``key``; ids must use base32hex characters (a-v, 0-9)."""
+    digest = hashlib.sha256(key.encode("utf-8")).digest()
+    return base64.b32hexencode(digest).decode("ascii").lower().rstrip("=")[:40]
 
 
 class CalendarAgent:
@@ -32,22 +34,84 @@ class CalendarAgent:
         self.token_path = os.getenv("GOOGLE_TOKEN_PATH", token_path)
 
     def _get_service(self):
-        creds = None
-        if os.path.exists(self.token_path):
-            creds = Credentials.from_authorized_user_file(self.token_path, SCOPES)
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                creds.refresh(Request())
+        # Credentials and the service object are shared with the Drive agent and reused across calls
+        return get_google_clients(self.credentials_path, self.token_path).service("calendar", "v3")
+
+    @staticmethod
+    def report_event(report_name: str, generation_time: datetime, event_id: Optional[str] = None) -> dict:
+        """Event body for one report: a 30-minute event at the time it was generated."""
+        # Get the system's local timezone name (e.g., 'Asia/Kolkata')
+        local_timezone = get_localzone_name()
+        event = {
+            "summary": f"📄 Report Completed: {report_name}",
+            "description": f"Research digest report '{report_name}' has been generated and is ready for review.",
+            "start": {"dateTime": generation_time.isoformat(), "timeZone": local_timezone},
+            "end": {"dateTime": (generation_time + timedelta(minutes=30)).isoformat(), "timeZone": local_timezone},
+        }
+        if event_id:
+            event["id"] = event_id
+        return event
+
+    @staticmethod
+    def daily_event(day: date, reports: List[Dict[str, str]], event_id: Optional[str] = None) -> dict:
+        """All-day event listing one day's reports ({"report_id", "name", "time"} dicts).
+
+        The reports are also kept in the event's private extended properties, so a
+        process without a local record of the event can add to it (see daily_reports).
+        """
+        reports = sorted(reports, key=lambda r: r["time"])
+        lines = [f"• {r['time'][11:16]}  {r['name']}" for r in reports]
+        event = {
+            "summary": f"📄 Research digests for {day.isoformat()} ({len(reports)} report{'s' if len(reports) != 1 else ''})",
+            "description": "Research digest reports generated today:\n" + "\n".join(lines),
+            "start": {"date": day.isoformat()},
+            "end": {"date": (day + timedelta(days=1)).isoformat()},
+            "extendedProperties": {"private": {
+                f"digest_{r['report_id']}"[:44]: f"{r['time']}|{r['name']}"[:900] for r in reports
+            }},
+        }
+        if event_id:
+            event["id"] = event_id
+        return event
+
+    def daily_reports(self, calendar_id: str, event_id: str) -> List[Dict[str, str]]:
+        """The reports recorded on an existing daily event (see daily_event)."""
+        event = self._get_service().events().get(calendarId=calendar_id, eventId=event_id).execute()
+        reports = []
+        for key, value in (event.get("extendedProperties", {}).get("private", {}) or {}).items():
+            if key.startswith("digest_"):
+                time, _, name = value.partition("|")
+                reports.append({"report_id": key[len("digest_"):], "name": name, "time": time})
+        return reports
+
+    def send_events(self, calendar_id: str, requests: List[Tuple[str, str, dict]]) -> Dict[str, str]:
+        """Sends ("insert" | "patch", event id, body) requests in batch HTTP requests.
+
+        Returns event id -> "created", "updated", "exists" (an insert whose id was already
+        taken, i.e. the event was created before) or the error message.
+        """
+        service = self._get_service()
+        results: Dict[str, str] = {}
+
+        def on_response(request_id, response, exception):
+            op, event_id = request_id.split(":", 1)
+            if exception is None:
+                results[event_id] = "created" if op == "insert" else "updated"
+            elif op == "insert" and getattr(getattr(exception, "resp", None), "status", None) == 409:
+                results[event_id] = "exists"
             else:
-                if not os.path.exists(self.credentials_path):
-                    raise FileNotFoundError(
-                        f"Google OAuth client secrets not found at {self.credentials_path}."
-                    )
-                flow = InstalledAppFlow.from_client_secrets_file(self.credentials_path, SCOPES)
-                creds = flow.run_local_server(port=0)
-            with open(self.token_path, "w") as token:
-                token.write(creds.to_json())
-        return build("calendar", "v3", credentials=creds)
+                results[event_id] = str(exception)
+
+        for start in range(0, len(requests), MAX_BATCH_REQUESTS):
+            batch = service.new_batch_http_request(callback=on_response)
+            for op, event_id, body in requests[start:start + MAX_BATCH_REQUESTS]:
+                if op == "insert":
+                    request = service.events().insert(calendarId=calendar_id, body=body)
+                else:
+                    request = service.events().patch(calendarId=calendar_id, eventId=event_id, body=body)
+                batch.add(request, request_id=f"{op}:{event_id}")
+            batch.execute()
+        return results
 
     def create_report_event(
         self, 
@@ -63,27 +127,7 @@ class CalendarAgent:
             if not calendar_id:
                 calendar_id = "primary"
             
-            # --- MODIFICATION START ---
-            
-            # Get the system's local timezone name (e.g., 'Asia/Kolkata')
-            local_timezone = get_localzone_name()
-            
-            # Create event details
-            event = {
-                "summary": f"📄 Report Completed: {report_name}",
-                "description": f"Research digest report '{report_name}' has been generated and is ready for review.",
-                "start": {
-                    "dateTime": generation_time.isoformat(),
-                    "timeZone": local_timezone,  # <-- CHANGED: Use local timezone
-                },
-                "end": {
-                    "dateTime": (generation_time + timedelta(minutes=30)).isoformat(),
-                    "timeZone": local_timezone,  # <-- CHANGED: Use local timezone
-                },
-                # <-- REMOVED: The entire "reminders" block has been deleted
-            }
-            
-            # --- MODIFICATION END ---
+            event = self.report_event(report_name, generation_time)
             
             event = service.events().insert(
                 calendarId=calendar_id, 
@@ -1,26 +1,53 @@
 # src/agents/curator.py
 import os
-from typing import List, Dict, Any 
+import time
+import contextvars
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Collection, List, Dict, Any, Optional
+from urllib.parse import urlparse
+import requests
 from serpapi.google_search import GoogleSearch
 from newspaper import Article as NewspaperArticle
+from newspaper import network as newspaper_network
 from dotenv import load_dotenv
-import json  
+import json
 
 from src.models import Article
+from src.utils.page_cache import canonical_url, get_page_cache
+from src.utils.singleflight import SingleFlight
+from src.utils.metrics import timed
+from src.utils.dedup import ArticleDeduplicator, DuplicateIndex, current_dedup_index, deduplicator_from_env
+from src.utils.query_history import content_hash
+from src.utils.ranking import ranker_from_env
 
 load_dotenv()
 
 class CuratorAgent:
-    def __init__(self):
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        per_host_limit: Optional[int] = None,
+        timeout_budget: Optional[float] = None,
+        request_timeout: Optional[int] = None,
+    ):
         self.api_key = os.getenv("SERPAPI_API_KEY")
+        # Concurrency settings for downloading/parsing candidate URLs.
+        # max_workers=1 keeps the original one-at-a-time behaviour.
+        self.max_workers = max(1, max_workers or int(os.getenv("CURATOR_MAX_WORKERS", "8")))
+        self.per_host_limit = max(1, per_host_limit or int(os.getenv("CURATOR_PER_HOST_LIMIT", "2")))
+        # Overall wall-clock budget (seconds) for the download phase of one fetch.
+        self.timeout_budget = timeout_budget or float(os.getenv("CURATOR_TIMEOUT_BUDGET", "60"))
+        # Per-request timeout handed to newspaper3k.
+        self.request_timeout = request_timeout or int(os.getenv("CURATOR_REQUEST_TIMEOUT", "10"))
+        # The agent is shared by every digest in the process (including batch runs), so these
+        # cap downloads across all of them and let concurrent digests share one download per URL.
+        self._scrape_slots = threading.BoundedSemaphore(max(1, int(os.getenv("SCRAPE_MAX_CONCURRENCY", "16"))))
+        self._page_flights = SingleFlight(result_ttl=0)
 
-    def fetch_articles(self, query: str, max_articles: int = 10) -> List[Article]:
-        """Fetches articles from SerpAPI and parses them with newspaper3k."""
-        if not self.api_key:
-            raise ValueError("SERPAPI_API_KEY not found in environment variables.")
-
-        # 1. Get URLs from SerpAPI
-        print("📡 Fetching articles from SerpAPI...")
+    def _search(self, query: str) -> List[Dict[str, Any]]:
+        """Runs the Google News search on SerpAPI and returns the raw news items."""
         search_params = {
             "engine": "google_news",
             "q": query,
@@ -28,54 +55,286 @@ class CuratorAgent:
         }
         search = GoogleSearch(search_params)
         results = search.get_dict()
+        return results.get("news_results", [])
 
-        news_items = results.get("news_results", [])
-        print(f"SerpAPI returned {len(news_items)} raw items.")
-        
-        articles = []
-        processed_count = 0
-        
-        # 2. For each item, try to extract a URL and parse it
+    def _extract_candidates(self, news_items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Keeps only the news items we can download, preserving SerpAPI order."""
+        candidates = []
         for item in news_items:
-            if processed_count >= max_articles:
-                break
-                
             # Get the URL using .get() to avoid KeyError. Try common keys.
             url = item.get('link') or item.get('url') or item.get('source', {}).get('link')
             if not url:
                 print(f"⚠️ Skipping item with no available URL: {item.get('title', 'No Title')}")
                 continue
-            
-            # Get a title for logging
-            title = item.get('title', 'No Title')
-            print(f"⏳ ({processed_count+1}/{max_articles}) Parsing: {title}")
-            
-            try:
-                npp_article = NewspaperArticle(url)
-                npp_article.download()
-                npp_article.parse()
-
-                # DEBUG: Check if we actually got text
-                if not npp_article.text or len(npp_article.text.strip()) < 50:
-                    print(f"⚠️ Article '{title}' has insufficient text ({len(npp_article.text or '')} chars). Skipping.")
-                    continue
-
-                # 3. Create our own Article object
-                article = Article(
-                    title=title,
-                    url=url,
-                    source=item.get('source', {}).get('name', 'Unknown'),
-                    published_date=item.get('date', None),
-                    raw_text=npp_article.text
-                )
-                articles.append(article)
-                processed_count += 1
-                print(f"✅ Successfully parsed article: {title} ({len(npp_article.text)} chars)")
-                
-            except Exception as e:
-                # Don't crash the whole pipeline if one article fails!
-                print(f"❌ Failed to parse article '{title}' ({url}): {e}")
-                continue
+            candidates.append({"item": item, "url": url, "title": item.get('title', 'No Title')})
+        return candidates
+
+    def _new_newspaper_article(self, url: str) -> NewspaperArticle:
+        return NewspaperArticle(
+            url,
+            request_timeout=self.request_timeout,
+            fetch_images=False,
+            memoize_articles=False,
+        )
+
+    def _download_text(self, url: str) -> str:
+        """Returns the parsed article text for url, going through the on-disk page cache.
+
+        A fresh cache entry skips both the download and the newspaper3k parse. A stale
+        entry is revalidated with a conditional GET and reused on 304 Not Modified.
+        Concurrent requests for the same page share one download, and at most
+        SCRAPE_MAX_CONCURRENCY downloads run at once across all digests.
+        """
+        text, shared = self._page_flights.do(canonical_url(url), lambda: self._scrape(url))
+        if shared:
+            print(f"🔗 Reusing in-flight download: {url}")
+        return text
+
+    def _scrape(self, url: str) -> str:
+        """Downloads under the global slot limit, emitting a "scrape" event with latency and bytes."""
+        with self._scrape_slots, timed("scrape", url=url) as scrape:
+            scrape.update(cache="off", bytes=0, status="error")
+            text = self._download_text_cached(url, scrape)
+            scrape["status"] = "ok"
+            return text
+
+    def _download_text_cached(self, url: str, scrape: Dict[str, Any]) -> str:
+        page_cache = get_page_cache()
+        npp_article = self._new_newspaper_article(url)
+        if page_cache is None:
+            npp_article.download()
+            scrape["bytes"] = len((npp_article.html or "").encode("utf-8"))
+            npp_article.parse()
+            return npp_article.text
+
+        cached = page_cache.get(url)
+        if cached and page_cache.is_fresh(cached):
+            page_cache.record("hits")
+            scrape["cache"] = "hit"
+            print(f"💾 Page cache hit: {url}")
+            return cached.text
+
+        headers = {"User-Agent": npp_article.config.browser_user_agent}
+        if cached and cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached and cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+        response = requests.get(url, headers=headers, timeout=self.request_timeout)
+        scrape["bytes"] = len(response.content)
+
+        if cached and response.status_code == 304:
+            page_cache.record("revalidated")
+            scrape["cache"] = "revalidated"
+            page_cache.touch(url)
+            print(f"💾 Page not modified, reusing cached copy: {url}")
+            return cached.text
+
+        page_cache.record("misses")
+        scrape["cache"] = "miss"
+        response.raise_for_status()
+        html = newspaper_network.get_html_2XX_only(url, npp_article.config, response=response)
+        npp_article.download(input_html=html)
+        npp_article.parse()
+        page_cache.put(
+            url,
+            html=html,
+            text=npp_article.text or "",
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        return npp_article.text
+
+    def _fetch_one(self, candidate: Dict[str, Any], skip_hashes: Collection[str] = ()) -> Optional[Article]:
+        """Downloads and parses a single candidate. Returns None if it is unusable or its text is in skip_hashes."""
+        item, url, title = candidate["item"], candidate["url"], candidate["title"]
+        try:
+            text = self._download_text(url)
+
+            # DEBUG: Check if we actually got text
+            if not text or len(text.strip()) < 50:
+                print(f"⚠️ Article '{title}' has insufficient text ({len(text or '')} chars). Skipping.")
+                return None
+
+            text_hash = content_hash(text)
+            if text_hash in skip_hashes:
+                print(f"⏭️ Already covered by an earlier digest (same text): {title}")
+                return None
+
+            # Create our own Article object
+            article = Article(
+                title=title,
+                url=url,
+                source=item.get('source', {}).get('name', 'Unknown'),
+                published_date=item.get('date', None),
+                raw_text=text,
+                content_hash=text_hash,
+            )
+            print(f"✅ Successfully parsed article: {title} ({len(text)} chars)")
+            return article
+
+        except Exception as e:
+            # Don't crash the whole pipeline if one article fails!
+            print(f"❌ Failed to parse article '{title}' ({url}): {e}")
+            return None
+
+    def _fetch_sequential(
+        self,
+        candidates: List[Dict[str, Any]],
+        max_articles: int,
+        deduplicator: Optional[ArticleDeduplicator] = None,
+        skip_hashes: Collection[str] = (),
+    ) -> List[Article]:
+        """Downloads candidates one at a time until max_articles distinct good ones are parsed."""
+        articles = deduplicator.articles if deduplicator else []
+        offer = deduplicator.offer if deduplicator else articles.append
+        deadline = time.monotonic() + self.timeout_budget
+        for candidate in candidates:
+            if len(articles) >= max_articles:
+                break
+            if time.monotonic() >= deadline:
+                print(f"⏱️ Curator timeout budget ({self.timeout_budget:.0f}s) exhausted.")
+                break
+            print(f"⏳ ({len(articles)+1}/{max_articles}) Parsing: {candidate['title']}")
+            article = self._fetch_one(candidate, skip_hashes)
+            if article:
+                offer(article)
+        return articles[:max_articles]
+
+    def _fetch_concurrent(
+        self,
+        candidates: List[Dict[str, Any]],
+        max_articles: int,
+        deduplicator: Optional[ArticleDeduplicator] = None,
+        skip_hashes: Collection[str] = (),
+    ) -> List[Article]:
+        """Downloads candidates on a bounded thread pool.
+
+        Candidates are started in SerpAPI order, subject to ``max_workers`` and
+        ``per_host_limit``. Finished downloads are accepted in SerpAPI order (folding
+        near-duplicates when a deduplicator is given), and fetching stops as soon as
+        ``max_articles`` distinct articles are accepted or the timeout budget runs out.
+        When the budget runs out, every download that finished is still accepted (in
+        SerpAPI order), skipping the ones still running.
+        """
+        results: Dict[int, Optional[Article]] = {}
+        waiting = list(range(len(candidates)))
+        in_flight = {}
+        host_active = Counter()
+        hosts = [urlparse(c["url"]).netloc.lower() for c in candidates]
+        deadline = time.monotonic() + self.timeout_budget
+        articles = deduplicator.articles if deduplicator else []
+        offer = deduplicator.offer if deduplicator else articles.append
+        next_idx = 0
+
+        def ready_prefix() -> int:
+            """Accepts the newly resolved prefix of the candidate list; returns the accepted count."""
+            nonlocal next_idx
+            while next_idx in results:
+                if results[next_idx] is not None:
+                    offer(results[next_idx])
+                next_idx += 1
+            return len(articles)
+
+        def accept_resolved() -> None:
+            """Accepts every resolved candidate past the prefix, skipping unresolved ones (on abandon)."""
+            for idx in sorted(i for i in results if i >= next_idx):
+                if results[idx] is not None:
+                    offer(results[idx])
+
+        pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="curator")
+        try:
+            while True:
+                # Launch as many waiting candidates as the global and per-host limits allow
+                for idx in list(waiting):
+                    if len(in_flight) >= self.max_workers:
+                        break
+                    host = hosts[idx]
+                    if host_active[host] >= self.per_host_limit:
+                        continue
+                    waiting.remove(idx)
+                    host_active[host] += 1
+                    print(f"⏳ Downloading ({idx+1}/{len(candidates)}): {candidates[idx]['title']}")
+                    in_flight[pool.submit(
+                        contextvars.copy_context().run, self._fetch_one, candidates[idx], skip_hashes
+                    )] = idx
+
+                if not in_flight:
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    print(f"⏱️ Curator timeout budget ({self.timeout_budget:.0f}s) exhausted.")
+                    accept_resolved()
+                    break
+                done, _ = wait(in_flight, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    idx = in_flight.pop(future)
+                    host_active[hosts[idx]] -= 1
+                    results[idx] = future.result()
+
+                if ready_prefix() >= max_articles:
+                    break
+        finally:
+            # Don't wait for stragglers; queued work is cancelled, running downloads
+            # finish on their own within request_timeout.
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        return articles[:max_articles]
+
+    def fetch_articles(
+        self,
+        query: str,
+        max_articles: int = 10,
+        dedup_index: Optional[DuplicateIndex] = None,
+        exclude_urls: Collection[str] = (),
+        exclude_hashes: Collection[str] = (),
+    ) -> List[Article]:
+        """Fetches articles from SerpAPI and parses them with newspaper3k.
+
+        Near-duplicates (the same story syndicated by several outlets) are collapsed to
+        the best copy and further candidates are fetched to make up max_articles.
+        A shared ``dedup_index`` (passed in, or set with ``sharing_dedup_index``) lets
+        digests reuse the copy another digest already picked for the same story.
+        With ranking on, more candidates than needed are parsed and only the
+        max_articles most relevant to the query are returned.
+        Candidates whose canonical URL is in ``exclude_urls`` are never downloaded, and
+        downloads whose text hash is in ``exclude_hashes`` are skipped (incremental mode).
+        """
+        if not self.api_key:
+            raise ValueError("SERPAPI_API_KEY not found in environment variables.")
+
+        # 1. Get URLs from SerpAPI
+        print("📡 Fetching articles from SerpAPI...")
+        news_items = self._search(query)
+        print(f"SerpAPI returned {len(news_items)} raw items.")
+
+        # 2. For each item, try to extract a URL and parse it
+        candidates = self._extract_candidates(news_items)
+        if exclude_urls:
+            fresh = [c for c in candidates if canonical_url(c["url"]) not in exclude_urls]
+            print(f"⏭️ Skipping {len(candidates) - len(fresh)} candidates covered by earlier digests")
+            candidates = fresh
+        ranker = ranker_from_env()
+        target = max_articles
+        if ranker:
+            candidates = ranker.rank_candidates(query, candidates)
+            target = ranker.fetch_target(max_articles)
+        deduplicator = deduplicator_from_env(dedup_index or current_dedup_index())
+        if self.max_workers > 1:
+            print(f"🚀 Fetching up to {len(candidates)} candidates with {self.max_workers} workers "
+                  f"(max {self.per_host_limit} per host)")
+            articles = self._fetch_concurrent(candidates, target, deduplicator, exclude_hashes)
+        else:
+            articles = self._fetch_sequential(candidates, target, deduplicator, exclude_hashes)
+        if deduplicator and deduplicator.dropped:
+            print(f"♻️ Dropped {deduplicator.dropped} near-duplicate articles")
+        if deduplicator and deduplicator.shared:
+            print(f"🔗 Reused {deduplicator.shared} articles already picked by other digests")
+        if ranker:
+            start = time.perf_counter()
+            articles = ranker.select(query, articles, max_articles)
+            print(f"🎯 Kept the {len(articles)} most relevant articles "
+                  f"({(time.perf_counter() - start) * 1000:.1f} ms to rank)")
 
         print(f"✅ Curator successfully parsed {len(articles)} out of {max_articles} requested articles.")
-        return articles
\ No newline at end of file
+        return articles
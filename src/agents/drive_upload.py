@@ -1,75 +1,120 @@
 # src/agents/drive_upload.py
 import os
-from typing import Optional
+import time
+from typing import List, Optional, Tuple
 from dotenv import load_dotenv
 
-from googleapiclient.discovery import build
 from googleapiclient.http import MediaFileUpload
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
+
+from src.utils.google_clients import backoff_delay, get_google_clients, is_transient
 
 load_dotenv()
 
-SCOPES = ["https://www.googleapis.com/auth/drive.file"]
+# Resumable upload chunks must be a multiple of 256 KiB
+CHUNK_ALIGNMENT = 256 * 1024
+# Google accepts at most 100 calls per batch request
+MAX_BATCH_REQUESTS = 100
+
 
 class DriveUploadAgent:
     """Uploads generated reports to a Google Drive folder.
 
     Requires either a user OAuth flow (credentials.json + token.json) or a service account.
     This implementation uses the user OAuth flow for simplicity (Drive File scope).
+
+    Uploads are resumable and sent in DRIVE_UPLOAD_CHUNK_SIZE chunks; a chunk that fails
+    with a transient error is retried with backoff and the upload resumes where it stopped.
     """
 
     def __init__(self, credentials_path: str = "credentials.json", token_path: str = "token.json"):
         self.credentials_path = os.getenv("GOOGLE_CREDENTIALS_PATH", credentials_path)
         self.token_path = os.getenv("GOOGLE_TOKEN_PATH", token_path)
+        chunk_size = int(os.getenv("DRIVE_UPLOAD_CHUNK_SIZE", str(8 * 1024 * 1024)))
+        self.chunk_size = max(CHUNK_ALIGNMENT, chunk_size // CHUNK_ALIGNMENT * CHUNK_ALIGNMENT)
+        self.max_attempts = max(1, int(os.getenv("DRIVE_UPLOAD_MAX_ATTEMPTS", "5")))
+        self.backoff = float(os.getenv("DRIVE_UPLOAD_BACKOFF", "1"))
 
     def _get_service(self):
-        creds = None
-        if os.path.exists(self.token_path):
-            creds = Credentials.from_authorized_user_file(self.token_path, SCOPES)
-            # Check if the token has all required scopes
-            if creds and creds.scopes:
-                required_scopes = set(SCOPES)
-                token_scopes = set(creds.scopes)
-                if not required_scopes.issubset(token_scopes):
-                    print("⚠️ Token missing required scopes. Re-authenticating...")
-                    creds = None  # Force re-authentication
-        
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                try:
-                    creds.refresh(Request())
-                except Exception:
-                    # If refresh fails, force re-authentication
-                    creds = None
-            
-            if not creds:
-                if not os.path.exists(self.credentials_path):
-                    raise FileNotFoundError(
-                        f"Google OAuth client secrets not found at {self.credentials_path}."
-                    )
-                print("🔐 Starting Google OAuth flow for Drive access...")
-                flow = InstalledAppFlow.from_client_secrets_file(self.credentials_path, SCOPES)
-                creds = flow.run_local_server(port=0)
-                with open(self.token_path, "w") as token:
-                    token.write(creds.to_json())
-        
-        return build("drive", "v3", credentials=creds)
+        # Credentials and the service object are shared with the Calendar agent and reused across calls
+        return get_google_clients(self.credentials_path, self.token_path).service("drive", "v3")
+
+    @staticmethod
+    def _metadata(file_path: str, drive_folder_id: Optional[str]) -> dict:
+        file_metadata = {"name": os.path.basename(file_path)}
+        if drive_folder_id:
+            file_metadata["parents"] = [drive_folder_id]
+        return file_metadata
+
+    def _media(self, file_path: str) -> MediaFileUpload:
+        return MediaFileUpload(file_path, mimetype="application/pdf", resumable=True, chunksize=self.chunk_size)
+
+    def _send(self, request) -> dict:
+        """Sends a resumable upload chunk by chunk, retrying transient failures where the upload stopped."""
+        failures = 0
+        response = None
+        while response is None:
+            try:
+                _, response = request.next_chunk()
+            except Exception as e:
+                failures += 1
+                if not is_transient(e) or failures >= self.max_attempts:
+                    raise
+                delay = backoff_delay(failures, self.backoff)
+                print(f"⏳ Drive upload interrupted ({e}), resuming in {delay:.1f}s (attempt {failures + 1}/{self.max_attempts})")
+                time.sleep(delay)
+        return response
 
     def upload_report(self, file_path: str, drive_folder_id: Optional[str] = None) -> Optional[str]:
         if not file_path or not os.path.exists(file_path):
             print(f"❌ Report file not found: {file_path}")
             return None
         service = self._get_service()
-        file_metadata = {"name": os.path.basename(file_path)}
-        if drive_folder_id:
-            file_metadata["parents"] = [drive_folder_id]
-        media = MediaFileUpload(file_path, mimetype="application/pdf")
-        file = service.files().create(body=file_metadata, media_body=media, fields="id, webViewLink").execute()
+        request = service.files().create(
+            body=self._metadata(file_path, drive_folder_id), media_body=self._media(file_path),
+            fields="id, webViewLink",
+        )
+        file = self._send(request)
         file_id = file.get("id")
         web_view_link = file.get("webViewLink")
         print(f"✅ Uploaded to Drive. File ID: {file_id}, Link: {web_view_link}")
         return file_id
 
+    def create_files(self, uploads: List[Tuple[str, Optional[str]]]) -> List[Optional[str]]:
+        """Creates empty Drive files for (file_path, folder_id) pairs in batch requests; returns their ids.
+
+        Drive batch requests cannot carry file content, so only the metadata goes in the
+        batch; the content is sent afterwards with upload_content. An id is None where
+        that file's create failed.
+        """
+        service = self._get_service()
+        file_ids: List[Optional[str]] = [None] * len(uploads)
+
+        def on_response(request_id, response, exception):
+            if exception is not None:
+                print(f"⚠️ Drive batch create failed for {uploads[int(request_id)][0]}: {exception}")
+                return
+            file_ids[int(request_id)] = response.get("id")
 
+        for start in range(0, len(uploads), MAX_BATCH_REQUESTS):
+            batch = service.new_batch_http_request(callback=on_response)
+            for index in range(start, min(start + MAX_BATCH_REQUESTS, len(uploads))):
+                file_path, drive_folder_id = uploads[index]
+                batch.add(
+                    service.files().create(
+                        body={**self._metadata(file_path, drive_folder_id), "mimeType": "application/pdf"},
+                        fields="id",
+                    ),
+                    request_id=str(index),
+                )
+            batch.execute()
+        return file_ids
+
+    def upload_content(self, file_id: str, file_path: str) -> Optional[str]:
+        """Uploads the report's content into a file made by create_files; returns the file id."""
+        service = self._get_service()
+        request = service.files().update(
+            fileId=file_id, media_body=self._media(file_path), fields="id, webViewLink"
+        )
+        file = self._send(request)
+        print(f"✅ Uploaded to Drive. File ID: {file.get('id')}, Link: {file.get('webViewLink')}")
+        return file.get("id")
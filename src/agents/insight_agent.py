@@ -7,72 +7,97 @@ from langchain.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 
 from src.models import Article, ArticleInsight
+from src.utils.blob_store import article_text
+from src.utils.context_budget import budgeter_from_env
+from src.utils.llm_cache import cached_invoke, is_json, llm_identity
+from src.utils.tokens import SAFETY_MARGIN_TOKENS, context_window, estimate_tokens
 
 load_dotenv()
 
+INSIGHT_SYSTEM_PROMPT = (
+    "You are an analyst generating concise, actionable insights from news articles. "
+    "Read the full article text and produce 3-5 bullet insights focused on decisions, risks, opportunities, and next steps. "
+    "Return JSON with keys: insights (list of strings), categories (list of strings), confidence (high|medium|low), rationale (short string). "
+    "Be concrete and avoid generic statements."
+)
+
+INSIGHT_HUMAN_PROMPT = (
+    "Title: {title}\n\n"
+    "Source: {source}\n\n"
+    "Full Article:\n"
+    "{article_text}\n\n"
+    "Respond with ONLY the JSON."
+)
+
+
+def build_insight(article_id: str, data: dict) -> Optional[ArticleInsight]:
+    """Turns the JSON returned by the LLM into an ArticleInsight (None if it has no insights)."""
+    insights_list: List[str] = [i for i in data.get("insights", []) if isinstance(i, str)]
+    categories = data.get("categories") or None
+    confidence = data.get("confidence") or None
+    rationale = data.get("rationale") or None
+    if not insights_list:
+        return None
+    return ArticleInsight(
+        article_id=article_id,
+        insights=[i.strip() for i in insights_list if i.strip()],
+        categories=[c.strip() for c in categories] if isinstance(categories, list) else None,
+        confidence=str(confidence).lower() if isinstance(confidence, str) else None,
+        rationale=rationale.strip() if isinstance(rationale, str) else None,
+    )
+
 
 class InsightAgent:
     """Generates actionable insights directly from full article text."""
 
-    def __init__(self):
-        self.llm = ChatGroq(
+    def __init__(self, llm=None):
+        self.llm = llm or ChatGroq(
             api_key=os.getenv("GROQ_API_KEY"),
             model="llama3-70b-8192",
+            max_retries=0,  # 429s are retried by the shared LLM gateway
             temperature=0.2,
             max_tokens=300,
         )
         self.chain = self._create_chain()
+        # Article tokens that fit one request; longer articles are trimmed to their most informative sentences
+        model_name, _ = llm_identity(self.llm)
+        max_output = getattr(self.llm, "max_tokens", None) or 300
+        self.input_budget = (
+            context_window(model_name) - estimate_tokens(INSIGHT_SYSTEM_PROMPT + INSIGHT_HUMAN_PROMPT)
+            - max_output - SAFETY_MARGIN_TOKENS
+        )
+        self.budgeter = budgeter_from_env()
 
     def _create_chain(self):
         prompt = ChatPromptTemplate.from_messages(
             [
-                (
-                    "system",
-                    (
-                        "You are an analyst generating concise, actionable insights from news articles. "
-                        "Read the full article text and produce 3-5 bullet insights focused on decisions, risks, opportunities, and next steps. "
-                        "Return JSON with keys: insights (list of strings), categories (list of strings), confidence (high|medium|low), rationale (short string). "
-                        "Be concrete and avoid generic statements."
-                    ),
-                ),
-                (
-                    "human",
-                    (
-                        "Title: {title}\n\n"
-                        "Source: {source}\n\n"
-                        "Full Article:\n" 
-                        "{article_text}\n\n"
-                        "Respond with ONLY the JSON."
-                    ),
-                ),
+                ("system", INSIGHT_SYSTEM_PROMPT),
+                ("human", INSIGHT_HUMAN_PROMPT),
             ]
         )
         return prompt | self.llm | StrOutputParser()
 
     def analyze(self, article: Article) -> Optional[ArticleInsight]:
-        if not article.raw_text or len(article.raw_text.strip()) < 50:
+        text = article_text(article)
+        if len(text.strip()) < 50:
             return None
+        if self.budgeter is not None:
+            text = self.budgeter.fit(text, self.input_budget, stage="insights", article_id=article.id).text
         try:
             import json
-            raw = self.chain.invoke({
+            inputs = {
                 "title": article.title,
                 "source": article.source,
-                "article_text": article.raw_text,
-            })
-            data = json.loads(raw)
-            insights_list: List[str] = [i for i in data.get("insights", []) if isinstance(i, str)]
-            categories = data.get("categories") or None
-            confidence = data.get("confidence") or None
-            rationale = data.get("rationale") or None
-            if not insights_list:
-                return None
-            return ArticleInsight(
-                article_id=article.id,
-                insights=[i.strip() for i in insights_list if i.strip()],
-                categories=[c.strip() for c in categories] if isinstance(categories, list) else None,
-                confidence=str(confidence).lower() if isinstance(confidence, str) else None,
-                rationale=rationale.strip() if isinstance(rationale, str) else None,
+                "article_text": text,
+            }
+            raw = cached_invoke(
+                lambda: self.chain.invoke(inputs),
+                text="\n".join([article.title, article.source, text]),
+                prompt_template=INSIGHT_SYSTEM_PROMPT + INSIGHT_HUMAN_PROMPT,
+                llm=self.llm,
+                validate=is_json,
             )
+            return build_insight(article.id, json.loads(raw))
         except Exception as e:
             print(f"⚠️ Insight extraction failed for '{article.title}': {e}")
             return None
\ No newline at end of file
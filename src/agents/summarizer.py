@@ -1,6 +1,10 @@
 # src/agents/summarizer.py
 import os
-from typing import Optional
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
 from langchain_groq import ChatGroq
 from langchain.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
@@ -8,37 +12,17 @@ from langchain_text_splitters import RecursiveCharacterTextSplitter
 from dotenv import load_dotenv
 
 # Import our shared models
-from src.models import Article, ArticleSummary
+from src.models import Article, ArticleSummary, ArticleInsight
+from src.agents.insight_agent import build_insight
+from src.utils.blob_store import article_text
+from src.utils.llm_cache import cached_invoke, is_json, llm_identity, normalize_text
+from src.utils.concurrency import map_concurrently
+from src.utils.context_budget import budgeter_from_env
+from src.utils.tokens import SAFETY_MARGIN_TOKENS, estimate_tokens, context_window
 
 load_dotenv()
 
-class SummarizerAgent:
-    def __init__(self):  # <-- Fix here
-        # Initialize the LLM client
-        self.llm = ChatGroq(
-            api_key=os.getenv("GROQ_API_KEY"),
-            model="llama3-70b-8192",
-            temperature=0.1,
-            max_tokens=200
-        )
-        
-        # Initialize text splitter for chunking long articles only
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=4000,  # Leave room for prompt + response
-            chunk_overlap=200,
-            length_function=len,
-            separators=["\n\n", "\n", ". ", " ", ""]
-        )
-        
-        # Define the chains
-        # - Summarization chain: Prompt -> LLM -> String Output
-        # - Sentiment chain: Prompt -> LLM -> String (JSON) Output
-        self.chain = self._create_chain()
-        self.sentiment_chain = self._create_sentiment_chain()
-
-    def _create_chain(self):
-        """Creates the LangChain LCEL chain for summarization."""
-        prompt_template = """
+SUMMARY_PROMPT = """
         You are a world-class news summarizer. Create an extremely concise and informative summary of the following article text.
 
         Requirements:
@@ -52,12 +36,8 @@ class SummarizerAgent:
 
         Summary (one complete sentence):
         """
-        prompt = ChatPromptTemplate.from_template(prompt_template)
-        return prompt | self.llm | StrOutputParser()
 
-    def _create_sentiment_chain(self):
-        """Creates the chain that returns sentiment and confidence for a summary (JSON only)."""
-        prompt_template = """
+SENTIMENT_PROMPT = """
         You are an expert sentiment analyst specializing in news content. Analyze the sentiment of the following one-sentence news summary and return ONLY a JSON object.
 
         Sentiment must be one of: positive, negative, neutral, mixed.
@@ -72,94 +52,283 @@ class SummarizerAgent:
           "confidence": "high" | "medium" | "low"
         }}
         """
-        prompt = ChatPromptTemplate.from_template(prompt_template)
-        return prompt | self.llm | StrOutputParser()
 
-    def _smart_summarize(self, article_text: str) -> str:
-        """Smart summarization: only chunk if absolutely necessary."""
-        text_length = len(article_text)
-        
-        # If text is short enough, process directly (fast path)
-        if text_length < 3000:
-            print(f"🚀 Fast path: Processing {text_length} chars directly")
-            return self.chain.invoke({"article_text": article_text})
+COMBINE_PROMPT = """
+            You are a news summarizer. Combine these chunk summaries into one comprehensive sentence:
+
+            Chunk Summaries:
+            {combined_summaries}
+
+            Final One-Sentence Summary:
+            """
+
+COMBINED_PROMPT = """
+        You are a world-class news summarizer and sentiment analyst. Read the following article and return ONLY a JSON object.
+
+        Requirements:
+        - "summary": exactly one complete, grammatically complete sentence focused on the main event, decision, or outcome, in a neutral, factual tone
+        - "sentiment": the sentiment of that summary, one of: positive, negative, neutral, mixed
+        - "confidence": your confidence in the sentiment, one of: high, medium, low
+
+        Title: {title}
+        Source: {source}
+
+        Article Text:
+        {article_text}
+
+        Return ONLY JSON:
+        {{
+          "summary": "...",
+          "sentiment": "positive" | "negative" | "neutral" | "mixed",
+          "confidence": "high" | "medium" | "low"
+        }}
+        """
+
+COMBINED_INSIGHTS_PROMPT = """
+        You are a world-class news summarizer and analyst. Read the following article and return ONLY a JSON object.
+
+        Requirements:
+        - "summary": exactly one complete, grammatically complete sentence focused on the main event, decision, or outcome, in a neutral, factual tone
+        - "sentiment": the sentiment of that summary, one of: positive, negative, neutral, mixed
+        - "confidence": your confidence in the sentiment, one of: high, medium, low
+        - "insights": 3-5 concise, actionable insights focused on decisions, risks, opportunities, and next steps (be concrete, avoid generic statements)
+        - "categories": a short list of content categories
+        - "insight_confidence": your confidence in the insights, one of: high, medium, low
+        - "rationale": a short string explaining the insights
+
+        Title: {title}
+        Source: {source}
+
+        Article Text:
+        {article_text}
+
+        Return ONLY JSON:
+        {{
+          "summary": "...",
+          "sentiment": "positive" | "negative" | "neutral" | "mixed",
+          "confidence": "high" | "medium" | "low",
+          "insights": ["..."],
+          "categories": ["..."],
+          "insight_confidence": "high" | "medium" | "low",
+          "rationale": "..."
+        }}
+        """
+
+# Chunk summaries remembered in-process (on top of the persistent LLM cache).
+CHUNK_MEMO_SIZE = 512
+
+SENTIMENTS = {"positive", "negative", "neutral", "mixed"}
+CONFIDENCES = {"high", "medium", "low"}
+
+
+def _has_summary(raw: str) -> bool:
+    """Validator for cached_invoke: a combined response must be JSON with a non-empty summary."""
+    try:
+        data = json.loads(raw)
+    except (TypeError, ValueError):
+        return False
+    return isinstance(data, dict) and isinstance(data.get("summary"), str) and bool(data["summary"].strip())
+
+
+class SummarizerAgent:
+    def __init__(self, llm=None):
+        # Initialize the LLM client (an already-built chat model can be injected, e.g. for benchmarks)
+        self.llm = llm or ChatGroq(
+            api_key=os.getenv("GROQ_API_KEY"),
+            model="llama3-70b-8192",
+            max_retries=0,  # 429s are retried by the shared LLM gateway
+            temperature=0.1,
+            max_tokens=200
+        )
         
-        # If text is moderately long, try direct processing first
-        elif text_length < 50000:
-            print(f"⚡ Moderate length: Trying direct processing ({text_length} chars)")
-            try:
-                return self.chain.invoke({"article_text": article_text})
-            except Exception as e:
-                print(f"⚠️ Direct processing failed, falling back to chunking: {e}")
-                return self._chunk_and_summarize(article_text)
+        # Token budgets, decided up front from the model's context window:
+        # - input_budget: article tokens that fit one summary request
+        # - combined_budget: article tokens that fit one combined (JSON) request
+        model_name, _ = llm_identity(self.llm)
+        self.context_tokens = context_window(model_name)
+        max_output = getattr(self.llm, "max_tokens", None) or 200
+        self.input_budget = self.context_tokens - estimate_tokens(SUMMARY_PROMPT) - max_output - SAFETY_MARGIN_TOKENS
+        self.combined_budget = self.context_tokens - estimate_tokens(COMBINED_INSIGHTS_PROMPT) - 700 - SAFETY_MARGIN_TOKENS
+
+        # Articles over the input budget are summarized chunk by chunk and the chunk summaries
+        # combined ("map_reduce"), or trimmed to their most informative sentences ("trim").
+        self.budgeter = budgeter_from_env()
+        self.long_articles = os.getenv("SUMMARIZER_LONG_ARTICLES", "map_reduce").lower()
+
+        # Map-reduce settings for articles over the input budget
+        chunk_tokens = min(self.input_budget, int(os.getenv("SUMMARIZER_CHUNK_TOKENS", "2000")))
+        self.chunk_workers = max(1, int(os.getenv("SUMMARIZER_CHUNK_WORKERS", "4")))
+        self.reduce_fanout = max(2, int(os.getenv("SUMMARIZER_REDUCE_FANOUT", "8")))
+        self._chunk_memo: "OrderedDict[str, str]" = OrderedDict()
+        self._chunk_memo_lock = threading.Lock()
+
+        # Initialize text splitter for chunking long articles only (sizes measured in estimated tokens)
+        self.text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_tokens,
+            chunk_overlap=50,
+            length_function=estimate_tokens,
+            separators=["\n\n", "\n", ". ", " ", ""]
+        )
         
-        # Only chunk if text is very long
-        else:
-            print(f" Long text detected: Chunking {text_length} chars")
-            return self._chunk_and_summarize(article_text)
+        # Define the chains
+        # - Summarization chain: Prompt -> LLM -> String Output
+        # - Sentiment chain: Prompt -> LLM -> String (JSON) Output
+        self.chain = self._create_chain()
+        self.sentiment_chain = self._create_sentiment_chain()
+
+        # "combined" asks for summary + sentiment (and optionally insights) in one structured call,
+        # "separate" keeps the summary -> sentiment two-call path.
+        self.mode = os.getenv("SUMMARIZER_MODE", "combined").lower()
+        self.combined_insights = os.getenv("SUMMARIZER_COMBINED_INSIGHTS", "0") == "1"
+        self.combined_chain = self._create_combined_chain(COMBINED_PROMPT, max_tokens=350)
+        self.combined_insights_chain = self._create_combined_chain(COMBINED_INSIGHTS_PROMPT, max_tokens=700)
+
+    def _create_chain(self):
+        """Creates the LangChain LCEL chain for summarization."""
+        prompt = ChatPromptTemplate.from_template(SUMMARY_PROMPT)
+        return prompt | self.llm | StrOutputParser()
+
+    def _create_sentiment_chain(self):
+        """Creates the chain that returns sentiment and confidence for a summary (JSON only)."""
+        prompt = ChatPromptTemplate.from_template(SENTIMENT_PROMPT)
+        return prompt | self.llm | StrOutputParser()
+
+    def _create_combined_chain(self, template: str, max_tokens: int):
+        """Creates a chain returning the combined JSON response (needs more output room than a sentence)."""
+        prompt = ChatPromptTemplate.from_template(template)
+        return prompt | self.llm.bind(max_tokens=max_tokens) | StrOutputParser()
+
+    def _summarize_text(self, text: str) -> str:
+        """Runs the summarization chain, reusing a cached summary of the same text if present."""
+        return cached_invoke(
+            lambda: self.chain.invoke({"article_text": text}),
+            text=text,
+            prompt_template=SUMMARY_PROMPT,
+            llm=self.llm,
+        )
+
+    def _fit(self, text: str, budget: int, article_id: str) -> str:
+        """With SUMMARIZER_LONG_ARTICLES=trim, the article text trimmed to ``budget`` tokens."""
+        if self.budgeter is None or self.long_articles != "trim":
+            return text
+        return self.budgeter.fit(text, budget, stage="summarizer", article_id=article_id).text
+
+    def _smart_summarize(self, article_text: str) -> str:
+        """Summarizes in a single request when the text fits the model context, otherwise map-reduce."""
+        tokens = estimate_tokens(article_text)
+        if tokens <= self.input_budget:
+            print(f"🚀 Direct path: ~{tokens} tokens fit in one request")
+            return self._summarize_text(article_text)
+
+        print(f" Long text detected: ~{tokens} tokens over the {self.input_budget}-token budget, using map-reduce")
+        return self._chunk_and_summarize(article_text)
+
+    def _summarize_chunk(self, chunk: str) -> Optional[str]:
+        """Map step: summarizes one chunk, reusing an earlier summary of the same chunk text."""
+        memo_key = hashlib.sha256(normalize_text(chunk).encode("utf-8")).hexdigest()
+        with self._chunk_memo_lock:
+            if memo_key in self._chunk_memo:
+                self._chunk_memo.move_to_end(memo_key)
+                return self._chunk_memo[memo_key]
+        try:
+            chunk_summary = self._summarize_text(chunk)
+        except Exception as e:
+            print(f"⚠️ Failed to summarize chunk: {e}")
+            return None
+        with self._chunk_memo_lock:
+            self._chunk_memo[memo_key] = chunk_summary
+            if len(self._chunk_memo) > CHUNK_MEMO_SIZE:
+                self._chunk_memo.popitem(last=False)
+        return chunk_summary
 
     def _chunk_and_summarize(self, article_text: str) -> str:
-        """Chunks long text and creates a comprehensive summary."""
+        """Map-reduce: summarizes chunks concurrently, then reduces the chunk summaries hierarchically."""
         chunks = self.text_splitter.split_text(article_text)
-        print(f" Article split into {len(chunks)} chunks")
-        
-        # Summarize each chunk
-        chunk_summaries = []
-        for i, chunk in enumerate(chunks):
-            try:
-                chunk_summary = self.chain.invoke({"article_text": chunk})
-                chunk_summaries.append(chunk_summary)
-                print(f"✅ Chunk {i+1}/{len(chunks)} summarized")
-            except Exception as e:
-                print(f"⚠️ Failed to summarize chunk {i+1}: {e}")
-                continue
-        
+        print(f" Article split into {len(chunks)} chunks ({self.chunk_workers} workers)")
+
+        results = map_concurrently(self._summarize_chunk, chunks, self.chunk_workers)
+        chunk_summaries = [summary for summary in results if summary]
+        print(f"✅ {len(chunk_summaries)}/{len(chunks)} chunks summarized")
+
         if not chunk_summaries:
             return "Failed to generate summary due to processing errors."
-        
-        # If we have multiple chunks, create a final summary
-        if len(chunk_summaries) > 1:
-            combined_summaries = " ".join(chunk_summaries)
-            final_prompt = f"""
-            You are a news summarizer. Combine these chunk summaries into one comprehensive sentence:
 
-            Chunk Summaries:
-            {combined_summaries}
+        return self._reduce_summaries(chunk_summaries)
 
-            Final One-Sentence Summary:
-            """
-            try:
-                final_summary = self.llm.invoke(final_prompt)
-                return final_summary.content if hasattr(final_summary, 'content') else str(final_summary)
-            except Exception as e:
-                print(f"⚠️ Failed to create final summary: {e}")
-                return chunk_summaries[0]
-        
-        return chunk_summaries[0]
+    def _reduce_summaries(self, summaries: List[str]) -> str:
+        """Combines summaries in groups, level by level, until a single summary is left."""
+        level = 1
+        while len(summaries) > 1:
+            groups = self._group_for_reduce(summaries)
+            print(f" Reduce level {level}: {len(summaries)} summaries -> {len(groups)}")
+            summaries = map_concurrently(self._combine_summaries, groups, self.chunk_workers)
+            level += 1
+        return summaries[0]
+
+    def _group_for_reduce(self, summaries: List[str]) -> List[List[str]]:
+        """Groups ~reduce_fanout summaries per request within the input budget (never leaves a group of one)."""
+        groups, current, current_tokens = [], [], 0
+        for summary in summaries:
+            tokens = estimate_tokens(summary)
+            full = len(current) >= self.reduce_fanout or current_tokens + tokens > self.input_budget
+            if current and full and len(current) >= 2:
+                groups.append(current)
+                current, current_tokens = [], 0
+            current.append(summary)
+            current_tokens += tokens
+        if current:
+            if len(current) == 1 and groups:
+                groups[-1].append(current[0])
+            else:
+                groups.append(current)
+        return groups
+
+    def _combine_summaries(self, group: List[str]) -> str:
+        """Reduce step: merges a group of summaries into one sentence."""
+        if len(group) == 1:
+            return group[0]
+        combined_summaries = " ".join(group)
+        final_prompt = COMBINE_PROMPT.format(combined_summaries=combined_summaries)
+        try:
+            return cached_invoke(
+                lambda: self.llm.invoke(final_prompt),
+                text=combined_summaries,
+                prompt_template=COMBINE_PROMPT,
+                llm=self.llm,
+            )
+        except Exception as e:
+            print(f"⚠️ Failed to combine {len(group)} summaries: {e}")
+            return group[0]
 
     def summarize(self, article: Article) -> Optional[ArticleSummary]:
         """Summarizes a single article and returns an ArticleSummary object."""
         print(f"📝 Summarizing: {article.title}")
         
         # Check if article has sufficient text
-        if not article.raw_text or len(article.raw_text.strip()) < 50:
+        text = article_text(article)
+        if len(text.strip()) < 50:
             print(f"⚠️ Article '{article.title}' has insufficient text for summarization")
             return None
         
         try:
             # Use smart summarization that only chunks when necessary
-            summary_text = self._smart_summarize(article.raw_text)
+            summary_text = self._smart_summarize(self._fit(text, self.input_budget, article.id))
             
             # Analyze sentiment and confidence for the generated summary
             try:
-                import json
-                raw = self.sentiment_chain.invoke({"summary_text": summary_text})
+                raw = cached_invoke(
+                    lambda: self.sentiment_chain.invoke({"summary_text": summary_text}),
+                    text=summary_text,
+                    prompt_template=SENTIMENT_PROMPT,
+                    llm=self.llm,
+                    validate=is_json,
+                )
                 data = json.loads(raw)
                 sentiment = str(data.get("sentiment", "neutral")).lower()
                 confidence = str(data.get("confidence", "medium")).lower()
-                if sentiment not in {"positive", "negative", "neutral", "mixed"}:
+                if sentiment not in SENTIMENTS:
                     sentiment = "neutral"
-                if confidence not in {"high", "medium", "low"}:
+                if confidence not in CONFIDENCES:
                     confidence = "medium"
             except Exception as e:
                 print(f"⚠️ Sentiment analysis failed, defaulting: {e}")
@@ -178,3 +347,60 @@ class SummarizerAgent:
         except Exception as e:
             print(f"❌ Failed to summarize article '{article.title}': {e}")
             return None
+
+    def summarize_combined(
+        self, article: Article, include_insights: bool = False
+    ) -> Tuple[Optional[ArticleSummary], Optional[ArticleInsight]]:
+        """Produces summary, sentiment and (optionally) insights with a single LLM call.
+
+        Falls back to the two-call summarize() path when the article is too long for one
+        request or the response does not validate; the insight is then None and should
+        be produced by InsightAgent.
+        """
+        print(f"📝 Summarizing (combined): {article.title}")
+
+        text = article_text(article)
+        if len(text.strip()) < 50:
+            print(f"⚠️ Article '{article.title}' has insufficient text for summarization")
+            return None, None
+
+        text = self._fit(text, self.combined_budget, article.id)
+        if estimate_tokens(text) > self.combined_budget:
+            print(f"📏 Article too long for a combined request (~{estimate_tokens(text)} tokens), using separate calls")
+            return self.summarize(article), None
+
+        template = COMBINED_INSIGHTS_PROMPT if include_insights else COMBINED_PROMPT
+        chain = self.combined_insights_chain if include_insights else self.combined_chain
+        inputs = {"title": article.title, "source": article.source, "article_text": text}
+        try:
+            raw = cached_invoke(
+                lambda: chain.invoke(inputs),
+                text="\n".join([article.title, article.source, text]),
+                prompt_template=template,
+                llm=self.llm,
+                validate=_has_summary,
+            )
+            data = json.loads(raw)
+            sentiment = str(data.get("sentiment", "neutral")).lower()
+            confidence = str(data.get("confidence", "medium")).lower()
+            summary = ArticleSummary.model_validate({
+                "article_id": article.id,
+                "summary": data["summary"].strip(),
+                "sentiment": sentiment if sentiment in SENTIMENTS else "neutral",
+                "sentiment_confidence": confidence if confidence in CONFIDENCES else "medium",
+            })
+            if not summary.summary:
+                raise ValueError("empty summary")
+        except Exception as e:
+            print(f"⚠️ Combined response unusable for '{article.title}', falling back to separate calls: {e}")
+            return self.summarize(article), None
+
+        insight = None
+        if include_insights:
+            insight = build_insight(article.id, {
+                "insights": data.get("insights") or [],
+                "categories": data.get("categories"),
+                "confidence": data.get("insight_confidence"),
+                "rationale": data.get("rationale"),
+            })
+        return summary, insight
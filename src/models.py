@@ -1,17 +1,40 @@
 # src/models.py
 from typing import List, Optional, Dict, Any, Annotated
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from datetime import datetime
+import os
+import uuid
 from langgraph.graph import add_messages
 
+MAX_STATE_MESSAGES = int(os.getenv("DIGEST_MAX_MESSAGES", "50"))
+
+
+def merge_side_effects(left: Dict[str, str], right: Dict[str, str]) -> Dict[str, str]:
+    """Reducer for DigestState.side_effects, which the calendar and Drive nodes update in parallel."""
+    return {**(left or {}), **(right or {})}
+
+
+def add_recent_messages(left: list, right: list) -> list:
+    """add_messages reducer that keeps only the most recent MAX_STATE_MESSAGES messages."""
+    return add_messages(left, right)[-MAX_STATE_MESSAGES:]
+
+
 class Article(BaseModel):
     """Model for a raw article fetched from the web."""
-    id: str = Field(default_factory=lambda: str(datetime.now().timestamp())) 
+    id: str = Field(default_factory=lambda: uuid.uuid4().hex)  # unique even when articles are built concurrently
     title: str
     url: str
     source: str
     published_date: Optional[str] = None
     raw_text: Optional[str] = None  
+    # Blob store key of the text once it has been moved out of the state (see src/utils/blob_store.py)
+    text_key: Optional[str] = None
+    # Case/whitespace-insensitive hash of the text, for the per-query history (see src/utils/query_history.py)
+    content_hash: Optional[str] = None
+    # BM25 relevance to the query, relative to the best candidate (1.0); None when ranking is off
+    relevance_score: Optional[float] = None
+    # Near-duplicate copies folded into this article by the curator ({"source", "url"})
+    duplicates: List[Dict[str, str]] = Field(default_factory=list)
 
 class ArticleSummary(BaseModel):
     """Model for the summarized output of an Article."""
@@ -31,22 +54,114 @@ class ArticleInsight(BaseModel):
     rationale: Optional[str] = None
 
 
+class ArticleResult(BaseModel):
+    """What the LLM nodes produced for one article; recorded per article so resumed runs can reuse it."""
+    summary: Optional[ArticleSummary] = None
+    insight: Optional[ArticleInsight] = None
+    # Too little text to process: nothing to retry
+    skipped: bool = False
+
+
+class ReportEntry(BaseModel):
+    """One article of a rendered report, with its summary and insights attached."""
+    article_id: str
+    title: str
+    url: str
+    source: str
+    published_date: Optional[str] = None
+    relevance_score: Optional[float] = None
+    duplicates: List[Dict[str, str]] = Field(default_factory=list)
+    summary: Optional[str] = None
+    sentiment: Optional[str] = None
+    sentiment_confidence: Optional[str] = None
+    insights: List[str] = Field(default_factory=list)
+    categories: List[str] = Field(default_factory=list)
+    # Hash of the article text (see Article.content_hash); part of the report id, unlike article_id
+    content_hash: Optional[str] = None
+    # False for items carried forward from an earlier digest of the same query
+    is_new: bool = True
+
+
+class DigestReport(BaseModel):
+    """Format-independent report model; every output format is rendered from it."""
+    title: str
+    query: str
+    generated_at: str
+    entries: List[ReportEntry] = Field(default_factory=list)
+    # Incremental digest: new entries and carried-forward ones are shown in separate sections
+    incremental: bool = False
+
+
 class DigestState(BaseModel):
     """The shared state for the daily digest workflow."""
     # The input from the user/trigger
     query: str = "top technology news"
     max_articles: int = 5
+    # Number of articles the summarizer/insight nodes process concurrently
+    llm_workers: int = 4
+    # Checkpoint thread id; a run can be resumed by it (see src/pipelines/checkpoints.py)
+    run_id: str = ""
+    # Incremental mode: skip articles earlier digests of this query covered
+    incremental: bool = False
+    # ...and show the most recent earlier summaries after the new items
+    carry_forward: bool = False
     
     # The messages represent the sequence of events and results (for debugging/observability)
-    messages: Annotated[list, add_messages] = Field(default_factory=list)
+    messages: Annotated[list, add_recent_messages] = Field(default_factory=list)
     
     # The core data produced by each node/agent
     articles: List[Article] = Field(default_factory=list)
     summaries: List[ArticleSummary] = Field(default_factory=list)
     insights: List[ArticleInsight] = Field(default_factory=list)
+    # Earlier items carried forward in incremental mode (already summarized; the LLM nodes never see them)
+    previous_entries: List[ReportEntry] = Field(default_factory=list)
     
     # The final output
     report_markdown: str = ""
     report_path: str = ""
+    # Content hash of the report model; other formats are served from the report store by it
+    report_id: str = ""
     drive_file_id: str = ""
+    # Background Drive upload; its file id is reported by /api/drive-uploads/<id> once known
+    drive_upload_id: str = ""
+    calendar_event_id: str = ""
+    # Side effect kind ("calendar", "drive") -> its id in the outbox (see src/pipelines/outbox.py)
+    side_effects: Annotated[Dict[str, str], merge_side_effects] = Field(default_factory=dict)
+
+    # Timing/token report of the run (see src/utils/metrics.py)
+    run_report: Dict[str, Any] = Field(default_factory=dict)
+
+
+class ArticleView(BaseModel):
+    """An article as returned by the API (text only as an opt-in excerpt)."""
+    id: str
+    title: str
+    url: str
+    source: str
+    published_date: Optional[str] = None
+    relevance_score: Optional[float] = None
+    duplicates: List[Dict[str, str]] = Field(default_factory=list)
+    raw_text: Optional[str] = None
+
+
+class DigestResponse(BaseModel):
+    """The API representation of a finished digest; endpoints select fields and pages from it."""
+    query: str
+    run_id: str = ""
+    articles_count: int
+    articles: List[ArticleView] = Field(default_factory=list)
+    summaries: List[ArticleSummary] = Field(default_factory=list)
+    insights: List[ArticleInsight] = Field(default_factory=list)
+    report_path: str = ""
+    report_id: str = ""
+    report_urls: Dict[str, str] = Field(default_factory=dict)
     calendar_event_id: str = ""
+    drive_file_id: str = ""
+    drive_upload_id: str = ""
+    drive_upload_url: str = ""
+    # Side effect kind -> status URL of the background Calendar event / Drive upload
+    side_effect_urls: Dict[str, str] = Field(default_factory=dict)
+    run_report: Dict[str, Any] = Field(default_factory=dict)
+    generated_at: str
+    # article id -> Article, for loading text excerpts only when they are requested
+    _articles: Dict[str, Article] = PrivateAttr(default_factory=dict)
@@ -0,0 +1,155 @@
+# src/pipelines/batch.py
+"""Runs many topic digests in one go, sharing downloads, LLM results and the dedup index.
+
+Usage:
+    python -m src.pipelines.batch "AI news" "climate tech" [--file queries.txt] [--articles 5]
+        [--concurrency 4] [--batch-id nightly-2024-06-01] [--incremental] [--json results.json]
+
+Re-running a batch with the same --batch-id resumes each digest from its last checkpoint,
+so an interrupted batch only redoes the work that had not finished. With --incremental,
+each digest only covers articles that earlier digests of its query did not.
+"""
+import argparse
+import contextvars
+import hashlib
+import json
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from src.pipelines.orchestrator import run_digest_pipeline
+from src.utils.dedup import duplicate_index_from_env, sharing_dedup_index
+from src.utils.singleflight import coalesce_key
+
+
+def default_batch_concurrency() -> int:
+    return max(1, int(os.getenv("BATCH_MAX_CONCURRENCY", "4")))
+
+
+def batch_run_id(batch_id: str, key: str) -> str:
+    """Checkpoint run id of one query of a batch, stable across re-runs of the same batch."""
+    return f"{batch_id}-{hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]}"
+
+
+def _run_one(
+    query: str, max_articles: int, llm_workers: Optional[int], run_id: Optional[str], **options: bool
+) -> Dict[str, Any]:
+    start = time.perf_counter()
+    run_id = run_id or uuid.uuid4().hex
+    try:
+        final_state = run_digest_pipeline(query, max_articles, llm_workers, run_id=run_id, **options)
+        return {"query": query, "status": "completed", "state": final_state, "run_id": run_id,
+                "seconds": round(time.perf_counter() - start, 3)}
+    except Exception as e:
+        # One failing topic must not take the rest of the batch down with it.
+        print(f"❌ Batch digest for '{query}' failed: {e}")
+        return {"query": query, "status": "failed", "error": str(e), "run_id": run_id,
+                "seconds": round(time.perf_counter() - start, 3)}
+
+
+def run_digest_batch(
+    queries: List[str],
+    max_articles: int = 5,
+    max_concurrent: Optional[int] = None,
+    llm_workers: Optional[int] = None,
+    batch_id: Optional[str] = None,
+    incremental: bool = False,
+    carry_forward: bool = True,
+) -> List[Dict[str, Any]]:
+    """Runs one digest per query, at most ``max_concurrent`` at a time, and returns results in query order.
+
+    Each query gets its own pipeline state and report; a failure is reported for that
+    query only. Across the batch, the curator shares downloads of the same URL and a
+    near-duplicate index, so a story matching several topics is scraped once and its
+    text is identical in every report; the LLM cache and gateway then summarize it once.
+    Download and LLM concurrency stay bounded globally by SCRAPE_MAX_CONCURRENCY and
+    the LLM gateway, however many queries run at once. With a ``batch_id``, each query's
+    run id is derived from it, so calling again with the same id resumes unfinished runs.
+    """
+    unique: Dict[str, str] = {}
+    for query in queries:
+        unique.setdefault(coalesce_key(query, max_articles), query)
+    workers = min(max_concurrent or default_batch_concurrency(), max(1, len(unique)))
+    print(f"📚 Running {len(unique)} digests ({len(queries)} requested) with {workers} at a time")
+
+    start = time.perf_counter()
+    with sharing_dedup_index(duplicate_index_from_env()):
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="digest-batch") as pool:
+            futures = {
+                key: pool.submit(
+                    contextvars.copy_context().run, _run_one, query, max_articles, llm_workers,
+                    batch_run_id(batch_id, key) if batch_id else None,
+                    incremental=incremental, carry_forward=carry_forward,
+                )
+                for key, query in unique.items()
+            }
+            results = {key: future.result() for key, future in futures.items()}
+
+    completed = sum(1 for r in results.values() if r["status"] == "completed")
+    print(f"✅ Batch finished: {completed}/{len(results)} digests in {time.perf_counter() - start:.1f}s")
+    return [{**results[coalesce_key(query, max_articles)], "query": query} for query in queries]
+
+
+def _summary(result: Dict[str, Any]) -> Dict[str, Any]:
+    state = result.get("state") or {}
+    return {
+        "query": result["query"],
+        "status": result["status"],
+        "seconds": result["seconds"],
+        "error": result.get("error"),
+        "run_id": result.get("run_id"),
+        "articles": len(state.get("articles", [])),
+        "report_path": state.get("report_path", ""),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("queries", nargs="*", help="digest topics")
+    parser.add_argument("--file", help="file with one query per line")
+    parser.add_argument("--articles", type=int, default=5, help="articles per digest")
+    parser.add_argument("--concurrency", type=int, default=None, help="digests run at once (BATCH_MAX_CONCURRENCY)")
+    parser.add_argument("--llm-workers", type=int, default=None)
+    parser.add_argument("--batch-id", help="name of this batch; re-run with the same id to resume it")
+    parser.add_argument("--incremental", action="store_true", help="only cover articles earlier digests did not")
+    parser.add_argument("--no-carry-forward", dest="carry_forward", action="store_false",
+                        help="with --incremental, leave earlier summaries out of the report")
+    parser.add_argument("--json", dest="json_path", help="write a per-query summary to this file")
+    args = parser.parse_args()
+
+    queries = list(args.queries)
+    if args.file:
+        with open(args.file) as f:
+            queries += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    if not queries:
+        parser.error("no queries given")
+
+    results = [_summary(r) for r in run_digest_batch(
+        queries, args.articles, args.concurrency, args.llm_workers, args.batch_id,
+        incremental=args.incremental, carry_forward=args.carry_forward,
+    )]
+    # Drive uploads run in the background; let them finish before the process exits.
+    from src.pipelines.outbox import get_outbox
+    outbox = get_outbox()
+    if outbox is not None and outbox.pending():
+        print("📤 Waiting for Calendar events and Drive uploads to finish...")
+        outbox.drain()
+    from src.pipelines.uploads import get_upload_queue
+    uploads = get_upload_queue()
+    if uploads is not None and uploads.pending():
+        print("📤 Waiting for Drive uploads to finish...")
+        uploads.drain()
+    print(f"\n{'status':<10} {'seconds':>8} {'articles':>8}  query -> report")
+    for r in results:
+        print(f"{r['status']:<10} {r['seconds']:>8.1f} {r['articles']:>8}  {r['query']} -> {r['report_path'] or r['error']}")
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+    if any(r["status"] != "completed" for r in results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+# src/pipelines/calendar_sink.py
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.agents.calendar_agent import event_id_for
+
+
+class _Submission:
+    def __init__(self, calendar_id: str, report_id: str, report_name: str, generation_time: datetime, event_id: str):
+        self.calendar_id = calendar_id
+        self.report_id = report_id
+        self.report_name = report_name
+        self.generation_time = generation_time
+        self.event_id = event_id
+        self.future: "Future[str]" = Future()
+
+
+class CalendarSink:
+    """Creates the Calendar events of finished reports in batch HTTP requests, exactly once each.
+
+    Reports submitted within ``batch_window`` seconds of each other are sent together,
+    one batch request per calendar. Event ids are derived from the report id (or, with
+    ``merge_daily``, from the day), so a retried or re-run report maps to the same event;
+    events already created are recorded in SQLite and not sent again, and an insert that
+    finds its id taken counts as done. With ``merge_daily``, all of a day's reports share
+    one all-day event whose description is updated as reports are added.
+
+    create() waits at most ``timeout`` seconds for an event, so a batch that never
+    settles fails its callers (and the outbox retries them) instead of holding them forever.
+    """
+
+    def __init__(
+        self,
+        agent: Callable[[], Any],
+        path: str,
+        batch_window: float = 0.2,
+        batch_size: int = 50,
+        merge_daily: bool = False,
+        timeout: float = 1200.0,
+    ):
+        self.agent = agent
+        self.timeout = timeout
+        self.path = path
+        self.batch_window = batch_window
+        self.batch_size = batch_size
+        self.merge_daily = merge_daily
+        self.sent = 0
+        self.skipped = 0
+        self.batches = 0
+        self._pending: "queue.Queue[_Submission]" = queue.Queue()
+        self._dispatcher: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS calendar_events (
+                calendar_id TEXT NOT NULL,
+                event_id TEXT NOT NULL,
+                reports TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (calendar_id, event_id)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def event_id(self, calendar_id: str, report_id: str, generation_time: datetime) -> str:
+        if self.merge_daily:
+            return event_id_for(f"{calendar_id}|day|{generation_time.date().isoformat()}")
+        return event_id_for(f"{calendar_id}|report|{report_id}")
+
+    def submit(
+        self, calendar_id: str, report_id: str, report_name: str, generation_time: datetime
+    ) -> "Future[str]":
+        """Queues the report's event; the future resolves to its event id once Calendar has it."""
+        item = _Submission(
+            calendar_id, report_id, report_name, generation_time,
+            self.event_id(calendar_id, report_id, generation_time),
+        )
+        with self._lock:
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._dispatch, name="calendar-sink", daemon=True)
+                self._dispatcher.start()
+        self._pending.put(item)
+        return item.future
+
+    def create(self, calendar_id: str, report_id: str, report_name: str, generation_time: datetime) -> str:
+        """Submits the report's event and waits for its id; raises TimeoutError after ``timeout`` seconds."""
+        future = self.submit(calendar_id, report_id, report_name, generation_time)
+        try:
+            return future.result(self.timeout)
+        except FutureTimeout:
+            raise TimeoutError(f"Calendar event for {report_name} not settled after {self.timeout:g}s") from None
+
+    def _dispatch(self) -> None:
+        while True:
+            batch = [self._pending.get()]
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._flush(batch)
+            except Exception as e:
+                print(f"❌ Calendar batch failed: {e}")
+                for item in batch:
+                    if not item.future.done():
+                        item.future.set_exception(e)
+
+    def _recorded(self, calendar_id: str, event_id: str) -> Optional[List[Dict[str, str]]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT reports FROM calendar_events WHERE calendar_id = ? AND event_id = ?", (calendar_id, event_id)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _record(self, calendar_id: str, event_id: str, reports: List[Dict[str, str]]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO calendar_events (calendar_id, event_id, reports, updated_at) VALUES (?, ?, ?, ?)",
+                (calendar_id, event_id, json.dumps(reports), time.time()),
+            )
+            self._conn.commit()
+
+    def _flush(self, batch: List[_Submission]) -> None:
+        groups: Dict[Tuple[str, str], List[_Submission]] = {}
+        for item in batch:
+            groups.setdefault((item.calendar_id, item.event_id), []).append(item)
+
+        # (calendar id) -> requests, and the report list each event will have once sent
+        requests: Dict[str, List[Tuple[str, str, dict]]] = {}
+        planned: Dict[Tuple[str, str], Tuple[bool, List[Dict[str, str]]]] = {}
+        agent = self.agent()
+        for (calendar_id, event_id), items in groups.items():
+            recorded = self._recorded(calendar_id, event_id)
+            reports = list(recorded or [])
+            known = {r["report_id"] for r in reports}
+            for item in items:
+                if item.report_id not in known:
+                    known.add(item.report_id)
+                    reports.append({"report_id": item.report_id, "name": item.report_name,
+                                    "time": item.generation_time.isoformat(timespec="seconds")})
+            if recorded is not None and len(reports) == len(recorded):
+                with self._lock:
+                    self.skipped += len(items)
+                for item in items:
+                    item.future.set_result(event_id)
+                continue
+            first = items[0]
+            if self.merge_daily:
+                body = agent.daily_event(first.generation_time.date(), reports, event_id)
+            else:
+                body = agent.report_event(first.report_name, first.generation_time, event_id)
+            op = "insert" if recorded is None else "patch"
+            requests.setdefault(calendar_id, []).append((op, event_id, body))
+            planned[(calendar_id, event_id)] = (op == "insert", reports)
+
+        for calendar_id, calendar_requests in requests.items():
+            results = agent.send_events(calendar_id, calendar_requests)
+            with self._lock:
+                self.batches += 1
+                self.sent += len(calendar_requests)
+            retry = []
+            for op, event_id, body in calendar_requests:
+                status = results.get(event_id, "no response")
+                if status == "exists" and self.merge_daily:
+                    # The day's event exists but this store has no record of it: add to what it lists
+                    try:
+                        reports = planned[(calendar_id, event_id)][1]
+                        known = {r["report_id"] for r in reports}
+                        reports += [r for r in agent.daily_reports(calendar_id, event_id) if r["report_id"] not in known]
+                        day = groups[(calendar_id, event_id)][0].generation_time.date()
+                        retry.append(("patch", event_id, agent.daily_event(day, reports)))
+                        continue
+                    except Exception as e:
+                        status = f"could not read the existing event: {e}"
+                self._settle(calendar_id, event_id, status, planned, groups)
+            if retry:
+                results = agent.send_events(calendar_id, retry)
+                for _, event_id, _ in retry:
+                    self._settle(calendar_id, event_id, results.get(event_id, "no response"), planned, groups)
+
+    def _settle(self, calendar_id, event_id, status, planned, groups) -> None:
+        items = groups[(calendar_id, event_id)]
+        if status in ("created", "updated", "exists"):
+            self._record(calendar_id, event_id, planned[(calendar_id, event_id)][1])
+            print(f"✅ Calendar event {event_id} {status}")
+            for item in items:
+                item.future.set_result(event_id)
+            return
+        error = RuntimeError(f"Calendar event {event_id} failed: {status}")
+        for item in items:
+            item.future.set_exception(error)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            events = self._conn.execute("SELECT COUNT(*) FROM calendar_events").fetchone()[0]
+            return {"sent": self.sent, "skipped": self.skipped, "batches": self.batches, "events": events}
+
+
+_shared_sink: Optional[CalendarSink] = None
+_shared_lock = threading.Lock()
+
+
+def get_calendar_sink() -> Optional[CalendarSink]:
+    """Returns the process-wide calendar sink, or None when CALENDAR_SINK_ENABLED=0."""
+    global _shared_sink
+    if os.getenv("CALENDAR_SINK_ENABLED", "1") == "0":
+        return None
+    with _shared_lock:
+        if _shared_sink is None:
+            from src.pipelines.orchestrator import get_agent
+            _shared_sink = CalendarSink(
+                agent=lambda: get_agent("calendar"),
+                path=os.getenv("CALENDAR_EVENTS_PATH", "data/cache/calendar_events.sqlite"),
+                batch_window=float(os.getenv("CALENDAR_BATCH_WINDOW", "0.2")),
+                merge_daily=os.getenv("CALENDAR_MERGE_DAILY", "0") == "1",
+                # Defaults to twice the outbox lease, which keeps being renewed while an effect waits
+                timeout=float(os.getenv("CALENDAR_SINK_TIMEOUT", str(2 * float(os.getenv("SIDE_EFFECTS_LEASE", "600"))))),
+            )
+        return _shared_sink
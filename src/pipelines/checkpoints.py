@@ -0,0 +1,201 @@
+# src/pipelines/checkpoints.py
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from src.models import Article, ArticleResult
+from src.utils.concurrency import map_concurrently
+
+
+class RunStore:
+    """Durable bookkeeping for resumable digest runs, in the same SQLite file as the LangGraph checkpoints.
+
+    LangGraph checkpoints the state after every node; this store adds the finer grain
+    the LLM nodes need: each article's result is written as soon as it finishes, so a
+    run that dies halfway through the summarizer only redoes the articles still missing.
+    Runs (and their checkpoints) older than ``max_age_seconds`` are purged.
+    """
+
+    def __init__(self, path: str, max_age_seconds: float = 7 * 86400):
+        self.path = path
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # Survives a crashed process (only an OS crash can lose the last commits) at far fewer fsyncs.
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS digest_runs (
+                run_id TEXT PRIMARY KEY,
+                query TEXT NOT NULL,
+                max_articles INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                incremental INTEGER,
+                carry_forward INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS article_progress (
+                run_id TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                article_id TEXT NOT NULL,
+                status TEXT NOT NULL,
+                result TEXT NOT NULL,
+                attempts INTEGER NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (run_id, stage, article_id)
+            );
+            """
+        )
+        # Stores created before the run options were recorded get the columns, NULL for their old runs
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(digest_runs)")}
+        for column in ("incremental", "carry_forward"):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE digest_runs ADD COLUMN {column} INTEGER")
+        self._conn.commit()
+        self._checkpointer = None
+
+    def checkpointer(self):
+        """The LangGraph SqliteSaver sharing this store's database file."""
+        with self._lock:
+            if self._checkpointer is None:
+                from langgraph.checkpoint.sqlite import SqliteSaver
+                self._checkpointer = SqliteSaver(sqlite3.connect(self.path, check_same_thread=False))
+            return self._checkpointer
+
+    def register_run(
+        self, run_id: str, query: str, max_articles: int, incremental: bool = False, carry_forward: bool = True
+    ) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO digest_runs "
+                "(run_id, query, max_articles, created_at, incremental, carry_forward) VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, query, max_articles, time.time(), int(incremental), int(carry_forward)),
+            )
+            self._conn.commit()
+
+    def get_run(self, run_id: str) -> Optional[Dict[str, object]]:
+        """A run's query, article count and mode options; an option is None for runs registered before it was stored."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT query, max_articles, created_at, incremental, carry_forward FROM digest_runs WHERE run_id = ?",
+                (run_id,),
+            ).fetchone()
+        if not row:
+            return None
+        return {
+            "run_id": run_id, "query": row[0], "max_articles": row[1], "created_at": row[2],
+            "incremental": None if row[3] is None else bool(row[3]),
+            "carry_forward": None if row[4] is None else bool(row[4]),
+        }
+
+    def completed(self, run_id: str, stage: str) -> Dict[str, ArticleResult]:
+        """Results already recorded as done for a run's stage, by article id."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT article_id, result FROM article_progress WHERE run_id = ? AND stage = ? AND status = 'done'",
+                (run_id, stage),
+            ).fetchall()
+        return {article_id: ArticleResult.model_validate_json(result) for article_id, result in rows}
+
+    def record(self, run_id: str, stage: str, article_id: str, result: ArticleResult, done: bool, attempts: int) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO article_progress "
+                "(run_id, stage, article_id, status, result, attempts, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (run_id, stage, article_id, "done" if done else "failed", result.model_dump_json(), attempts, time.time()),
+            )
+            self._conn.commit()
+
+    def failed_count(self, run_id: str) -> int:
+        """Articles of a run whose last attempt, in any stage, did not succeed."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM article_progress WHERE run_id = ? AND status = 'failed'", (run_id,)
+            ).fetchone()[0]
+
+    def purge_expired(self) -> None:
+        if not self.max_age_seconds:
+            return
+        with self._lock:
+            expired = [row[0] for row in self._conn.execute(
+                "SELECT run_id FROM digest_runs WHERE created_at < ?", (time.time() - self.max_age_seconds,)
+            )]
+            for run_id in expired:
+                self._conn.execute("DELETE FROM article_progress WHERE run_id = ?", (run_id,))
+                self._conn.execute("DELETE FROM digest_runs WHERE run_id = ?", (run_id,))
+            self._conn.commit()
+        for run_id in expired:
+            self.checkpointer().delete_thread(run_id)
+
+
+_shared_store: Optional[RunStore] = None
+_shared_lock = threading.Lock()
+
+
+def get_run_store() -> Optional[RunStore]:
+    """Returns the process-wide run store, or None when CHECKPOINTS_ENABLED=0."""
+    global _shared_store
+    if os.getenv("CHECKPOINTS_ENABLED", "1") == "0":
+        return None
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = RunStore(
+                path=os.getenv("CHECKPOINT_PATH", "data/cache/checkpoints.sqlite"),
+                max_age_seconds=float(os.getenv("CHECKPOINT_MAX_AGE", str(7 * 86400))),
+            )
+            _shared_store.purge_expired()
+            # Checkpointed states reference article texts by blob key, so old blobs go on the same schedule
+            from src.utils.blob_store import get_blob_store
+            blobs = get_blob_store()
+            if blobs:
+                blobs.purge_expired()
+        return _shared_store
+
+
+def map_articles_resumable(
+    stage: str,
+    run_id: str,
+    articles: List[Article],
+    fn: Callable[[Article], ArticleResult],
+    succeeded: Callable[[ArticleResult], bool],
+    max_workers: Optional[int] = None,
+) -> List[ArticleResult]:
+    """Runs ``fn`` for every article not already done in this run, recording each result as it finishes.
+
+    An attempt that raises, or whose result does not satisfy ``succeeded`` (the agents
+    catch LLM errors and return no summary or insight), is retried in place up to
+    ARTICLE_MAX_ATTEMPTS times, waiting ARTICLE_RETRY_DELAY x attempt seconds. An
+    article that never succeeds is recorded as failed and retried when the run is resumed.
+    """
+    store = get_run_store() if run_id else None
+    done = store.completed(run_id, stage) if store else {}
+    if done:
+        print(f"⏯️ {stage}: reusing {len(done)} of {len(articles)} articles finished before the run was interrupted")
+    attempts = max(1, int(os.getenv("ARTICLE_MAX_ATTEMPTS", "2")))
+    delay = float(os.getenv("ARTICLE_RETRY_DELAY", "1"))
+
+    def run(article: Article) -> ArticleResult:
+        if article.id in done:
+            return done[article.id]
+        result, ok = ArticleResult(), False
+        for attempt in range(1, attempts + 1):
+            try:
+                result = fn(article)
+                ok = succeeded(result)
+                if ok:
+                    break
+                print(f"⚠️ {stage} attempt {attempt} produced no result for '{article.title}'")
+            except Exception as e:
+                print(f"⚠️ {stage} attempt {attempt} failed for '{article.title}': {e}")
+                result = ArticleResult()
+            if attempt < attempts:
+                time.sleep(delay * attempt)
+        if store:
+            store.record(run_id, stage, article.id, result, ok, attempt)
+        return result
+
+    return map_concurrently(run, articles, max_workers)
@@ -0,0 +1,323 @@
+# src/pipelines/jobs.py
+import contextvars
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.utils.singleflight import coalesce_key
+
+
+class JobQueueFull(Exception):
+    """Raised when a digest job is submitted while the queue is at capacity."""
+
+
+class DigestJob:
+    """A digest pipeline run tracked by the job manager."""
+
+    def __init__(
+        self,
+        query: str,
+        max_articles: int,
+        job_id: Optional[str] = None,
+        incremental: bool = False,
+        carry_forward: bool = True,
+    ):
+        # The job id doubles as the pipeline's checkpoint run id, so a failed job can be resumed
+        self.id = job_id or uuid.uuid4().hex
+        self.key = coalesce_key(query, max_articles, incremental, carry_forward)
+        self.query = query
+        self.max_articles = max_articles
+        self.incremental = incremental
+        self.carry_forward = carry_forward
+        self.status = "queued"  # queued | running | completed | failed
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.completed_nodes: List[str] = []
+        self.events: List[Dict[str, Any]] = []
+        self.result: Any = None  # whatever the manager's serialize() returned
+        self.error: Optional[str] = None
+        self._changed = threading.Condition(threading.RLock())
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    def set_status(self, status: str, **fields: Any) -> None:
+        """Updates the status and records a status event atomically (so streams never miss the last one)."""
+        with self._changed:
+            self.status = status
+            if status == "running":
+                self.started_at = time.time()
+            elif status in ("completed", "failed"):
+                self.finished_at = time.time()
+            self.add_event({"type": "status", "status": status, **fields})
+
+    def add_event(self, event: Dict[str, Any]) -> None:
+        with self._changed:
+            event = {"seq": len(self.events), "time": time.time(), **event}
+            self.events.append(event)
+            self._changed.notify_all()
+
+    def wait_for_events(self, since: int, timeout: float) -> List[Dict[str, Any]]:
+        """Blocks until events newer than `since` exist (or timeout) and returns them."""
+        with self._changed:
+            if len(self.events) <= since and not self.done:
+                self._changed.wait(timeout)
+            return self.events[since:]
+
+    def to_dict(
+        self, include_result: bool = True, result_view: Optional[Callable[[Any], Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """JSON-ready job status; ``result_view`` turns the stored result into what the caller asked for."""
+        data = {
+            "job_id": self.id,
+            "query": self.query,
+            "articles": self.max_articles,
+            "incremental": self.incremental,
+            "status": self.status,
+            "completed_nodes": list(self.completed_nodes),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+        if include_result and self.status == "completed":
+            data["result"] = result_view(self.result) if result_view else self.result
+        return data
+
+
+def _describe_update(node: str, update: Dict[str, Any]) -> str:
+    """Short human-readable progress message for a node's state update."""
+    if "articles" in update:
+        return f"Fetched {len(update['articles'])} articles"
+    if "summaries" in update:
+        return f"Summarized {len(update['summaries'])} articles"
+    if "insights" in update:
+        return f"Extracted insights for {len(update['insights'])} articles"
+    if update.get("report_path"):
+        return "PDF report generated"
+    return f"{node} finished"
+
+
+class DigestJobManager:
+    """Runs digest pipelines on a bounded worker pool with a bounded queue.
+
+    At most ``max_workers`` pipelines run at once and at most ``max_queue`` more may
+    wait; further submissions raise JobQueueFull so callers can apply backpressure.
+    Finished jobs are kept for ``result_ttl`` seconds.
+
+    Submitting a query identical (after normalization) to one that is queued or running
+    returns that job instead of starting another, and a job that completed within the
+    last ``reuse_ttl`` seconds is handed out again as well.
+
+    A batch (submit_batch) is one job per distinct query, admitted into the same queue
+    all at once or not at all.
+    """
+
+    def __init__(
+        self,
+        runner: Callable[..., Dict[str, Any]],
+        serialize: Callable[[Any, str], Dict[str, Any]],
+        max_workers: int = 2,
+        max_queue: int = 8,
+        result_ttl: float = 3600,
+        total_steps: int = 0,
+        reuse_ttl: float = 300,
+    ):
+        self.runner = runner
+        self.reuse_ttl = reuse_ttl
+        self.total_steps = total_steps
+        self.serialize = serialize
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="digest-job")
+        self._jobs: Dict[str, DigestJob] = {}
+        self._batches: Dict[str, List[Tuple[str, str]]] = {}  # batch id -> (query, job id) in request order
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        """Jobs that may be queued or running at once."""
+        return self.max_workers + self.max_queue
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if not job.done)
+
+    def submit(self, query: str, max_articles: int, incremental: bool = False, carry_forward: bool = True) -> DigestJob:
+        with self._lock:
+            self._prune()
+            existing = self._find_reusable(coalesce_key(query, max_articles, incremental, carry_forward))
+            if existing:
+                print(f"🔗 Attaching to existing digest job {existing.id} ({existing.status})")
+                return existing
+            pending = self._check_capacity()
+            job = DigestJob(query, max_articles, incremental=incremental, carry_forward=carry_forward)
+            self._jobs[job.id] = job
+            return self._enqueue(job, pending)
+
+    def submit_batch(
+        self,
+        queries: List[str],
+        max_articles: int,
+        batch_id: Optional[str] = None,
+        incremental: bool = False,
+        carry_forward: bool = True,
+    ) -> Tuple[str, List[Tuple[str, DigestJob]]]:
+        """Queues one job per distinct query; returns the batch id and (query, job) pairs in query order.
+
+        Raises JobQueueFull unless the whole batch fits the queue. As in run_digest_batch,
+        the batch's digests share one near-duplicate index, and a job's id is the run id
+        derived from ``batch_id``: submitting the same batch id again returns its jobs that
+        are queued, running or completed and resumes the failed ones from their checkpoints.
+        """
+        from src.pipelines.batch import batch_run_id
+        from src.utils.dedup import duplicate_index_from_env, sharing_dedup_index
+        batch_id = batch_id or uuid.uuid4().hex
+        with self._lock:
+            self._prune()
+            job_ids: Dict[str, str] = {}
+            queued: List[DigestJob] = []
+            for query in queries:
+                key = coalesce_key(query, max_articles)
+                if key in job_ids:
+                    continue
+                job_ids[key] = batch_run_id(batch_id, key)
+                job = self._jobs.get(job_ids[key])
+                if job is None:
+                    queued.append(DigestJob(
+                        query, max_articles, job_id=job_ids[key], incremental=incremental, carry_forward=carry_forward,
+                    ))
+                elif job.status == "failed":
+                    queued.append(job)
+            pending = sum(1 for job in self._jobs.values() if not job.done)
+            if pending + len(queued) > self.capacity:
+                raise JobQueueFull(f"{pending} digest jobs already queued or running, the batch needs {len(queued)} more")
+            with sharing_dedup_index(duplicate_index_from_env()):
+                for job in queued:
+                    job.error = None
+                    job.completed_nodes = []
+                    self._jobs[job.id] = job
+                    # Each job runs in its own copy of this context, which carries the shared index
+                    self._enqueue(job, pending, contextvars.copy_context())
+                    pending += 1
+            items = [(query, job_ids[coalesce_key(query, max_articles)]) for query in queries]
+            self._batches[batch_id] = items
+            return batch_id, [(query, self._jobs[job_id]) for query, job_id in items]
+
+    def get_batch(self, batch_id: str) -> Optional[List[Tuple[str, Optional[DigestJob]]]]:
+        """(query, job) pairs of a batch, with None for jobs already pruned; None for an unknown batch."""
+        with self._lock:
+            items = self._batches.get(batch_id)
+            return [(query, self._jobs.get(job_id)) for query, job_id in items] if items is not None else None
+
+    def resume(
+        self, job_id: str, query: str, max_articles: int, incremental: bool = False, carry_forward: bool = True
+    ) -> DigestJob:
+        """Re-queues a failed job (or one lost in a restart) so it continues from its last checkpoint.
+
+        A job that is still queued, running or completed is returned as is. The options only
+        apply to a job rebuilt after a restart; a job still in memory keeps its own.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job and job.status != "failed":
+                return job
+            pending = self._check_capacity()
+            if job is None:
+                job = DigestJob(query, max_articles, job_id=job_id, incremental=incremental, carry_forward=carry_forward)
+                self._jobs[job.id] = job
+            job.error = None
+            job.completed_nodes = []
+            # Queued before the lock is released, so a concurrent resume sees it and does not enqueue it again
+            return self._enqueue(job, pending)
+
+    def _check_capacity(self) -> int:
+        pending = sum(1 for job in self._jobs.values() if not job.done)
+        if pending >= self.capacity:
+            raise JobQueueFull(f"{pending} digest jobs already queued or running")
+        return pending
+
+    def _enqueue(self, job: DigestJob, pending: int, context: Optional[contextvars.Context] = None) -> DigestJob:
+        """Marks the job queued and hands it to the pool (in ``context``, if given); called with the lock held."""
+        job.set_status("queued", queue_position=max(0, pending - self.max_workers + 1))
+        if context is not None:
+            self._executor.submit(context.run, self._run, job)
+        else:
+            self._executor.submit(self._run, job)
+        return job
+
+    def _find_reusable(self, key: str) -> Optional[DigestJob]:
+        now = time.time()
+        for job in self._jobs.values():
+            if job.key != key or job.status == "failed":
+                continue
+            if not job.done or (job.finished_at or 0) >= now - self.reuse_ttl:
+                return job
+        return None
+
+    def get(self, job_id: str) -> Optional[DigestJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stream_events(self, job: DigestJob, heartbeat: float = 15.0) -> Iterator[Optional[Dict[str, Any]]]:
+        """Yields job events as they happen until the job finishes; yields None as a heartbeat."""
+        seen = 0
+        while True:
+            events = job.wait_for_events(seen, timeout=heartbeat)
+            if not events:
+                yield None
+            for event in events:
+                yield event
+            seen += len(events)
+            if job.done and seen >= len(job.events):
+                return
+
+    def _run(self, job: DigestJob) -> None:
+        job.set_status("running")
+
+        def on_progress(node: str, update: Dict[str, Any]) -> None:
+            job.completed_nodes.append(node)
+            job.add_event({
+                "type": "progress",
+                "node": node,
+                "message": _describe_update(node, update),
+                "completed": len(job.completed_nodes),
+                "total": self.total_steps,
+            })
+
+        try:
+            final_state = self.runner(
+                job.query, job.max_articles, on_progress=on_progress, run_id=job.id,
+                incremental=job.incremental, carry_forward=job.carry_forward,
+            )
+            job.result = self.serialize(final_state, job.query)
+            job.set_status("completed")
+        except Exception as e:
+            print(f"❌ Digest job {job.id} failed: {e}")
+            job.error = str(e)
+            job.set_status("failed", error=job.error)
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.result_ttl
+        for job_id in [j.id for j in self._jobs.values() if j.done and (j.finished_at or 0) < cutoff]:
+            del self._jobs[job_id]
+        for batch_id in [b for b, items in self._batches.items() if not any(j in self._jobs for _, j in items)]:
+            del self._batches[batch_id]
+
+
+def job_manager_from_env(runner, serialize, total_steps: int = 0) -> DigestJobManager:
+    return DigestJobManager(
+        runner=runner,
+        serialize=serialize,
+        total_steps=total_steps,
+        max_workers=max(1, int(os.getenv("DIGEST_JOB_WORKERS", "2"))),
+        max_queue=max(0, int(os.getenv("DIGEST_JOB_QUEUE", "8"))),
+        result_ttl=float(os.getenv("DIGEST_JOB_TTL", "3600")),
+        reuse_ttl=float(os.getenv("DIGEST_RESULT_TTL", "300")),
+    )
@@ -1,23 +1,53 @@
 # src/orchestrator.py
-from typing import Literal
-from langgraph.graph import StateGraph, END
-from src.models import DigestState
-from src.agents.curator import CuratorAgent
-from src.agents.summarizer import SummarizerAgent
-from src.agents.insight_agent import InsightAgent
-from src.utils.pdf_generator import generate_daily_report
-from src.agents.drive_upload import DriveUploadAgent
-from src.agents.calendar_agent import CalendarAgent
 import os
+import threading
+import uuid
+from typing import TYPE_CHECKING, Any, Callable, Dict, Literal, Optional
+from src.utils.concurrency import default_llm_workers
+from src.utils.singleflight import SingleFlight, coalesce_key
+from src.utils.metrics import instrument_node, timed, track_run
 
-# Initialize the agents that will be our graph nodes
-curator_agent = CuratorAgent()
-summarizer_agent = SummarizerAgent()
-insight_agent = InsightAgent()
-drive_agent = DriveUploadAgent()
-calendar_agent = CalendarAgent()
+if TYPE_CHECKING:
+    from src.models import DigestState
 
-def curator_node(state: DigestState) -> dict:
+# Agents and the compiled graph are built on first use, so importing this module (and
+# app.py) doesn't pull in langchain, langgraph, newspaper, reportlab or the Google clients.
+_agents: Dict[str, Any] = {}
+_agents_lock = threading.Lock()
+_graph = None
+_graph_lock = threading.Lock()
+
+def _build_agent(name: str):
+    if name == "curator":
+        from src.agents.curator import CuratorAgent
+        return CuratorAgent()
+    if name == "summarizer":
+        from src.agents.summarizer import SummarizerAgent
+        return SummarizerAgent()
+    if name == "insight":
+        from src.agents.insight_agent import InsightAgent
+        return InsightAgent()
+    if name == "drive":
+        from src.agents.drive_upload import DriveUploadAgent
+        return DriveUploadAgent()
+    if name == "calendar":
+        from src.agents.calendar_agent import CalendarAgent
+        return CalendarAgent()
+    raise KeyError(f"Unknown agent: {name}")
+
+def get_agent(name: str):
+    """Returns the shared agent ("curator", "summarizer", "insight", "drive" or "calendar"), creating it on first use."""
+    with _agents_lock:
+        if name not in _agents:
+            _agents[name] = _build_agent(name)
+        return _agents[name]
+
+def set_agent(name: str, agent) -> None:
+    """Replaces a shared agent (e.g. with one wrapping a different LLM client)."""
+    with _agents_lock:
+        _agents[name] = agent
+
+def curator_node(state: "DigestState") -> dict:
     """Node function to fetch and parse articles."""
     print("\n" + "="*30)
     print("🤖 Curator Agent Working...")
@@ -25,28 +55,66 @@ def curator_node(state: DigestState) -> dict:
     
     # Get max_articles from state, default to 5 if not specified
     max_articles = getattr(state, 'max_articles', 5)
-    articles = curator_agent.fetch_articles(state.query, max_articles=max_articles)
-    return {"articles": articles}
+    from src.utils.query_history import get_query_history
+    history = get_query_history() if state.incremental else None
+    if history is None:
+        articles = get_agent("curator").fetch_articles(state.query, max_articles=max_articles)
+        previous = []
+    else:
+        # Incremental mode: only articles no earlier digest of this query covered go to the LLM nodes.
+        seen_urls, seen_hashes = history.seen(state.query)
+        print(f"🗂️ Incremental mode: {len(seen_urls)} articles already covered for this query")
+        articles = get_agent("curator").fetch_articles(
+            state.query, max_articles=max_articles, exclude_urls=seen_urls, exclude_hashes=seen_hashes
+        )
+        limit = int(os.getenv("INCREMENTAL_CARRY_FORWARD", "10"))
+        previous = history.previous(state.query, limit) if state.carry_forward else []
+        print(f"🆕 {len(articles)} new articles, {len(previous)} earlier summaries carried forward")
+    # Article bodies go to the blob store; the state only carries their keys from here on.
+    from src.utils.blob_store import offload_text
+    return {"articles": [offload_text(article) for article in articles], "previous_entries": previous}
+
+def _has_text(article) -> bool:
+    """Agents skip articles with under 50 characters of text without calling the LLM."""
+    from src.utils.blob_store import article_text
+    return len(article_text(article).strip()) >= 50
 
-def insights_node(state: DigestState) -> dict:
+def insights_node(state: "DigestState") -> dict:
     """Node function to extract actionable insights from full articles."""
     print("\n" + "="*30)
     print("💡 Insights Agent Working...")
     print("="*30)
 
-    new_insights = []
-    for article in state.articles:
-        result = insight_agent.analyze(article)
+    summarizer_agent = get_agent("summarizer")
+    insight_agent = get_agent("insight")
+    if summarizer_agent.mode == "combined" and summarizer_agent.combined_insights:
+        print("↪️ Insights are produced by the summarizer's combined request; nothing to do here.")
+        return {}
+
+    from src.models import ArticleResult
+    from src.pipelines.checkpoints import map_articles_resumable
+
+    def analyze(article):
+        if not _has_text(article):
+            return ArticleResult(skipped=True)
+        with timed("article", stage="insights", article_id=article.id):
+            result = insight_agent.analyze(article)
         if result:
-            new_insights.append(result)
             print(f"✅ Insights created for: {article.title}")
         else:
             print(f"⚠️ No insights produced for: {article.title}")
+        return ArticleResult(insight=result)
+
+    results = map_articles_resumable(
+        "insights", state.run_id, state.articles, analyze,
+        succeeded=lambda r: r.skipped or r.insight is not None, max_workers=state.llm_workers,
+    )
+    new_insights = [r.insight for r in results if r.insight]
 
     print(f"\n Insights: Created {len(new_insights)} insight records from {len(state.articles)} articles")
     return {"insights": new_insights}
 
-def summarizer_node(state: DigestState) -> dict:
+def summarizer_node(state: "DigestState") -> dict:
     """Node function to summarize all articles in the state."""
     print("\n" + "="*30)
     print("🤖 Summarizer Agent Working...")
@@ -56,48 +124,93 @@ def summarizer_node(state: DigestState) -> dict:
     for i, article in enumerate(state.articles):
         print(f"  {i+1}. {article.title} (ID: {article.id})")
     
-    new_summaries = []
+    # Drop duplicate articles before fanning out to the worker pool
+    unique_articles = []
     processed_article_ids = set()
-    
     for article in state.articles:
         if article.id in processed_article_ids:
             print(f"⚠️ Skipping duplicate article: {article.title} (ID: {article.id})")
             continue
-            
-        print(f"\n Processing article {len(new_summaries)+1}/{len(state.articles)}: {article.title}")
-        summary = summarizer_agent.summarize(article)
-        
+        processed_article_ids.add(article.id)
+        unique_articles.append(article)
+
+    summarizer_agent = get_agent("summarizer")
+    insight_agent = get_agent("insight")
+    combined = summarizer_agent.mode == "combined"
+    with_insights = combined and summarizer_agent.combined_insights
+
+    from src.models import ArticleResult
+    from src.pipelines.checkpoints import map_articles_resumable
+
+    def summarize(article):
+        if not _has_text(article):
+            print(f"⚠️ Article '{article.title}' has insufficient text for summarization")
+            return ArticleResult(skipped=True)
+        print(f"\n Processing article: {article.title}")
+        insight = None
+        with timed("article", stage="summarizer", article_id=article.id):
+            if combined:
+                summary, insight = summarizer_agent.summarize_combined(article, include_insights=with_insights)
+                if with_insights and insight is None:
+                    # The combined response had no usable insights; ask the insight agent directly.
+                    insight = insight_agent.analyze(article)
+            else:
+                summary = summarizer_agent.summarize(article)
         if summary:
-            new_summaries.append(summary)
-            processed_article_ids.add(article.id)
             print(f"✅ Summary created for: {article.title}")
         else:
             print(f"❌ Summary failed for article {article.id}: {article.title}")
-    
+        return ArticleResult(summary=summary, insight=insight)
+
+    results = map_articles_resumable(
+        "summarizer", state.run_id, unique_articles, summarize,
+        succeeded=lambda r: r.skipped or r.summary is not None, max_workers=state.llm_workers,
+    )
+    new_summaries = [r.summary for r in results if r.summary]
+
     print(f"\n Summary: Created {len(new_summaries)} summaries from {len(state.articles)} articles")
+    if with_insights:
+        return {"summaries": new_summaries, "insights": [r.insight for r in results if r.insight]}
     return {"summaries": new_summaries}
 
-def report_node(state: DigestState) -> dict:
-    """Generate the final PDF report from articles, summaries, and insights."""
+def _remember_coverage(state: "DigestState") -> None:
+    """Adds this digest's articles to the query history, so later incremental runs can skip them."""
+    from src.utils.query_history import get_query_history
+    history = get_query_history()
+    if history is None:
+        return
+    try:
+        history.record(state.query, state.articles, state.summaries, state.insights)
+    except Exception as e:
+        print(f"⚠️ Failed to update the query history: {e}")
+
+def report_node(state: "DigestState") -> dict:
+    """Build the report model and render its PDF and Markdown from the report store."""
     print("\n" + "="*30)
     print("📄 PDF Generator Working...")
     print("="*30)
 
     try:
-        report_path = generate_daily_report(
-            articles=state.articles,
-            summaries=state.summaries,
-            insights=state.insights,
-            output_dir="data/reports",
-            report_title=f"Daily Research Digest - {state.query}",
+        from src.utils.report_store import build_report, get_report_store
+        store = get_report_store()
+        report = build_report(
+            state.query, state.articles, state.summaries, state.insights,
+            previous=state.previous_entries, incremental=state.incremental,
         )
+        report_id = store.save(report)
+        # The PDF is needed right away by the calendar and Drive nodes; HTML is rendered on first view.
+        with timed("pdf_render"):
+            report_path = store.path(report_id, "pdf")
+        with open(store.path(report_id, "md"), encoding="utf-8") as f:
+            report_markdown = f.read()
         print(f"✅ Report generated at: {report_path}")
-        return {"report_path": report_path}
+        _remember_coverage(state)
+        return {"report_id": report_id, "report_path": report_path, "report_markdown": report_markdown}
     except Exception as e:
         print(f"❌ Failed to generate report: {e}")
         return {"report_path": ""}
 
-def calendar_node(state: DigestState) -> dict:
+def calendar_node(state: "DigestState") -> dict:
     """Create a calendar event for the completed report."""
     print("\n" + "="*30)
     print("📅 Calendar Agent Working...")
@@ -113,7 +226,22 @@ def calendar_node(state: DigestState) -> dict:
         report_name = os.path.basename(state.report_path)
         
         calendar_id = os.getenv("GOOGLE_CALENDAR_ID", "primary")
-        event_id = calendar_agent.create_report_event(
+        from src.pipelines.outbox import get_outbox
+        outbox = get_outbox()
+        if outbox is not None:
+            # Recorded and created in the background; the digest doesn't wait for Calendar
+            effect_id = outbox.enqueue("calendar", f"{calendar_id}|{state.report_id or report_name}", {
+                "calendar_id": calendar_id, "report_id": state.report_id or report_name,
+                "report_name": report_name, "generation_time": generation_time.isoformat(),
+            })
+            return {"side_effects": {"calendar": effect_id}}
+        from src.pipelines.calendar_sink import get_calendar_sink
+        sink = get_calendar_sink()
+        if sink is not None:
+            # Batched with other reports finishing now; the event id is derived from the report id
+            event_id = sink.create(calendar_id, state.report_id or report_name, report_name, generation_time)
+            return {"calendar_event_id": event_id}
+        event_id = get_agent("calendar").create_report_event(
             report_name=report_name,
             generation_time=generation_time,
             calendar_id=calendar_id
@@ -125,8 +253,8 @@ def calendar_node(state: DigestState) -> dict:
         print(f"❌ Calendar event creation failed: {e}")
         return {"calendar_event_id": ""}
 
-def drive_upload_node(state: DigestState) -> dict:
-    """Upload the generated report to Google Drive."""
+def drive_upload_node(state: "DigestState") -> dict:
+    """Upload the generated report to Google Drive (through the side-effect outbox unless SIDE_EFFECTS_OUTBOX=0)."""
     print("\n" + "="*30)
     print("☁️ Drive Upload Agent Working...")
     print("="*30)
@@ -135,39 +263,188 @@ def drive_upload_node(state: DigestState) -> dict:
         return {}
     try:
         drive_folder_id = os.getenv("GOOGLE_DRIVE_FOLDER_ID", "")
-        file_id = drive_agent.upload_report(state.report_path, drive_folder_id or None)
+        from src.pipelines.outbox import get_outbox
+        outbox = get_outbox()
+        if outbox is not None:
+            effect_id = outbox.enqueue("drive", f"{drive_folder_id}|{os.path.abspath(state.report_path)}", {
+                "report_path": state.report_path, "folder_id": drive_folder_id or None,
+            })
+            return {"side_effects": {"drive": effect_id}}
+        from src.pipelines.uploads import get_upload_queue
+        uploads = get_upload_queue()
+        if uploads is not None:
+            task = uploads.submit(state.report_path, drive_folder_id or None)
+            return {"drive_upload_id": task.id, "drive_file_id": task.file_id or ""}
+        file_id = get_agent("drive").upload_report(state.report_path, drive_folder_id or None)
         return {"drive_file_id": file_id or ""}
     except Exception as e:
         print(f"❌ Drive upload failed: {e}")
         return {"drive_file_id": ""}
 
 # --- Define the Graph ---
-workflow = StateGraph(DigestState)
-
-# Add the nodes
-workflow.add_node("curator", curator_node)
-workflow.add_node("insights", insights_node)
-workflow.add_node("summarizer", summarizer_node)
-workflow.add_node("report", report_node)
-workflow.add_node("calendar", calendar_node)
-workflow.add_node("drive_upload", drive_upload_node)
-
-# Define the flow: Start -> Curator -> Insights -> Summarizer -> Report -> Calendar -> Drive Upload -> End
-workflow.set_entry_point("curator")
-workflow.add_edge("curator", "insights")
-workflow.add_edge("insights", "summarizer")
-workflow.add_edge("summarizer", "report")
-workflow.add_edge("report", "calendar")
-workflow.add_edge("calendar", "drive_upload")
-workflow.add_edge("drive_upload", END)
-
-# Compile the graph
-app = workflow.compile()
-
-def run_digest_pipeline(query: str = "AI news", max_articles: int = 5) -> DigestState:
-    """Runs the compiled graph with an initial state."""
+def _build_graph():
+    from langgraph.graph import StateGraph, END
+    from src.models import DigestState
+
+    workflow = StateGraph(DigestState)
+
+    # Add the nodes (each one records its wall time, see src/utils/metrics.py)
+    workflow.add_node("curator", instrument_node("curator", curator_node))
+    workflow.add_node("insights", instrument_node("insights", insights_node))
+    workflow.add_node("summarizer", instrument_node("summarizer", summarizer_node))
+    workflow.add_node("report", instrument_node("report", report_node))
+    workflow.add_node("calendar", instrument_node("calendar", calendar_node))
+    workflow.add_node("drive_upload", instrument_node("drive_upload", drive_upload_node))
+
+    # Define the flow: Start -> Curator -> (Insights || Summarizer) -> Report -> (Calendar || Drive Upload) -> End
+    # Insights and Summarizer only read state.articles and write different keys, so they
+    # fan out from the curator in parallel and join again at the report. Calendar and
+    # Drive Upload only need the report, so they run side by side as the tail.
+    workflow.set_entry_point("curator")
+    workflow.add_edge("curator", "insights")
+    workflow.add_edge("curator", "summarizer")
+    workflow.add_edge(["insights", "summarizer"], "report")
+    workflow.add_edge("report", "calendar")
+    workflow.add_edge("report", "drive_upload")
+    workflow.add_edge("calendar", END)
+    workflow.add_edge("drive_upload", END)
+
+    # With a checkpointer the state is saved after every node, so a run can be resumed by its id.
+    from src.pipelines.checkpoints import get_run_store
+    store = get_run_store()
+    return workflow.compile(checkpointer=store.checkpointer() if store else None)
+
+def get_graph():
+    """Returns the compiled LangGraph workflow, building it on first use."""
+    global _graph
+    with _graph_lock:
+        if _graph is None:
+            _graph = _build_graph()
+        return _graph
+
+def __getattr__(name: str):
+    # Keeps `orchestrator.app` (the compiled graph) working for existing callers.
+    if name == "app":
+        return get_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Node names in execution order, used for progress reporting
+PIPELINE_NODES = ["curator", "insights", "summarizer", "report", "calendar", "drive_upload"]
+
+def _initial_state(
+    query: str, max_articles: int, llm_workers: Optional[int], run_id: str = "", **options: bool
+) -> "DigestState":
+    from src.models import DigestState
+    return DigestState(
+        query=query,
+        max_articles=max_articles,
+        llm_workers=llm_workers or default_llm_workers(),
+        run_id=run_id,
+        **options,
+    )
+
+def _start_run(query: str, max_articles: int, llm_workers: Optional[int], run_id: Optional[str], **options: bool):
+    """Returns (graph input, config): a fresh state, or None to resume the checkpointed run ``run_id``."""
+    from src.pipelines.checkpoints import get_run_store
+    store = get_run_store()
+    if store is None:
+        return _initial_state(query, max_articles, llm_workers, **options), None
+    run_id = run_id or uuid.uuid4().hex
+    config = {"configurable": {"thread_id": run_id}}
+    snapshot = get_graph().get_state(config)
+    if snapshot.values:
+        failed = store.failed_count(run_id)
+        if failed:
+            # The LLM nodes finished with articles still failed; rerun them from the curator's output.
+            # Their finished articles come from the run store, so only the failed ones call the LLM again.
+            config = get_graph().update_state(config, None, as_node="curator")
+            snapshot = get_graph().get_state(config)
+            print(f"🔁 Retrying {failed} failed article results of run {run_id}")
+        pending = ", ".join(snapshot.next) or "nothing left to do"
+        print(f"⏯️ Resuming run {run_id} ({pending})")
+        return None, config
+    store.register_run(run_id, query, max_articles, **options)
+    print(f"🆔 Run id: {run_id}")
+    return _initial_state(query, max_articles, llm_workers, run_id, **options), config
+
+def get_run(run_id: str) -> Optional[Dict[str, Any]]:
+    """The query, article count and mode options a checkpointed run was started with, or None if it is unknown."""
+    from src.pipelines.checkpoints import get_run_store
+    store = get_run_store()
+    return store.get_run(run_id) if store else None
+
+def stream_digest_pipeline(
+    query: str = "AI news",
+    max_articles: int = 5,
+    llm_workers: Optional[int] = None,
+    on_progress: Optional[Callable[[str, dict], None]] = None,
+    run_id: Optional[str] = None,
+    incremental: bool = False,
+    carry_forward: bool = True,
+) -> dict:
+    """Runs the compiled graph with app.stream, calling on_progress(node, update) as each node finishes.
+
+    Returns the final state values, like run_digest_pipeline. Passing the ``run_id`` of
+    an interrupted run resumes it from its last checkpoint.
+    """
+    print("🎯 Initializing LangGraph Workflow (streaming)...")
+    graph_input, config = _start_run(
+        query, max_articles, llm_workers, run_id, incremental=incremental, carry_forward=carry_forward
+    )
+    final_state = {}
+    # The run report carries the checkpoint run id, so metrics can be joined to the run and its job
+    with track_run(config["configurable"]["thread_id"] if config else None) as recorder:
+        for mode, chunk in get_graph().stream(graph_input, config, stream_mode=["updates", "values"]):
+            if mode == "values":
+                final_state = chunk
+            elif on_progress:
+                for node, update in chunk.items():
+                    on_progress(node, update or {})
+    final_state["run_report"] = recorder.report()
+    print("\n✅ Pipeline execution complete!")
+    return final_state
+
+def run_digest_pipeline(
+    query: str = "AI news",
+    max_articles: int = 5,
+    llm_workers: Optional[int] = None,
+    run_id: Optional[str] = None,
+    incremental: bool = False,
+    carry_forward: bool = True,
+) -> "DigestState":
+    """Runs the compiled graph with an initial state, or resumes the checkpointed run ``run_id``.
+
+    With ``incremental``, articles an earlier digest of the query already covered are
+    skipped, and (with ``carry_forward``) their earlier summaries are appended to the report.
+    """
     print("🎯 Initializing LangGraph Workflow...")
-    initial_state = DigestState(query=query, max_articles=max_articles)
-    final_state = app.invoke(initial_state)
+    graph_input, config = _start_run(
+        query, max_articles, llm_workers, run_id, incremental=incremental, carry_forward=carry_forward
+    )
+    # The run report carries the checkpoint run id, so metrics can be joined to the run and its job
+    with track_run(config["configurable"]["thread_id"] if config else None) as recorder:
+        final_state = get_graph().invoke(graph_input, config)
+    final_state["run_report"] = recorder.report()
     print("\n✅ Pipeline execution complete!")
     return final_state
+
+# Identical digest requests share one pipeline run; finished results are reused briefly
+digest_flights = SingleFlight(result_ttl=float(os.getenv("DIGEST_RESULT_TTL", "300")))
+
+def run_digest_pipeline_coalesced(
+    query: str = "AI news",
+    max_articles: int = 5,
+    llm_workers: Optional[int] = None,
+    incremental: bool = False,
+    carry_forward: bool = True,
+) -> "DigestState":
+    """Like run_digest_pipeline, but concurrent identical requests attach to one execution."""
+    final_state, shared = digest_flights.do(
+        coalesce_key(query, max_articles, incremental, carry_forward),
+        lambda: run_digest_pipeline(
+            query, max_articles, llm_workers, incremental=incremental, carry_forward=carry_forward
+        ),
+    )
+    if shared:
+        print(f"🔗 Reused an identical in-flight or recent digest for query: '{query}'")
+    return final_state
@@ -0,0 +1,334 @@
+# src/pipelines/outbox.py
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+# A handler gets the effect's payload and a ``progress(updates)`` callback that saves
+# updates to it (e.g. a Drive file id), so a retry continues instead of starting over.
+# It returns the effect's result and raises on failure.
+Handler = Callable[[Dict[str, Any], Callable[[Dict[str, Any]], None]], str]
+
+
+class SideEffectOutbox:
+    """Durable queue of a report's side effects (its Calendar event and Drive upload).
+
+    The pipeline records each side effect in SQLite and moves on, so a digest returns
+    once its PDF exists; ``workers`` threads run the recorded effects in the background.
+    A failed effect is retried with exponential backoff, up to ``max_attempts`` times,
+    after which it stays ``failed`` (with its error) until retried explicitly. Effects
+    are unique per (kind, key), so re-running a report does not repeat them. While an
+    effect runs, its worker renews its lease every ``lease`` / 3 seconds; an effect whose
+    lease lapsed (its process stopped) is picked up again.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        handlers: Dict[str, Handler],
+        workers: int = 4,
+        max_attempts: int = 5,
+        backoff: float = 2.0,
+        poll_interval: float = 5.0,
+        lease: float = 600.0,
+    ):
+        self.path = path
+        self.handlers = handlers
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self._threads: List[threading.Thread] = []
+        self._wakeup = threading.Condition()
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS side_effects (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                UNIQUE (kind, key)
+            );
+            CREATE INDEX IF NOT EXISTS side_effects_due ON side_effects (status, next_attempt_at);
+            """
+        )
+        self._conn.commit()
+
+    def enqueue(self, kind: str, key: str, payload: Dict[str, Any]) -> str:
+        """Records a side effect and returns its id; an effect already recorded for (kind, key) keeps its id."""
+        if kind not in self.handlers:
+            raise KeyError(f"Unknown side effect: {kind}")
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR IGNORE INTO side_effects
+                    (id, kind, key, payload, status, next_attempt_at, created_at, updated_at)
+                VALUES (?, ?, ?, ?, 'pending', ?, ?, ?)
+                """,
+                (uuid.uuid4().hex, kind, key, json.dumps(payload), now, now, now),
+            )
+            effect_id = self._conn.execute(
+                "SELECT id FROM side_effects WHERE kind = ? AND key = ?", (kind, key)
+            ).fetchone()[0]
+            self._conn.commit()
+        self._wake()
+        return effect_id
+
+    def get(self, effect_id: str) -> Optional[Dict[str, Any]]:
+        """The effect's status, with its payload (e.g. the Drive upload id once the upload is queued)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, kind, status, attempts, result, error, created_at, updated_at, payload "
+                "FROM side_effects WHERE id = ?",
+                (effect_id,),
+            ).fetchone()
+        if not row:
+            return None
+        return {**self._to_dict(row[:-1]), "payload": json.loads(row[-1])}
+
+    def recent(self, status: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """The most recently updated effects, optionally only those with ``status``."""
+        query = "SELECT id, kind, status, attempts, result, error, created_at, updated_at FROM side_effects"
+        params: tuple = ()
+        if status:
+            query += " WHERE status = ?"
+            params = (status,)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY updated_at DESC LIMIT ?", params + (limit,)).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    @staticmethod
+    def _to_dict(row) -> Dict[str, Any]:
+        keys = ("id", "kind", "status", "attempts", "result", "error", "created_at", "updated_at")
+        return dict(zip(keys, row))
+
+    def retry(self, effect_id: str) -> bool:
+        """Queues a failed effect again with a fresh set of attempts; False if it is not failed."""
+        with self._lock:
+            updated = self._conn.execute(
+                """
+                UPDATE side_effects SET status = 'pending', attempts = 0, next_attempt_at = ?, updated_at = ?
+                WHERE id = ? AND status = 'failed'
+                """,
+                (time.time(), time.time(), effect_id),
+            ).rowcount
+            self._conn.commit()
+        if updated:
+            self._wake()
+        return bool(updated)
+
+    def start(self) -> None:
+        """Starts the worker threads (once)."""
+        with self._lock:
+            if self._threads:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"side-effects-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def pending(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM side_effects WHERE status IN ('pending', 'running')"
+            ).fetchone()[0]
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Waits until no effect is pending or running (failed ones don't count); False on timeout."""
+        self.start()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.pending():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def _wake(self) -> None:
+        with self._wakeup:
+            self._wakeup.notify_all()
+
+    def _claim(self) -> Optional[tuple]:
+        """Marks the next due effect as running and returns (id, kind, payload, attempts), or None."""
+        due = """
+            (status = 'pending' AND next_attempt_at <= ?) OR (status = 'running' AND updated_at < ?)
+        """
+        with self._lock:
+            while True:
+                now = time.time()
+                row = self._conn.execute(
+                    f"SELECT id, kind, payload, attempts FROM side_effects WHERE {due} ORDER BY next_attempt_at LIMIT 1",
+                    (now, now - self.lease),
+                ).fetchone()
+                if row is None:
+                    return None
+                # Another process sharing the file may have claimed it in between
+                claimed = self._conn.execute(
+                    f"UPDATE side_effects SET status = 'running', updated_at = ? WHERE id = ? AND ({due})",
+                    (now, row[0], now, now - self.lease),
+                ).rowcount
+                self._conn.commit()
+                if claimed:
+                    return row
+
+    def _next_due(self) -> float:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(next_attempt_at) FROM side_effects WHERE status = 'pending'"
+            ).fetchone()
+        return row[0] if row and row[0] is not None else time.time() + self.poll_interval
+
+    def _work(self) -> None:
+        while True:
+            claimed = self._claim()
+            if claimed is None:
+                with self._wakeup:
+                    self._wakeup.wait(min(self.poll_interval, max(0.01, self._next_due() - time.time())))
+                continue
+            self._run(*claimed)
+
+    def _run(self, effect_id: str, kind: str, payload_json: str, attempts: int) -> None:
+        payload = json.loads(payload_json)
+
+        def progress(updates: Dict[str, Any]) -> None:
+            payload.update(updates)
+            with self._lock:
+                self._conn.execute(
+                    "UPDATE side_effects SET payload = ?, updated_at = ? WHERE id = ?",
+                    (json.dumps(payload), time.time(), effect_id),
+                )
+                self._conn.commit()
+
+        def heartbeat(stop: threading.Event) -> None:
+            # Renews the lease, so a long Drive upload is not claimed again by another worker
+            while not stop.wait(self.lease / 3):
+                with self._lock:
+                    self._conn.execute(
+                        "UPDATE side_effects SET updated_at = ? WHERE id = ? AND status = 'running'",
+                        (time.time(), effect_id),
+                    )
+                    self._conn.commit()
+
+        attempts += 1
+        stop = threading.Event()
+        threading.Thread(target=heartbeat, args=(stop,), name=f"side-effect-lease-{effect_id[:8]}", daemon=True).start()
+        try:
+            result = self.handlers[kind](payload, progress)
+        except Exception as e:
+            from src.utils.google_clients import backoff_delay
+            failed = attempts >= self.max_attempts
+            delay = 0.0 if failed else backoff_delay(attempts, self.backoff)
+            if failed:
+                print(f"❌ {kind} side effect {effect_id} failed after {attempts} attempts: {e}")
+            else:
+                print(f"⏳ {kind} side effect {effect_id} failed ({e}), retrying in {delay:.1f}s")
+            with self._lock:
+                self._conn.execute(
+                    """
+                    UPDATE side_effects SET status = ?, attempts = ?, error = ?, next_attempt_at = ?, updated_at = ?
+                    WHERE id = ?
+                    """,
+                    ("failed" if failed else "pending", attempts, str(e), time.time() + delay, time.time(), effect_id),
+                )
+                self._conn.commit()
+            return
+        finally:
+            stop.set()
+        with self._lock:
+            self._conn.execute(
+                """
+                UPDATE side_effects SET status = 'done', attempts = ?, result = ?, error = NULL, updated_at = ?
+                WHERE id = ?
+                """,
+                (attempts, result or "", time.time(), effect_id),
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM side_effects GROUP BY status").fetchall()
+        return dict(rows)
+
+
+def _calendar_effect(payload: Dict[str, Any], progress) -> str:
+    from datetime import datetime
+    from src.pipelines.calendar_sink import get_calendar_sink
+    from src.pipelines.orchestrator import get_agent
+    generation_time = datetime.fromisoformat(payload["generation_time"])
+    sink = get_calendar_sink()
+    if sink is not None:
+        return sink.create(payload["calendar_id"], payload["report_id"], payload["report_name"], generation_time)
+    event_id = get_agent("calendar").create_report_event(
+        report_name=payload["report_name"], generation_time=generation_time, calendar_id=payload["calendar_id"]
+    )
+    if not event_id:
+        raise RuntimeError("Calendar returned no event id")
+    return event_id
+
+
+def _drive_effect(payload: Dict[str, Any], progress) -> str:
+    from src.pipelines.orchestrator import get_agent
+    from src.pipelines.uploads import get_upload_queue
+    if not os.path.exists(payload["report_path"]):
+        raise FileNotFoundError(f"Report file not found: {payload['report_path']}")
+    uploads = get_upload_queue()
+    if uploads is not None:
+        # The upload queue batches the Drive file creates of reports finishing together
+        task = uploads.submit(payload["report_path"], payload.get("folder_id"), file_id=payload.get("file_id"))
+        progress({"upload_id": task.id})
+        while not task.wait(1.0):
+            if task.file_id and task.file_id != payload.get("file_id"):
+                progress({"file_id": task.file_id})
+        if task.file_id:
+            # Kept even on failure, so the retry uploads into the file this attempt created
+            progress({"file_id": task.file_id})
+        if task.status != "completed":
+            raise RuntimeError(task.error or f"Drive upload {task.status}")
+        return task.file_id
+    drive = get_agent("drive")
+    # Create the file first and remember its id, so a retry uploads into it instead of creating another
+    if not payload.get("file_id"):
+        file_id = drive.create_files([(payload["report_path"], payload.get("folder_id"))])[0]
+        if not file_id:
+            raise RuntimeError("Drive did not create the file")
+        progress({"file_id": file_id})
+    return drive.upload_content(payload["file_id"], payload["report_path"]) or payload["file_id"]
+
+
+_shared_outbox: Optional[SideEffectOutbox] = None
+_shared_lock = threading.Lock()
+
+
+def get_outbox() -> Optional[SideEffectOutbox]:
+    """Returns the process-wide side-effect outbox (workers started), or None when SIDE_EFFECTS_OUTBOX=0."""
+    global _shared_outbox
+    if os.getenv("SIDE_EFFECTS_OUTBOX", "1") == "0":
+        return None
+    with _shared_lock:
+        if _shared_outbox is None:
+            _shared_outbox = SideEffectOutbox(
+                path=os.getenv("SIDE_EFFECTS_PATH", "data/cache/side_effects.sqlite"),
+                handlers={"calendar": _calendar_effect, "drive": _drive_effect},
+                workers=max(1, int(os.getenv("SIDE_EFFECTS_WORKERS", "4"))),
+                max_attempts=max(1, int(os.getenv("SIDE_EFFECTS_MAX_ATTEMPTS", "5"))),
+                backoff=float(os.getenv("SIDE_EFFECTS_BACKOFF", "2")),
+                lease=float(os.getenv("SIDE_EFFECTS_LEASE", "600")),
+            )
+            _shared_outbox.start()
+        return _shared_outbox
@@ -0,0 +1,122 @@
+# src/pipelines/response.py
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from src.models import ArticleView, DigestResponse, DigestState
+from src.utils.blob_store import article_text
+from src.utils.report_store import REPORT_FORMATS
+
+EXCERPT_CHARS = 500
+
+
+def report_urls(report_id: str) -> Dict[str, str]:
+    """Links to every format of a stored report (each is rendered on first request)."""
+    if not report_id:
+        return {}
+    return {fmt: f"/reports/{report_id}.{fmt}" for fmt in REPORT_FORMATS}
+
+
+def build_digest_response(final_state: Any, query: str) -> DigestResponse:
+    """Builds the API representation of a finished run from a DigestState or LangGraph's state dict.
+
+    Article text is not copied in; the response keeps references to the articles so
+    excerpts can be loaded (from the blob store) only when a caller asks for them.
+    """
+    if not isinstance(final_state, DigestState):
+        final_state = DigestState.model_validate({"query": query, **final_state})
+    response = DigestResponse(
+        query=final_state.query,
+        run_id=final_state.run_id,
+        articles_count=len(final_state.articles),
+        articles=[
+            ArticleView(
+                id=article.id,
+                title=article.title,
+                url=article.url,
+                source=article.source,
+                published_date=article.published_date,
+                relevance_score=article.relevance_score,
+                duplicates=article.duplicates,
+            )
+            for article in final_state.articles
+        ],
+        summaries=final_state.summaries,
+        insights=final_state.insights,
+        report_path=(final_state.report_path or "").replace("\\", "/"),
+        report_id=final_state.report_id,
+        report_urls=report_urls(final_state.report_id),
+        calendar_event_id=final_state.calendar_event_id,
+        drive_file_id=final_state.drive_file_id,
+        drive_upload_id=final_state.drive_upload_id,
+        drive_upload_url=f"/api/drive-uploads/{final_state.drive_upload_id}" if final_state.drive_upload_id else "",
+        side_effect_urls={kind: f"/api/side-effects/{effect_id}" for kind, effect_id in final_state.side_effects.items()},
+        run_report=final_state.run_report,
+        generated_at=datetime.now().isoformat(),
+    )
+    response._articles = {article.id: article for article in final_state.articles}
+    return response
+
+
+def _excerpt(article) -> Optional[str]:
+    if article is None:
+        return None
+    text = article_text(article)
+    return text[:EXCERPT_CHARS] + "..." if len(text) > EXCERPT_CHARS else (text or None)
+
+
+def parse_fields(fields: str) -> Dict[str, Any]:
+    """``"query,articles.title,articles.url"`` -> pydantic include spec; raises ValueError on unknown names."""
+    include: Dict[str, Any] = {}
+    for name in (f.strip() for f in fields.split(",")):
+        if not name or name == "pagination":  # always included
+            continue
+        top, _, sub = name.partition(".")
+        if top not in DigestResponse.model_fields:
+            raise ValueError(f"Unknown field: {name}")
+        if not sub:
+            include[top] = True
+            continue
+        if top != "articles" or sub not in ArticleView.model_fields:
+            raise ValueError(f"Unknown field: {name}")
+        if include.get("articles") is not True:
+            include.setdefault("articles", {"__all__": set()})["__all__"].add(sub)
+    return include
+
+
+def digest_view(
+    response: DigestResponse,
+    fields: Optional[str] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Serializes the requested fields of one page of a digest.
+
+    ``fields`` is a comma-separated list of top-level fields and/or article sub-fields
+    (``articles.title``); by default every field is returned except ``articles.raw_text``,
+    a text excerpt that is only loaded when asked for by name. ``offset``/``limit`` page
+    through the articles, and summaries and insights are limited to that page.
+    """
+    include = parse_fields(fields) if fields else None
+    with_text = bool(fields) and "articles.raw_text" in [f.strip() for f in fields.split(",")]
+
+    total = len(response.articles)
+    end = total if limit is None else min(total, offset + limit)
+    page = response.articles[offset:end]
+    if with_text:
+        page = [a.model_copy(update={"raw_text": _excerpt(response._articles.get(a.id))}) for a in page]
+    ids = {a.id for a in page}
+    page_response = response.model_copy(update={
+        "articles": page,
+        "summaries": [s for s in response.summaries if s.article_id in ids],
+        "insights": [i for i in response.insights if i.article_id in ids],
+    })
+
+    exclude = None if with_text else {"articles": {"__all__": {"raw_text"}}}
+    data = page_response.model_dump(mode="json", include=include, exclude=exclude)
+    data["pagination"] = {
+        "offset": offset,
+        "limit": limit,
+        "total": total,
+        "next_offset": end if end < total else None,
+    }
+    return data
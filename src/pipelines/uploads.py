@@ -0,0 +1,202 @@
+# src/pipelines/uploads.py
+import os
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class UploadTask:
+    """A report waiting for, or going through, a background Drive upload."""
+
+    def __init__(self, report_path: str, folder_id: Optional[str] = None, file_id: Optional[str] = None):
+        self.id = uuid.uuid4().hex
+        self.key: Tuple[str, str] = (os.path.abspath(report_path), folder_id or "")
+        self.report_path = report_path
+        self.folder_id = folder_id
+        self.status = "queued"  # queued | uploading | completed | failed
+        # Set as soon as the Drive file exists, which may be before its content is uploaded
+        self.file_id = file_id
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._done = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    def finish(self, status: str, error: Optional[str] = None) -> None:
+        self.status = status
+        self.error = error
+        self.finished_at = time.time()
+        self._done.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "upload_id": self.id,
+            "report_path": self.report_path.replace("\\", "/"),
+            "status": self.status,
+            "drive_file_id": self.file_id,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class DriveUploadQueue:
+    """Uploads reports to Drive in the background so a digest can return once its PDF exists.
+
+    A dispatcher thread collects reports submitted within ``batch_window`` seconds of
+    each other (up to ``batch_size``). When several arrive together, their Drive files are
+    created in one batch request, which assigns the file ids right away; each file's
+    content is then uploaded (resumable, chunked, retried with backoff) on one of
+    ``workers`` threads. Drive batch requests cannot carry file content, so a single
+    report is uploaded directly instead.
+
+    Submitting a report that is already queued, uploading or uploaded returns that task;
+    resubmitting a failed one uploads into the Drive file the failed attempt created.
+    """
+
+    def __init__(
+        self,
+        agent: Callable[[], Any],
+        workers: int = 2,
+        batch_size: int = 20,
+        batch_window: float = 0.2,
+        result_ttl: float = 3600,
+    ):
+        self.agent = agent
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.result_ttl = result_ttl
+        self.batched = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="drive-upload")
+        self._pending: "queue.Queue[UploadTask]" = queue.Queue()
+        self._tasks: Dict[str, UploadTask] = {}
+        self._by_key: Dict[Tuple[str, str], UploadTask] = {}
+        self._dispatcher: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, report_path: str, folder_id: Optional[str] = None, file_id: Optional[str] = None) -> UploadTask:
+        """Queues the report; ``file_id`` is a Drive file an earlier attempt created for it."""
+        with self._lock:
+            self._prune()
+            task = UploadTask(report_path, folder_id, file_id)
+            existing = self._by_key.get(task.key)
+            if existing and existing.status != "failed":
+                return existing
+            if existing:
+                task.file_id = existing.file_id or file_id
+            self._tasks[task.id] = task
+            self._by_key[task.key] = task
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._dispatch, name="drive-upload-dispatch", daemon=True)
+                self._dispatcher.start()
+        self._pending.put(task)
+        print(f"📤 Queued Drive upload {task.id} for {os.path.basename(report_path)}")
+        return task
+
+    def get(self, upload_id: str) -> Optional[UploadTask]:
+        with self._lock:
+            return self._tasks.get(upload_id)
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(1 for task in self._tasks.values() if not task.done)
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Waits until every submitted upload has finished; False if ``timeout`` ran out first."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            tasks = list(self._tasks.values())
+        for task in tasks:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not task.wait(remaining):
+                return False
+        return True
+
+    def _dispatch(self) -> None:
+        while True:
+            batch = [self._pending.get()]
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._start(batch)
+            except Exception as e:  # keep dispatching; the uploads fall back to one request each
+                print(f"⚠️ Drive batch create failed: {e}")
+                for task in batch:
+                    self._executor.submit(self._upload, task)
+
+    def _start(self, batch: List[UploadTask]) -> None:
+        fresh = [task for task in batch if task.file_id is None]
+        if len(fresh) > 1:
+            file_ids = self.agent().create_files([(task.report_path, task.folder_id) for task in fresh])
+            for task, file_id in zip(fresh, file_ids):
+                task.file_id = file_id
+            with self._lock:
+                self.batched += len(fresh)
+            print(f"📦 Created {sum(1 for f in file_ids if f)} Drive files in one batch request")
+        for task in batch:
+            self._executor.submit(self._upload, task)
+
+    def _upload(self, task: UploadTask) -> None:
+        task.status = "uploading"
+        try:
+            if task.file_id:
+                self.agent().upload_content(task.file_id, task.report_path)
+            else:
+                task.file_id = self.agent().upload_report(task.report_path, task.folder_id)
+            if not task.file_id:
+                raise RuntimeError("Drive returned no file id")
+            task.finish("completed")
+        except Exception as e:
+            print(f"❌ Drive upload {task.id} failed: {e}")
+            task.finish("failed", str(e))
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.result_ttl
+        for task in [t for t in self._tasks.values() if t.done and (t.finished_at or 0) < cutoff]:
+            del self._tasks[task.id]
+            if self._by_key.get(task.key) is task:
+                del self._by_key[task.key]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            counts: Dict[str, int] = {"batched": self.batched}
+            for task in self._tasks.values():
+                counts[task.status] = counts.get(task.status, 0) + 1
+            return counts
+
+
+_shared_queue: Optional[DriveUploadQueue] = None
+_shared_lock = threading.Lock()
+
+
+def get_upload_queue() -> Optional[DriveUploadQueue]:
+    """Returns the process-wide Drive upload queue, or None when DRIVE_UPLOAD_ASYNC=0."""
+    global _shared_queue
+    if os.getenv("DRIVE_UPLOAD_ASYNC", "1") == "0":
+        return None
+    with _shared_lock:
+        if _shared_queue is None:
+            from src.pipelines.orchestrator import get_agent
+            _shared_queue = DriveUploadQueue(
+                agent=lambda: get_agent("drive"),
+                workers=max(1, int(os.getenv("DRIVE_UPLOAD_WORKERS", "2"))),
+                batch_size=max(1, int(os.getenv("DRIVE_BATCH_SIZE", "20"))),
+                batch_window=float(os.getenv("DRIVE_BATCH_WINDOW", "0.2")),
+            )
+        return _shared_queue
@@ -0,0 +1,142 @@
+# src/utils/blob_store.py
+import hashlib
+import os
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from src.models import Article
+
+
+class BlobStore:
+    """Content-addressed store for large texts (article bodies), zlib-compressed on disk.
+
+    A blob's key is the SHA-256 of its text, so storing the same text twice writes one
+    file. The last ``cache_items`` texts read are kept in memory because the summarizer
+    and insight nodes read the same article at about the same time.
+
+    Storing a text that already exists refreshes its file's mtime, so the mtime is when a
+    run last referenced the blob. Blobs not referenced for ``max_age_seconds`` are purged
+    along with the checkpointed runs that could still read them (0 keeps them forever).
+    """
+
+    def __init__(self, root: str = "data/blobs", cache_items: int = 32, max_age_seconds: float = 7 * 86400):
+        self.root = root
+        self.cache_items = cache_items
+        self.max_age_seconds = max_age_seconds
+        self.reads = 0
+        self.writes = 0
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        if not key.isalnum():
+            raise ValueError(f"Invalid blob key: {key!r}")
+        return os.path.join(self.root, key[:2], key)
+
+    def put(self, text: str) -> str:
+        data = text.encode("utf-8")
+        key = hashlib.sha256(data).hexdigest()
+        path = self._path(key)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(zlib.compress(data, 6))
+            os.replace(tmp, path)
+            with self._lock:
+                self.writes += 1
+        else:
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                # Purged between the check and the touch; write it again
+                return self.put(text)
+        return key
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        try:
+            with open(self._path(key), "rb") as f:
+                text = zlib.decompress(f.read()).decode("utf-8")
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            self.reads += 1
+            self._cache[key] = text
+            while len(self._cache) > self.cache_items:
+                self._cache.popitem(last=False)
+        return text
+
+    def purge_expired(self) -> None:
+        """Deletes blobs (and abandoned temp files) not referenced for ``max_age_seconds``."""
+        if not self.max_age_seconds or not os.path.isdir(self.root):
+            return
+        cutoff = time.time() - self.max_age_seconds
+        removed = 0
+        for prefix in os.scandir(self.root):
+            if not prefix.is_dir():
+                continue
+            for entry in os.scandir(prefix.path):
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                        removed += 1
+                except FileNotFoundError:
+                    continue
+                with self._lock:
+                    self._cache.pop(entry.name, None)
+        if removed:
+            print(f"🧹 Purged {removed} article texts older than {self.max_age_seconds / 86400:g} days from the blob store")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"reads": self.reads, "writes": self.writes, "cached": len(self._cache)}
+
+
+_shared_store: Optional[BlobStore] = None
+_shared_lock = threading.Lock()
+
+
+def get_blob_store() -> Optional[BlobStore]:
+    """Returns the process-wide blob store, or None when BLOB_STORE_ENABLED=0."""
+    global _shared_store
+    if os.getenv("BLOB_STORE_ENABLED", "1") == "0":
+        return None
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = BlobStore(
+                root=os.getenv("BLOB_STORE_PATH", "data/blobs"),
+                cache_items=int(os.getenv("BLOB_CACHE_ITEMS", "32")),
+                # Checkpointed runs reference their article texts, so blobs live at least as long by default
+                max_age_seconds=float(os.getenv("BLOB_MAX_AGE", os.getenv("CHECKPOINT_MAX_AGE", str(7 * 86400)))),
+            )
+            # Also purged by get_run_store(); this covers processes with CHECKPOINTS_ENABLED=0
+            _shared_store.purge_expired()
+        return _shared_store
+
+
+def offload_text(article: Article) -> Article:
+    """Moves the article's text into the blob store, leaving only its key on the article."""
+    store = get_blob_store()
+    if store is None or article.raw_text is None:
+        return article
+    article.text_key = store.put(article.raw_text)
+    article.raw_text = None
+    return article
+
+
+def article_text(article: Article) -> str:
+    """The article's text, read from the blob store when it has been offloaded."""
+    if article.raw_text is not None:
+        return article.raw_text
+    if article.text_key:
+        store = get_blob_store() or BlobStore(root=os.getenv("BLOB_STORE_PATH", "data/blobs"))
+        return store.get(article.text_key) or ""
+    return ""
@@ -0,0 +1,28 @@
+# src/utils/concurrency.py
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Optional, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def default_llm_workers() -> int:
+    """Worker count for per-article LLM work (LLM_MAX_WORKERS, default 4)."""
+    return max(1, int(os.getenv("LLM_MAX_WORKERS", "4")))
+
+
+def map_concurrently(fn: Callable[[T], R], items: Iterable[T], max_workers: Optional[int] = None) -> List[R]:
+    """Applies fn to every item on a bounded thread pool and returns results in input order.
+
+    With a single worker (or a single item) the calls run inline on the current thread.
+    Worker calls run in a copy of the caller's context, so per-run instrumentation follows them.
+    """
+    items = list(items)
+    workers = min(max_workers or default_llm_workers(), len(items))
+    if workers <= 1:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(contextvars.copy_context().run, fn, item) for item in items]
+        return [future.result() for future in futures]
@@ -0,0 +1,178 @@
+# src/utils/context_budget.py
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from src.utils.metrics import emit
+from src.utils.tokens import estimate_tokens
+
+# Sentence ends: . ! ? (optionally closing a quote/bracket) followed by whitespace and a capital, digit or quote.
+_SENTENCE_END = re.compile(r"(?<=[.!?])[\"'”’)\]]?\s+(?=[\"'“‘(\[]?[A-Z0-9])")
+GAP_MARKER = "[…]"
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    "a", "about", "after", "all", "also", "an", "and", "are", "as", "at", "be", "been", "but", "by", "can",
+    "for", "from", "had", "has", "have", "he", "her", "his", "i", "if", "in", "into", "is", "it", "its",
+    "more", "not", "of", "on", "one", "or", "our", "said", "she", "so", "than", "that", "the", "their",
+    "them", "there", "they", "this", "to", "up", "was", "we", "were", "which", "who", "will", "with", "would", "you",
+}
+
+
+class TrimmedText(NamedTuple):
+    """The text sent to the LLM; the sentence counts are 0 when the text already fit."""
+    text: str
+    original_tokens: int
+    kept_tokens: int
+    sentences_kept: int
+    sentences_total: int
+
+    @property
+    def trimmed(self) -> bool:
+        return self.kept_tokens < self.original_tokens
+
+
+def split_sentences(text: str) -> List[Tuple[int, str]]:
+    """(paragraph index, sentence) pairs of the text, in order."""
+    sentences = []
+    for paragraph, block in enumerate(p for p in re.split(r"\n\s*\n|\n", text or "") if p.strip()):
+        for sentence in _SENTENCE_END.split(block.strip()):
+            if sentence.strip():
+                sentences.append((paragraph, sentence.strip()))
+    return sentences
+
+
+def centrality_scores(sentences: List[str]) -> List[float]:
+    """TF-IDF centroid centrality: cosine similarity of each sentence to the whole article (0-1).
+
+    Sentences sharing the article's characteristic terms score high; boilerplate and
+    asides score low. Linear in the text length, so very long articles stay cheap.
+    """
+    counts = [Counter(t for t in _WORD_RE.findall(s.lower()) if t not in _STOPWORDS) for s in sentences]
+    doc_freq: Counter = Counter()
+    for terms in counts:
+        doc_freq.update(terms.keys())
+    idf = {term: math.log((1 + len(sentences)) / (1 + df)) + 1 for term, df in doc_freq.items()}
+    vectors: List[Dict[str, float]] = []
+    centroid: Dict[str, float] = {}
+    for terms in counts:
+        weights = {term: (1 + math.log(tf)) * idf[term] for term, tf in terms.items()}
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        weights = {term: w / norm for term, w in weights.items()}
+        vectors.append(weights)
+        for term, w in weights.items():
+            centroid[term] = centroid.get(term, 0.0) + w
+    centroid_norm = math.sqrt(sum(w * w for w in centroid.values())) or 1.0
+    return [sum(w * centroid[term] for term, w in v.items()) / centroid_norm for v in vectors]
+
+
+class ContextBudgeter:
+    """Fits article text into a token budget by keeping its most informative sentences.
+
+    Text within the budget is passed through unchanged. Longer text is split into
+    sentences and scored, either by TF-IDF centrality blended with a lead bias
+    (``lead_weight`` of the score comes from the sentence's position, as news puts the
+    essentials first) or, with strategy "lead", by position alone. The best sentences
+    that fit are kept in their original order, with a marker where text was cut.
+    The budget passed to ``fit`` is what fits the model's context; an optional
+    ``max_tokens`` caps it lower, for deployments that want to spend fewer input tokens.
+    """
+
+    def __init__(self, max_tokens: Optional[int] = None, strategy: str = "centrality", lead_weight: float = 0.3):
+        if strategy not in ("centrality", "lead"):
+            raise ValueError(f"Unknown context budget strategy: {strategy}")
+        self.max_tokens = max_tokens
+        self.strategy = strategy
+        self.lead_weight = min(1.0, max(0.0, lead_weight))
+
+    def fit(self, text: str, budget: int, stage: str = "", article_id: str = "") -> TrimmedText:
+        """The text cut down to ``budget`` tokens (or max_tokens, if lower); emits a context_trim event when cut."""
+        if self.max_tokens:
+            budget = min(budget, self.max_tokens)
+        budget = max(1, budget)
+        original_tokens = estimate_tokens(text)
+        if original_tokens <= budget:
+            return TrimmedText(text, original_tokens, original_tokens, 0, 0)
+
+        sentences = split_sentences(text)
+        kept = self._select(sentences, budget)
+        trimmed = self._join(sentences, kept) if kept else ""
+        # The gap markers and joins may push a selection over; drop the lowest-ranked sentences until it fits.
+        while kept and estimate_tokens(trimmed) > budget:
+            kept = kept[:-1]
+            trimmed = self._join(sentences, kept)
+        if not kept:
+            trimmed = self._cut(text, budget)
+        result = TrimmedText(trimmed, original_tokens, estimate_tokens(trimmed), len(kept), len(sentences))
+        print(f"✂️ Trimmed {stage or 'article'} text from ~{original_tokens} to ~{result.kept_tokens} tokens "
+              f"({result.sentences_kept}/{result.sentences_total} sentences, {self.strategy})")
+        emit(
+            "context_trim", stage=stage, article_id=article_id, strategy=self.strategy,
+            original_tokens=original_tokens, kept_tokens=result.kept_tokens,
+        )
+        return result
+
+    def _select(self, sentences: List[Tuple[int, str]], budget: int) -> List[int]:
+        """Indexes of the sentences to keep, best first."""
+        count = len(sentences)
+        if self.strategy == "lead":
+            ranked = list(range(count))
+        else:
+            centrality = centrality_scores([s for _, s in sentences])
+            best = max(centrality) or 1.0
+            scores = [
+                (1 - self.lead_weight) * c / best + self.lead_weight * (1 - i / count)
+                for i, c in enumerate(centrality)
+            ]
+            # The opening sentence is always kept; it names what the article is about.
+            ranked = [0] + sorted(range(1, count), key=lambda i: -scores[i])
+        kept, used = [], 0
+        for index in ranked:
+            tokens = estimate_tokens(sentences[index][1]) + 1
+            if used + tokens <= budget:
+                kept.append(index)
+                used += tokens
+            elif self.strategy == "lead":
+                break
+        return kept
+
+    @staticmethod
+    def _join(sentences: List[Tuple[int, str]], kept: List[int]) -> str:
+        parts: List[str] = []
+        previous: Optional[int] = None
+        for index in sorted(kept):
+            paragraph, sentence = sentences[index]
+            if previous is None:
+                if index > 0:
+                    parts.append(GAP_MARKER + " ")
+            elif index != previous + 1:
+                parts.append(f" {GAP_MARKER}\n\n")
+            elif paragraph != sentences[previous][0]:
+                parts.append("\n\n")
+            else:
+                parts.append(" ")
+            parts.append(sentence)
+            previous = index
+        if previous is not None and previous < len(sentences) - 1:
+            parts.append(" " + GAP_MARKER)
+        return "".join(parts)
+
+    @staticmethod
+    def _cut(text: str, budget: int) -> str:
+        """Keeps the lead of text with no usable sentence breaks (e.g. one run-on block)."""
+        words = text[:budget * 4].split()
+        while words and estimate_tokens(" ".join(words)) > budget:
+            words = words[:max(0, min(len(words) - 1, int(len(words) * 0.9)))]
+        return " ".join(words)
+
+
+def budgeter_from_env() -> Optional[ContextBudgeter]:
+    """Returns the budgeter configured from CONTEXT_BUDGET_* variables, or None when CONTEXT_BUDGET_ENABLED=0."""
+    if os.getenv("CONTEXT_BUDGET_ENABLED", "1") == "0":
+        return None
+    return ContextBudgeter(
+        max_tokens=int(os.getenv("CONTEXT_BUDGET_TOKENS", "0")) or None,
+        strategy=os.getenv("CONTEXT_BUDGET_STRATEGY", "centrality").lower(),
+        lead_weight=float(os.getenv("CONTEXT_BUDGET_LEAD_WEIGHT", "0.3")),
+    )
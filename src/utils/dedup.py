@@ -0,0 +1,209 @@
+# src/utils/dedup.py
+import os
+import re
+import threading
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src.models import Article
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_PRIME = 4294967311  # smallest prime above 2**32
+_MAX_HASH = np.uint64(_PRIME)
+
+
+def shingles(text: str, size: int = 5) -> List[str]:
+    """Overlapping word n-grams of the lower-cased text (the whole text if it is shorter)."""
+    words = _WORD_RE.findall((text or "").lower())
+    if len(words) <= size:
+        return [" ".join(words)] if words else []
+    return [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+
+class MinHasher:
+    """MinHash signatures over word shingles, vectorized with NumPy.
+
+    Each of the ``num_perm`` hash functions is ``(a * h + b) mod p`` over 32-bit shingle
+    hashes; the fraction of equal signature slots estimates the Jaccard similarity.
+    """
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        grams = shingles(text, self.shingle_size)
+        if not grams:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        hashes = np.fromiter(
+            (zlib.crc32(g.encode("utf-8")) for g in set(grams)),
+            dtype=np.uint64,
+        )
+        # a, h < 2**32 so a*h + b stays below 2**64 and never overflows uint64
+        permuted = (np.outer(hashes, self._a) + self._b) % np.uint64(_PRIME)
+        return permuted.min(axis=0)
+
+
+def estimated_similarity(first: np.ndarray, second: np.ndarray) -> float:
+    return float(np.count_nonzero(first == second)) / len(first)
+
+
+class DuplicateIndex:
+    """LSH index over MinHash signatures for finding near-duplicate texts.
+
+    Signatures are split into ``bands`` bands; texts sharing any band become candidates,
+    and a candidate counts as a duplicate when its estimated Jaccard similarity is at
+    least ``threshold``. Thread-safe, so one index can be shared by concurrent digests.
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, bands: int = 32, shingle_size: int = 5):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size)
+        self._buckets: List[Dict[bytes, List[str]]] = [{} for _ in range(bands)]
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._payloads: Dict[str, Article] = {}
+        self._lock = threading.Lock()
+
+    def _band_keys(self, signature: np.ndarray) -> Iterable[Tuple[int, bytes]]:
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def match(self, signature: np.ndarray) -> Optional[Tuple[str, float]]:
+        """Returns (key, similarity) of the most similar indexed text above the threshold."""
+        with self._lock:
+            candidates = set()
+            for band, bucket_key in self._band_keys(signature):
+                candidates.update(self._buckets[band].get(bucket_key, ()))
+            best = None
+            for key in candidates:
+                similarity = estimated_similarity(signature, self._signatures[key])
+                if similarity >= self.threshold and (best is None or similarity > best[1]):
+                    best = (key, similarity)
+            return best
+
+    def add(self, key: str, signature: np.ndarray, payload: Optional[Article] = None) -> None:
+        with self._lock:
+            self._signatures[key] = signature
+            if payload is not None:
+                self._payloads[key] = payload
+            for band, bucket_key in self._band_keys(signature):
+                self._buckets[band].setdefault(bucket_key, []).append(key)
+
+    def payload(self, key: str) -> Optional[Article]:
+        with self._lock:
+            return self._payloads.get(key)
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+
+class ArticleDeduplicator:
+    """Collapses near-duplicate articles (e.g. one wire story syndicated by many outlets).
+
+    Articles are offered in SerpAPI order. A near-duplicate of an accepted article joins
+    its cluster; the cluster keeps the best copy (a preferred source, else the longest
+    text) and records the others in ``Article.duplicates``.
+
+    When the index is shared between digests, a story another digest already accepted
+    is replaced by (a copy of) that digest's article, so its text - and therefore its
+    cached LLM outputs - is identical across reports.
+    """
+
+    def __init__(self, index: Optional[DuplicateIndex] = None, preferred_sources: Iterable[str] = ()):
+        self.index = index or duplicate_index_from_env()
+        self.preferred_sources = [s.strip().lower() for s in preferred_sources if s.strip()]
+        self.articles: List[Article] = []
+        self._cluster_position: Dict[str, int] = {}
+        self.dropped = 0
+        self.shared = 0
+
+    def _rank(self, article: Article) -> Tuple[int, int]:
+        source = (article.source or "").lower()
+        preferred = len(self.preferred_sources)
+        for position, name in enumerate(self.preferred_sources):
+            if name in source:
+                preferred = position
+                break
+        return (-preferred, len(article.raw_text or ""))
+
+    def offer(self, article: Article) -> bool:
+        """Adds an article; returns False when it was folded into an existing cluster."""
+        signature = self.index.hasher.signature(article.raw_text or "")
+        match = self.index.match(signature)
+        if match is not None and match[0] not in self._cluster_position:
+            # Accepted earlier by another digest sharing this index: reuse its copy.
+            key, similarity = match
+            representative = self.index.payload(key)
+            if representative is not None:
+                shared = representative.model_copy(deep=True)
+                if shared.url != article.url:
+                    shared.duplicates.append({"source": article.source, "url": article.url})
+                article = shared
+                self.shared += 1
+            self._cluster_position[key] = len(self.articles)
+            self.articles.append(article)
+            return True
+        if match is None:
+            self.index.add(article.id, signature, payload=article.model_copy(deep=True))
+            self._cluster_position[article.id] = len(self.articles)
+            self.articles.append(article)
+            return True
+
+        key, similarity = match
+        position = self._cluster_position[key]
+        kept = self.articles[position]
+        self.dropped += 1
+        if self._rank(article) > self._rank(kept):
+            article.duplicates = kept.duplicates + [{"source": kept.source, "url": kept.url}]
+            kept.duplicates = []
+            self.articles[position] = article
+            kept, dropped = article, kept
+        else:
+            kept.duplicates.append({"source": article.source, "url": article.url})
+            dropped = article
+        print(f"♻️ Near-duplicate ({similarity:.2f}): keeping '{kept.source}', dropping '{dropped.source}' copy of '{kept.title}'")
+        return False
+
+
+def duplicate_index_from_env() -> DuplicateIndex:
+    return DuplicateIndex(
+        threshold=float(os.getenv("DEDUP_THRESHOLD", "0.8")),
+        num_perm=int(os.getenv("DEDUP_NUM_PERM", "128")),
+        bands=int(os.getenv("DEDUP_BANDS", "32")),
+    )
+
+
+def deduplicator_from_env(index: Optional[DuplicateIndex] = None) -> Optional[ArticleDeduplicator]:
+    """Returns a deduplicator configured from DEDUP_* variables, or None when DEDUP_ENABLED=0."""
+    if os.getenv("DEDUP_ENABLED", "1") == "0":
+        return None
+    preferred = os.getenv("DEDUP_PREFERRED_SOURCES", "")
+    return ArticleDeduplicator(index=index, preferred_sources=preferred.split(","))
+
+
+_shared_index: ContextVar[Optional[DuplicateIndex]] = ContextVar("digest_dedup_index", default=None)
+
+
+def current_dedup_index() -> Optional[DuplicateIndex]:
+    return _shared_index.get()
+
+
+@contextmanager
+def sharing_dedup_index(index: DuplicateIndex) -> Iterator[DuplicateIndex]:
+    """Digests run inside the block (and threads started with its context) share ``index``."""
+    token = _shared_index.set(index)
+    try:
+        yield index
+    finally:
+        _shared_index.reset(token)
@@ -0,0 +1,194 @@
+# src/utils/google_clients.py
+import json
+import os
+import random
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+# Both agents share one token.json, so it is requested with the scopes of both.
+SCOPES = [
+    "https://www.googleapis.com/auth/drive.file",
+    "https://www.googleapis.com/auth/calendar.events",
+    "https://www.googleapis.com/auth/calendar",
+]
+
+
+class GoogleClients:
+    """Shared Google credentials and API service objects for the Drive and Calendar agents.
+
+    The OAuth token is read once and refreshed ``refresh_margin`` seconds before it
+    expires (and re-read if another process rewrites token.json), instead of being
+    parsed and checked on every upload or event. Services are built from the bundled
+    discovery documents, parsed once per API, and each thread keeps its own service and
+    HTTP connection (httplib2 is not thread-safe), so repeated calls reuse the connection.
+
+    ``root_url`` points every API (including uploads, batch requests and token refreshes)
+    at a stand-in server; without a token.json it is called with anonymous credentials.
+    """
+
+    def __init__(
+        self,
+        credentials_path: str = "credentials.json",
+        token_path: str = "token.json",
+        refresh_margin: float = 300,
+        timeout: float = 60,
+        root_url: Optional[str] = None,
+    ):
+        self.credentials_path = credentials_path
+        self.token_path = token_path
+        self.refresh_margin = refresh_margin
+        self.timeout = timeout
+        self.root_url = root_url.rstrip("/") + "/" if root_url else None
+        self.refreshes = 0
+        self.builds = 0
+        self._creds = None
+        self._token_mtime: Optional[float] = None
+        self._documents: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._local = threading.local()
+        self._lock = threading.RLock()
+
+    def credentials(self):
+        """Valid credentials, refreshed ahead of expiry; runs the OAuth flow if there are none."""
+        with self._lock:
+            mtime = os.path.getmtime(self.token_path) if os.path.exists(self.token_path) else None
+            if self._creds is None or mtime != self._token_mtime:
+                self._creds = self._load()
+            if self._creds is None:
+                if self.root_url:
+                    from google.auth.credentials import AnonymousCredentials
+                    self._creds = AnonymousCredentials()
+                    return self._creds
+                self._creds = self._authorize()
+            elif self._expiring(self._creds):
+                self._refresh()
+            return self._creds
+
+    def _load(self):
+        if not os.path.exists(self.token_path):
+            return None
+        from google.oauth2.credentials import Credentials
+        self._token_mtime = os.path.getmtime(self.token_path)
+        creds = Credentials.from_authorized_user_file(self.token_path, SCOPES)
+        if self.root_url:
+            # with_token_uri returns a copy without the expiry, which decides when to refresh
+            expiry = creds.expiry
+            creds = creds.with_token_uri(f"{self.root_url}token")
+            creds.expiry = expiry
+        if creds.scopes and not set(SCOPES).issubset(creds.scopes):
+            print("⚠️ Token missing required scopes. Re-authenticating...")
+            return None
+        return creds
+
+    def _expiring(self, creds) -> bool:
+        if not creds.valid:
+            return True
+        if creds.expiry is None:
+            return False
+        # google-auth keeps expiry as a naive UTC datetime
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        return creds.expiry - now < timedelta(seconds=self.refresh_margin)
+
+    def _refresh(self) -> None:
+        from google.auth.transport.requests import Request
+        if not self._creds.refresh_token:
+            self._creds = self._authorize()
+            return
+        try:
+            self._creds.refresh(Request())
+        except Exception as e:
+            print(f"⚠️ Google token refresh failed ({e}). Re-authenticating...")
+            self._creds = self._authorize()
+            return
+        self.refreshes += 1
+        self._save()
+
+    def _authorize(self):
+        from google_auth_oauthlib.flow import InstalledAppFlow
+        if not os.path.exists(self.credentials_path):
+            raise FileNotFoundError(f"Google OAuth client secrets not found at {self.credentials_path}.")
+        print("🔐 Starting Google OAuth flow for Drive and Calendar access...")
+        flow = InstalledAppFlow.from_client_secrets_file(self.credentials_path, SCOPES)
+        creds = flow.run_local_server(port=0)
+        self._creds = creds
+        self._save()
+        return creds
+
+    def _save(self) -> None:
+        # Write-then-rename so another process never reads a half-written token.
+        tmp = f"{self.token_path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as token:
+            token.write(self._creds.to_json())
+        os.replace(tmp, self.token_path)
+        self._token_mtime = os.path.getmtime(self.token_path)
+
+    def _document(self, api: str, version: str) -> Dict[str, Any]:
+        key = (api, version)
+        with self._lock:
+            if key not in self._documents:
+                from googleapiclient.discovery_cache import get_static_doc
+                doc = get_static_doc(api, version)
+                if doc is None:
+                    raise ValueError(f"No bundled discovery document for {api} {version}")
+                document = json.loads(doc)
+                if self.root_url:
+                    document["rootUrl"] = self.root_url
+                self._documents[key] = document
+            return self._documents[key]
+
+    def service(self, api: str, version: str):
+        """This thread's service object for ``api``, built on first use and reused afterwards."""
+        creds = self.credentials()
+        services = getattr(self._local, "services", None)
+        if services is None:
+            services = self._local.services = {}
+        entry = services.get((api, version))
+        if entry is None or entry[0] is not creds:
+            import google_auth_httplib2
+            import httplib2
+            from googleapiclient.discovery import build_from_document
+            transport = httplib2.Http(timeout=self.timeout)
+            # 308 means "resume incomplete" to resumable uploads, not a redirect (as in googleapiclient's build_http)
+            transport.redirect_codes = transport.redirect_codes - {308}
+            http = google_auth_httplib2.AuthorizedHttp(creds, http=transport)
+            entry = (creds, build_from_document(self._document(api, version), http=http))
+            services[(api, version)] = entry
+            with self._lock:
+                self.builds += 1
+        return entry[1]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"refreshes": self.refreshes, "service_builds": self.builds}
+
+
+_shared_clients: Dict[Tuple[str, str], GoogleClients] = {}
+_shared_lock = threading.Lock()
+
+
+def get_google_clients(credentials_path: str = "credentials.json", token_path: str = "token.json") -> GoogleClients:
+    """Returns the process-wide Google clients for this pair of credential files."""
+    key = (credentials_path, token_path)
+    with _shared_lock:
+        if key not in _shared_clients:
+            _shared_clients[key] = GoogleClients(
+                credentials_path=credentials_path,
+                token_path=token_path,
+                refresh_margin=float(os.getenv("GOOGLE_TOKEN_REFRESH_MARGIN", "300")),
+                timeout=float(os.getenv("GOOGLE_API_TIMEOUT", "60")),
+                root_url=os.getenv("GOOGLE_API_ROOT_URL") or None,
+            )
+        return _shared_clients[key]
+
+
+def is_transient(error: Exception) -> bool:
+    """Whether a Google API call that raised ``error`` is worth retrying (rate limits, 5xx, network)."""
+    from googleapiclient.errors import HttpError
+    if isinstance(error, HttpError):
+        return error.resp.status in (408, 429, 500, 502, 503, 504)
+    return isinstance(error, (OSError, TimeoutError)) or type(error).__module__.startswith("httplib2")
+
+
+def backoff_delay(attempt: int, base: float, cap: float = 60.0) -> float:
+    """Exponential backoff with full jitter for the ``attempt``-th retry (1-based)."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
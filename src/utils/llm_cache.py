@@ -0,0 +1,210 @@
+# src/utils/llm_cache.py
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from src.utils.llm_gateway import get_llm_gateway
+from src.utils.singleflight import SingleFlight
+from src.utils.tokens import estimate_tokens
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Collapses whitespace so cosmetic differences in scraped text still hit the cache."""
+    return _WHITESPACE.sub(" ", text or "").strip()
+
+
+def llm_identity(llm: Any) -> tuple:
+    """Returns (model name, temperature) for a chat model, used as part of the cache key."""
+    model = getattr(llm, "model_name", None) or getattr(llm, "model", None) or type(llm).__name__
+    temperature = getattr(llm, "temperature", None)
+    return str(model), temperature
+
+
+class LLMCache:
+    """Persistent, content-addressed cache of LLM outputs backed by SQLite.
+
+    Entries are keyed by a hash of the normalized input text, the prompt template,
+    the model name and the temperature. Entries older than ``ttl_seconds`` are
+    treated as misses, and the least recently used entries are evicted once the
+    stored values exceed ``max_bytes``.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 86400, max_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(text: str, prompt_template: str, model: str, temperature: Optional[float]) -> str:
+        digest = hashlib.sha256()
+        for part in (normalize_text(text), prompt_template, model, repr(temperature)):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Drops expired entries, then least recently used ones until under max_bytes."""
+        if self.ttl_seconds:
+            self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if not self.max_bytes or total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM llm_cache ORDER BY accessed_at ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            total -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": entries,
+            "bytes": total,
+        }
+
+
+_shared_cache: Optional[LLMCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """Returns the process-wide LLM cache, or None when LLM_CACHE_ENABLED=0."""
+    global _shared_cache
+    if os.getenv("LLM_CACHE_ENABLED", "1") == "0":
+        return None
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = LLMCache(
+                path=os.getenv("LLM_CACHE_PATH", "data/cache/llm_cache.sqlite"),
+                ttl_seconds=float(os.getenv("LLM_CACHE_TTL", "86400")),
+                max_bytes=int(float(os.getenv("LLM_CACHE_MAX_MB", "256")) * 1024 * 1024),
+            )
+        return _shared_cache
+
+
+def cached_invoke(
+    invoke: Callable[[], Any],
+    text: str,
+    prompt_template: str,
+    llm: Any,
+    cache: Optional[LLMCache] = None,
+    validate: Optional[Callable[[str], bool]] = None,
+) -> str:
+    """Returns the cached output for (text, prompt, model, temperature), calling invoke() on a miss.
+
+    Misses go through the shared LLM gateway (rate limits, 429 backoff, adaptive
+    concurrency). When ``validate`` is given, only outputs it accepts are stored, so a
+    malformed response is retried on the next run instead of being replayed from the cache.
+    Identical calls already in flight (e.g. one article in several batch digests) are
+    coalesced into a single request, whether or not the cache is enabled.
+    """
+    cache = cache or get_llm_cache()
+    model, temperature = llm_identity(llm)
+    key = LLMCache.make_key(text, prompt_template, model, temperature)
+
+    def call() -> str:
+        cached = cache.get(key) if cache is not None else None
+        if cached is not None:
+            return cached
+        result = _gated_call(invoke, text, prompt_template, llm)
+        if cache is not None and (validate is None or validate(result)):
+            cache.set(key, result)
+        return result
+
+    result, _ = _llm_flights.do(key, call)
+    return result
+
+
+def is_json(text: str) -> bool:
+    """Validator for cached_invoke: accepts outputs that parse as JSON."""
+    try:
+        json.loads(text)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+# Coalesces identical in-flight LLM calls; results are not kept (that's the cache's job).
+_llm_flights = SingleFlight(result_ttl=0)
+
+
+def _gated_call(invoke: Callable[[], Any], text: str, prompt_template: str, llm: Any) -> str:
+    """Runs invoke() through the LLM gateway, charging prompt + completion tokens to the TPM budget."""
+    estimated_tokens = estimate_tokens(text) + estimate_tokens(prompt_template) + (getattr(llm, "max_tokens", None) or 0)
+    return _as_text(get_llm_gateway().invoke(invoke, estimated_tokens))
+
+
+def _as_text(result: Any) -> str:
+    return result.content if hasattr(result, "content") else str(result)
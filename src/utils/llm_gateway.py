@@ -0,0 +1,219 @@
+# src/utils/llm_gateway.py
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from src.utils.metrics import emit
+from src.utils.token_usage import capture_token_usage
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """Classic token bucket: ``capacity`` tokens, refilled continuously at ``per_minute``/60 per second.
+
+    A capacity of 0 disables the limit.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = float(per_minute) / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """Blocks until `amount` tokens are available and takes them. Returns the time waited."""
+        if self.capacity <= 0:
+            return 0.0
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return waited
+                delay = (amount - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """True for HTTP 429 errors raised by the Groq client, also when wrapped (e.g. by LangChain).
+
+    Decided by the status code or the client's RateLimitError class, never by the message,
+    so an unrelated error that merely mentions "429" is not throttled.
+    """
+    try:
+        from groq import RateLimitError
+    except ImportError:  # the status code checks below still apply
+        RateLimitError = None
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if RateLimitError is not None and isinstance(error, RateLimitError):
+            return True
+        if getattr(error, "status_code", None) == 429:
+            return True
+        if getattr(getattr(error, "response", None), "status_code", None) == 429:
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        value = headers.get("retry-after")
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class LLMGateway:
+    """Shared choke point for every LLM call made by the agents.
+
+    - Token buckets cap requests/minute and (estimated) tokens/minute.
+    - 429 responses are retried with exponential backoff and full jitter, honoring Retry-After.
+    - The number of in-flight calls follows AIMD: it grows by ~1 per window of successful
+      calls and is halved on throttling or errors (timeouts included). Latency is only
+      advisory: a call slower than ``latency_tolerance`` x the moving average of recent
+      latencies holds the limit where it is instead of growing it, so a mix of short and
+      long prompts never shrinks the limit by itself.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_concurrency: int = 8,
+        min_concurrency: int = 1,
+        max_retries: int = 5,
+        base_backoff: float = 1.0,
+        max_backoff: float = 30.0,
+        latency_tolerance: float = 2.0,
+        latency_smoothing: float = 0.1,
+    ):
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.latency_tolerance = latency_tolerance
+        self.latency_smoothing = latency_smoothing
+
+        self.limit = float(self.max_concurrency)
+        self.in_flight = 0
+        self.calls = 0
+        self.throttled = 0
+        self.errors = 0
+        self.latency_ewma: Optional[float] = None
+        self._slot = threading.Condition()
+
+    def invoke(self, fn: Callable[[], T], estimated_tokens: int = 0) -> T:
+        """Runs fn() under the rate limits, retrying rate-limit errors with backoff."""
+        attempt = 0
+        while True:
+            self._acquire_slot()
+            self.request_bucket.acquire(1)
+            self.token_bucket.acquire(estimated_tokens)
+            start = time.monotonic()
+            try:
+                with capture_token_usage() as usage:
+                    result = fn()
+            except Exception as e:
+                self._release_slot()
+                throttled = is_rate_limit_error(e)
+                emit("llm_call", seconds=round(time.monotonic() - start, 6), status="throttled" if throttled else "error")
+                if not throttled:
+                    self._on_failure(error=True)
+                    raise
+                self._on_failure(error=False)
+                attempt += 1
+                if attempt > self.max_retries:
+                    print(f"❌ LLM still rate limited after {self.max_retries} retries")
+                    raise
+                delay = _retry_after(e) or random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** attempt))
+                print(f"⏳ LLM rate limited (attempt {attempt}/{self.max_retries}), backing off {delay:.1f}s")
+                time.sleep(delay)
+                continue
+            self._release_slot()
+            latency = time.monotonic() - start
+            emit(
+                "llm_call",
+                seconds=round(latency, 6),
+                status="ok",
+                prompt_tokens=usage.prompt_tokens,
+                completion_tokens=usage.completion_tokens,
+            )
+            self._on_success(latency)
+            return result
+
+    def _acquire_slot(self) -> None:
+        with self._slot:
+            while self.in_flight >= int(self.limit):
+                self._slot.wait()
+            self.in_flight += 1
+
+    def _release_slot(self) -> None:
+        with self._slot:
+            self.in_flight -= 1
+            self._slot.notify_all()
+
+    def _on_success(self, latency: float) -> None:
+        with self._slot:
+            self.calls += 1
+            slow = self.latency_ewma is not None and latency > self.latency_ewma * self.latency_tolerance
+            if self.latency_ewma is None:
+                self.latency_ewma = latency
+            else:
+                self.latency_ewma += self.latency_smoothing * (latency - self.latency_ewma)
+            if not slow:
+                # A slow call only holds the limit; decreases come from 429s and errors.
+                self.limit = min(self.max_concurrency, self.limit + 1.0 / self.limit)
+            self._slot.notify_all()
+
+    def _on_failure(self, error: bool) -> None:
+        with self._slot:
+            if error:
+                self.errors += 1
+            else:
+                self.throttled += 1
+            self.limit = max(self.min_concurrency, self.limit / 2)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._slot:
+            return {
+                "calls": self.calls,
+                "throttled": self.throttled,
+                "errors": self.errors,
+                "in_flight": self.in_flight,
+                "concurrency_limit": round(self.limit, 2),
+                "latency_ewma_s": round(self.latency_ewma or 0.0, 4),
+            }
+
+
+_shared_gateway: Optional[LLMGateway] = None
+_shared_lock = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Returns the process-wide gateway configured from LLM_* environment variables."""
+    global _shared_gateway
+    with _shared_lock:
+        if _shared_gateway is None:
+            _shared_gateway = LLMGateway(
+                requests_per_minute=float(os.getenv("LLM_RPM", "0")),
+                tokens_per_minute=float(os.getenv("LLM_TPM", "0")),
+                max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+                max_retries=int(os.getenv("LLM_MAX_RETRIES", "5")),
+            )
+        return _shared_gateway
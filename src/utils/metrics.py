@@ -0,0 +1,215 @@
+# src/utils/metrics.py
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Structured events have an "event" name plus fields. The ones emitted by the pipeline:
+#   node        node, seconds
+#   article     stage, article_id, seconds
+#   llm_call    seconds, status (ok|throttled|error), prompt_tokens, completion_tokens
+#   scrape      url, seconds, bytes, cache (miss|hit|revalidated|off), status (ok|error)
+#   pdf_render  seconds
+#   context_trim stage, article_id, strategy, original_tokens, kept_tokens
+#   run         run_id, seconds
+
+
+class RunRecorder:
+    """Collects the structured events of one pipeline run and summarizes them into a run report."""
+
+    def __init__(self, run_id: Optional[str] = None):
+        self.run_id = run_id or uuid.uuid4().hex
+        self.started_at = time.time()
+        self.events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def record(self, event: Dict[str, Any]) -> None:
+        with self._lock:
+            self.events.append(event)
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            events = list(self.events)
+        report = {
+            "run_id": self.run_id,
+            "total_seconds": round(time.time() - self.started_at, 3),
+            "nodes": {},
+            "articles": {},
+            "llm": {"calls": 0, "throttled": 0, "errors": 0, "seconds": 0.0, "prompt_tokens": 0, "completion_tokens": 0},
+            "scrape": {"requests": 0, "cache_hits": 0, "errors": 0, "seconds": 0.0, "bytes": 0},
+            "pdf": {"renders": 0, "seconds": 0.0},
+            "context": {"trimmed": 0, "original_tokens": 0, "kept_tokens": 0},
+        }
+        for event in events:
+            kind, seconds = event["event"], event.get("seconds", 0.0)
+            if kind == "node":
+                report["nodes"][event["node"]] = round(report["nodes"].get(event["node"], 0.0) + seconds, 3)
+            elif kind == "article":
+                stages = report["articles"].setdefault(event["article_id"], {})
+                stages[event["stage"]] = round(stages.get(event["stage"], 0.0) + seconds, 3)
+            elif kind == "llm_call":
+                llm = report["llm"]
+                status = event.get("status", "ok")
+                llm["calls"] += 1
+                llm["throttled"] += status == "throttled"
+                llm["errors"] += status == "error"
+                llm["seconds"] = round(llm["seconds"] + seconds, 3)
+                llm["prompt_tokens"] += event.get("prompt_tokens", 0)
+                llm["completion_tokens"] += event.get("completion_tokens", 0)
+            elif kind == "scrape":
+                scrape = report["scrape"]
+                scrape["requests"] += 1
+                scrape["cache_hits"] += event.get("cache") in ("hit", "revalidated")
+                scrape["errors"] += event.get("status") == "error"
+                scrape["seconds"] = round(scrape["seconds"] + seconds, 3)
+                scrape["bytes"] += event.get("bytes", 0)
+            elif kind == "pdf_render":
+                report["pdf"]["renders"] += 1
+                report["pdf"]["seconds"] = round(report["pdf"]["seconds"] + seconds, 3)
+            elif kind == "context_trim":
+                context = report["context"]
+                context["trimmed"] += 1
+                context["original_tokens"] += event.get("original_tokens", 0)
+                context["kept_tokens"] += event.get("kept_tokens", 0)
+        return report
+
+
+class MetricsRegistry:
+    """Process-wide counters and summaries (sum + count), rendered in Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Tuple], float] = {}
+        self._summaries: Dict[Tuple[str, Tuple], List[float]] = {}
+        self._help: Dict[str, Tuple[str, str]] = {}
+
+    def inc(self, name: str, value: float = 1.0, help: str = "", **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._help.setdefault(name, ("counter", help))
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, help: str = "", **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._help.setdefault(name, ("summary", help))
+            entry = self._summaries.setdefault(key, [0.0, 0])
+            entry[0] += value
+            entry[1] += 1
+
+    def render_prometheus(self, gauges: Optional[Dict[str, float]] = None) -> str:
+        lines: List[str] = []
+        with self._lock:
+            counters = dict(self._counters)
+            summaries = {k: list(v) for k, v in self._summaries.items()}
+            help_text = dict(self._help)
+        for name in sorted(help_text):
+            kind, text = help_text[name]
+            lines.append(f"# HELP {name} {text or name}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "counter":
+                for (metric, labels), value in sorted(counters.items()):
+                    if metric == name:
+                        lines.append(f"{name}{_labels(labels)} {value:g}")
+            else:
+                for (metric, labels), (total, count) in sorted(summaries.items()):
+                    if metric == name:
+                        lines.append(f"{name}_sum{_labels(labels)} {total:.6f}")
+                        lines.append(f"{name}_count{_labels(labels)} {count}")
+        for name, value in sorted((gauges or {}).items()):
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels: Tuple) -> str:
+    if not labels:
+        return ""
+    escaped = (f'{k}="{str(v)}"'.replace("\n", " ") for k, v in labels)
+    return "{" + ",".join(escaped) + "}"
+
+
+registry = MetricsRegistry()
+_current_run: ContextVar[Optional[RunRecorder]] = ContextVar("digest_run", default=None)
+
+
+def _update_registry(event: Dict[str, Any]) -> None:
+    kind, seconds = event["event"], event.get("seconds", 0.0)
+    if kind == "node":
+        registry.observe("digest_node_seconds", seconds, "Wall time per LangGraph node", node=event["node"])
+    elif kind == "article":
+        registry.observe("digest_article_seconds", seconds, "Wall time per article and stage", stage=event["stage"])
+    elif kind == "llm_call":
+        status = event.get("status", "ok")
+        registry.observe("digest_llm_call_seconds", seconds, "LLM call latency", status=status)
+        registry.inc("digest_llm_tokens_total", event.get("prompt_tokens", 0), "LLM tokens used", kind="prompt")
+        registry.inc("digest_llm_tokens_total", event.get("completion_tokens", 0), "LLM tokens used", kind="completion")
+    elif kind == "scrape":
+        registry.observe("digest_scrape_seconds", seconds, "Article download latency", cache=event.get("cache", "off"))
+        registry.inc("digest_scrape_bytes_total", event.get("bytes", 0), "Article bytes downloaded")
+        if event.get("status") == "error":
+            registry.inc("digest_scrape_errors_total", 1, "Failed article downloads")
+    elif kind == "pdf_render":
+        registry.observe("digest_pdf_render_seconds", seconds, "PDF report render time")
+    elif kind == "context_trim":
+        stage = event.get("stage", "")
+        registry.inc("digest_context_trimmed_total", 1, "Articles trimmed to fit the context budget", stage=stage)
+        registry.inc(
+            "digest_context_trimmed_tokens_total", event.get("original_tokens", 0) - event.get("kept_tokens", 0),
+            "Article tokens left out of prompts by the context budget", stage=stage,
+        )
+    elif kind == "run":
+        registry.observe("digest_run_seconds", seconds, "End-to-end pipeline run time")
+
+
+def emit(event: str, **fields: Any) -> None:
+    """Emits a structured event to the current run (if any) and the process-wide registry."""
+    record = {"event": event, "time": time.time(), **fields}
+    run = _current_run.get()
+    if run is not None:
+        record.setdefault("run_id", run.run_id)
+        run.record(record)
+    _update_registry(record)
+    if os.getenv("METRICS_LOG_EVENTS", "0") == "1":
+        print(json.dumps(record, default=str))
+
+
+def current_run() -> Optional[RunRecorder]:
+    return _current_run.get()
+
+
+@contextmanager
+def track_run(run_id: Optional[str] = None) -> Iterator[RunRecorder]:
+    """Collects every event emitted inside the block (and in threads started with its context)."""
+    recorder = RunRecorder(run_id)
+    token = _current_run.set(recorder)
+    try:
+        yield recorder
+    finally:
+        emit("run", seconds=round(time.time() - recorder.started_at, 6))
+        _current_run.reset(token)
+
+
+@contextmanager
+def timed(event: str, **fields: Any) -> Iterator[Dict[str, Any]]:
+    """Emits `event` with the block's wall time in seconds; the yielded dict can add fields."""
+    extra: Dict[str, Any] = {}
+    start = time.perf_counter()
+    try:
+        yield extra
+    finally:
+        emit(event, seconds=round(time.perf_counter() - start, 6), **fields, **extra)
+
+
+def instrument_node(name: str, fn: Callable) -> Callable:
+    """Wraps a LangGraph node function so its wall time is recorded."""
+    @functools.wraps(fn)
+    def wrapper(state):
+        with timed("node", node=name):
+            return fn(state)
+    return wrapper
@@ -0,0 +1,129 @@
+# src/utils/page_cache.py
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, NamedTuple, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track where a click came from and never change the page.
+_TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "mc_cid", "mc_eid", "ocid", "cmpid", "ref", "ref_src"}
+
+
+def canonical_url(url: str) -> str:
+    """Normalizes a URL so the same page fetched via different links shares a cache entry."""
+    parts = urlsplit(url.strip())
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_PARAMS
+    ]
+    path = parts.path or "/"
+    if len(path) > 1 and path.endswith("/"):
+        path = path[:-1]
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(sorted(query)), ""))
+
+
+class CachedPage(NamedTuple):
+    url: str
+    html: str
+    text: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+
+class PageCache:
+    """On-disk cache of downloaded article pages (raw HTML + newspaper3k text), backed by SQLite.
+
+    An entry younger than ``ttl_seconds`` is served without touching the network. Older
+    entries are revalidated with a conditional GET using their ETag / Last-Modified
+    validators, and entries older than ``max_age_seconds`` are purged.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 6 * 3600, max_age_seconds: float = 7 * 86400):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                html TEXT NOT NULL,
+                text TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+        self.purge_expired()
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, html, text, etag, last_modified, fetched_at FROM pages WHERE url = ?",
+                (canonical_url(url),),
+            ).fetchone()
+        return CachedPage(*row) if row else None
+
+    def is_fresh(self, page: CachedPage) -> bool:
+        return time.time() - page.fetched_at < self.ttl_seconds
+
+    def put(self, url: str, html: str, text: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, html, text, etag, last_modified, fetched_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (canonical_url(url), html, text, etag, last_modified, time.time()),
+            )
+            self._conn.commit()
+
+    def touch(self, url: str) -> None:
+        """Marks an entry as fresh again after a 304 Not Modified response."""
+        with self._lock:
+            self._conn.execute("UPDATE pages SET fetched_at = ? WHERE url = ?", (time.time(), canonical_url(url)))
+            self._conn.commit()
+
+    def record(self, outcome: str) -> None:
+        """Counts a lookup outcome: "hits", "revalidated" or "misses"."""
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def purge_expired(self) -> None:
+        if not self.max_age_seconds:
+            return
+        with self._lock:
+            self._conn.execute("DELETE FROM pages WHERE fetched_at < ?", (time.time() - self.max_age_seconds,))
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+        return {"hits": self.hits, "revalidated": self.revalidated, "misses": self.misses, "entries": entries}
+
+
+_shared_cache: Optional[PageCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_page_cache() -> Optional[PageCache]:
+    """Returns the process-wide page cache, or None when PAGE_CACHE_ENABLED=0."""
+    global _shared_cache
+    if os.getenv("PAGE_CACHE_ENABLED", "1") == "0":
+        return None
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = PageCache(
+                path=os.getenv("PAGE_CACHE_PATH", "data/cache/page_cache.sqlite"),
+                ttl_seconds=float(os.getenv("PAGE_CACHE_TTL", str(6 * 3600))),
+                max_age_seconds=float(os.getenv("PAGE_CACHE_MAX_AGE", str(7 * 86400))),
+            )
+        return _shared_cache
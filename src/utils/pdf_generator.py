@@ -1,91 +1,217 @@
 # src/utils/pdf_generator.py
+import functools
+import multiprocessing
 import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
 from reportlab.lib.pagesizes import LETTER
 from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, ListFlowable, ListItem
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.platypus import Frame, LayoutError, Paragraph, Spacer, ListFlowable, ListItem
 from reportlab.lib.units import inch
 from reportlab.lib.enums import TA_LEFT
 from reportlab.lib import colors
 
 from src.models import Article, ArticleSummary, ArticleInsight
+from src.utils.report_store import safe_filename
 
 
-def _safe_filename(base: str) -> str:
-    return "".join(c for c in base if c.isalnum() or c in ("_", "-", ".", " ")).rstrip()
+@functools.lru_cache(maxsize=1)
+def _styles():
+    """The sample style sheet, built once per process (styles are read-only during a build)."""
+    return getSampleStyleSheet()
+
+
+class _FrameWriter:
+    """Lays flowables out page by page as they arrive, using a Canvas and one Frame per page.
+
+    This is the documented platypus layer under the doc templates (``Frame.add`` draws a
+    flowable if it fits, ``Frame.split`` breaks one across frames), so a report can be
+    written from a generator without first holding every flowable in a story list.
+    The frame matches SimpleDocTemplate's, so the layout is the same as a doc.build.
+    """
+
+    def __init__(self, path: str, pagesize=LETTER, margin: float = 54):
+        self.canvas = Canvas(path, pagesize=pagesize)
+        self._width, self._height = pagesize
+        self._margin = margin
+        self._new_frame()
+
+    def _new_frame(self) -> None:
+        m = self._margin
+        self._frame = Frame(m, m, self._width - 2 * m, self._height - 2 * m)
+        self._placed = 0
+
+    def add(self, flowable) -> None:
+        pending = [flowable]
+        while pending:
+            head = pending.pop(0)
+            if self._frame.add(head, self.canvas):
+                self._placed += 1
+                continue
+            parts = self._frame.split(head, self.canvas)
+            if parts:
+                pending[:0] = parts
+            elif self._placed:
+                self.canvas.showPage()
+                self._new_frame()
+                pending.insert(0, head)
+            else:
+                raise LayoutError(f"{type(head).__name__} is too large to fit on a page")
+
+    def save(self) -> None:
+        self.canvas.showPage()
+        self.canvas.save()
+
+
+def _article_flowables(
+    idx: int,
+    article: Article,
+    summary: Optional[ArticleSummary],
+    ins_list: List[ArticleInsight],
+) -> Iterator:
+    styles = _styles()
+    # Article Header
+    yield Paragraph(f"{idx}. {article.title}", styles["Heading2"])
+    meta_text = f"Source: {article.source} | Date: {article.published_date or 'N/A'} | URL: {article.url}"
+    if article.relevance_score is not None:
+        meta_text += f" | Relevance: {article.relevance_score:.2f}"
+    yield Paragraph(meta_text, styles["Normal"])
+    if article.duplicates:
+        also = ", ".join(sorted({d.get("source") or "Unknown" for d in article.duplicates}))
+        yield Paragraph(f"Also reported by: {also}", styles["Italic"])
+    yield Spacer(1, 0.1 * inch)
+
+    # Summary + Sentiment
+    if summary:
+        yield Paragraph("Summary", styles["Heading3"])
+        yield Paragraph(summary.summary, styles["BodyText"])
+        sent_meta = f"Sentiment: {summary.sentiment}"
+        if getattr(summary, "sentiment_confidence", None):
+            sent_meta += f" (confidence={summary.sentiment_confidence})"
+        yield Paragraph(sent_meta, styles["Italic"])
+
+    # Insights
+    bullets = []
+    for record in ins_list:
+        for insight in record.insights:
+            bullets.append(Paragraph(insight, styles["BodyText"]))
+    if bullets:
+        yield Spacer(1, 0.05 * inch)
+        yield Paragraph("Actionable Insights", styles["Heading3"])
+        yield ListFlowable(
+            [ListItem(b) for b in bullets],
+            bulletType="bullet",
+            start="circle",
+            bulletColor=colors.black,
+            leftIndent=18,
+        )
+
+    yield Spacer(1, 0.25 * inch)
 
 
 def generate_daily_report(
-    articles: List[Article],
+    articles: Iterable[Article],
     summaries: List[ArticleSummary],
     insights: List[ArticleInsight],
     output_dir: str = "data/reports",
     report_title: Optional[str] = None,
+    filename: Optional[str] = None,
+    generated_at: Optional[datetime] = None,
+    headings: Optional[Dict[str, str]] = None,
 ) -> str:
+    """Renders the digest PDF and returns its path.
+
+    ``articles`` may be any iterable (e.g. a generator reading articles lazily); each
+    article's flowables are laid out as they are produced, instead of all up front.
+    The file is named after the title and time unless ``filename`` is given.
+    ``headings`` maps an article id to a section heading printed before that article.
+    """
     os.makedirs(output_dir, exist_ok=True)
-    now = datetime.now()
+    now = generated_at or datetime.now()
     timestamp = now.strftime("%Y%m%d_%H%M%S")
     pretty_timestamp = now.strftime("%Y-%m-%d %H:%M")
     title = report_title or f"Daily Research Digest"
-    filename = f"{_safe_filename(title)} - {timestamp}.pdf"
+    filename = filename or f"{safe_filename(title)} - {timestamp}.pdf"
     path = os.path.join(output_dir, filename)
 
-    doc = SimpleDocTemplate(path, pagesize=LETTER, leftMargin=54, rightMargin=54, topMargin=54, bottomMargin=54)
-    styles = getSampleStyleSheet()
-    story = []
-
-    # Title
-    story.append(Paragraph(title, styles["Title"]))
-    story.append(Paragraph(f"Generated on {pretty_timestamp}", styles["Italic"]))
-    story.append(Spacer(1, 0.2 * inch))
+    writer = _FrameWriter(path, pagesize=LETTER, margin=54)
+    styles = _styles()
 
     # Index by article id for quick lookup
     summaries_by_article = {s.article_id: s for s in summaries}
-    insights_by_article = {}
+    insights_by_article: Dict[str, List[ArticleInsight]] = {}
     for ins in insights:
         insights_by_article.setdefault(ins.article_id, []).append(ins)
 
-    for idx, article in enumerate(articles, start=1):
-        # Article Header
-        story.append(Paragraph(f"{idx}. {article.title}", styles["Heading2"]))
-        meta_text = f"Source: {article.source} | Date: {article.published_date or 'N/A'} | URL: {article.url}"
-        story.append(Paragraph(meta_text, styles["Normal"]))
-        story.append(Spacer(1, 0.1 * inch))
-
-        # Summary + Sentiment
-        summary = summaries_by_article.get(article.id)
-        if summary:
-            story.append(Paragraph("Summary", styles["Heading3"]))
-            story.append(Paragraph(summary.summary, styles["BodyText"]))
-            sent_meta = f"Sentiment: {summary.sentiment}"
-            if getattr(summary, "sentiment_confidence", None):
-                sent_meta += f" (confidence={summary.sentiment_confidence})"
-            story.append(Paragraph(sent_meta, styles["Italic"]))
-
-        # Insights
-        ins_list = insights_by_article.get(article.id, [])
-        if ins_list:
-            bullets = []
-            for record in ins_list:
-                for insight in record.insights:
-                    bullets.append(Paragraph(insight, styles["BodyText"]))
-            if bullets:
-                story.append(Spacer(1, 0.05 * inch))
-                story.append(Paragraph("Actionable Insights", styles["Heading3"]))
-                story.append(
-                    ListFlowable(
-                        [ListItem(b) for b in bullets],
-                        bulletType="bullet",
-                        start="circle",
-                        bulletColor=colors.black,
-                        leftIndent=18,
-                    )
-                )
-
-        story.append(Spacer(1, 0.25 * inch))
-
-    doc.build(story)
+    def story() -> Iterator:
+        # Title
+        yield Paragraph(title, styles["Title"])
+        yield Paragraph(f"Generated on {pretty_timestamp}", styles["Italic"])
+        yield Spacer(1, 0.2 * inch)
+        for idx, article in enumerate(articles, start=1):
+            if headings and article.id in headings:
+                yield Paragraph(headings[article.id], styles["Heading1"])
+            yield from _article_flowables(
+                idx, article, summaries_by_article.get(article.id), insights_by_article.get(article.id, [])
+            )
+
+    for flowable in story():
+        writer.add(flowable)
+    writer.save()
     return path
 
 
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _render_pool() -> Optional[ProcessPoolExecutor]:
+    """Process-wide pool for PDF rendering; None when PDF_RENDER_PROCESSES=0."""
+    global _pool
+    processes = int(os.getenv("PDF_RENDER_PROCESSES", "2"))
+    if processes <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the server process has threads and open SQLite connections.
+            _pool = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def render_daily_report(
+    articles: Iterable[Article],
+    summaries: List[ArticleSummary],
+    insights: List[ArticleInsight],
+    output_dir: str = "data/reports",
+    report_title: Optional[str] = None,
+    filename: Optional[str] = None,
+    generated_at: Optional[datetime] = None,
+    headings: Optional[Dict[str, str]] = None,
+) -> str:
+    """Like generate_daily_report, but renders in a worker process so layout doesn't hold this process's GIL.
+
+    The worker needs the articles pickled as a list, but the report never prints the
+    article text, so each article's text is dropped as it is read and the list stays
+    small even when ``articles`` is a generator of full articles. Falls back to rendering in-process if the pool is disabled or broken.
+    """
+    global _pool
+    pool = _render_pool()
+    if pool is None:
+        return generate_daily_report(articles, summaries, insights, output_dir, report_title, filename, generated_at, headings)
+    light_articles = [a.model_copy(update={"raw_text": None}) for a in articles]
+    try:
+        return pool.submit(
+            generate_daily_report, light_articles, summaries, insights, output_dir, report_title,
+            filename, generated_at, headings,
+        ).result()
+    except BrokenProcessPool:
+        print("⚠️ PDF worker pool broke; rendering in-process")
+        with _pool_lock:
+            _pool = None
+        return generate_daily_report(
+            light_articles, summaries, insights, output_dir, report_title, filename, generated_at, headings
+        )
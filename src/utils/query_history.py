@@ -0,0 +1,176 @@
+# src/utils/query_history.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.models import Article, ArticleInsight, ArticleSummary, ReportEntry
+from src.utils.page_cache import canonical_url
+
+
+def query_key(query: str) -> str:
+    """Case- and whitespace-insensitive history key of a query."""
+    return " ".join(query.lower().split())
+
+
+def content_hash(text: str) -> str:
+    """Hash of the article text, insensitive to case and whitespace, for spotting re-published copies."""
+    return hashlib.sha256(" ".join((text or "").lower().split()).encode("utf-8")).hexdigest()
+
+
+class QueryHistory:
+    """Per-query record of the articles earlier digests covered, backed by SQLite.
+
+    Each row is one article a digest for the query summarized: its canonical URL, content
+    hash, and the summary/insight produced for it, so an incremental run can skip what
+    was already covered and carry the earlier summaries forward without new LLM calls.
+    Rows not seen for ``max_age_seconds`` are purged.
+    """
+
+    def __init__(self, path: str, max_age_seconds: float = 30 * 86400):
+        self.path = path
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS seen_articles (
+                query_key TEXT NOT NULL,
+                url TEXT NOT NULL,
+                content_hash TEXT,
+                article TEXT NOT NULL,
+                summary TEXT,
+                insight TEXT,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                PRIMARY KEY (query_key, url)
+            );
+            CREATE INDEX IF NOT EXISTS seen_articles_recent ON seen_articles (query_key, last_seen);
+            """
+        )
+        self._conn.commit()
+        self.purge_expired()
+
+    def seen(self, query: str) -> Tuple[Set[str], Set[str]]:
+        """(canonical URLs, content hashes) of every article earlier digests for the query summarized."""
+        with self._lock:
+            # Rows without a summary (left by older versions) are not coverage: their article is retried
+            rows = self._conn.execute(
+                "SELECT url, content_hash FROM seen_articles WHERE query_key = ? AND summary IS NOT NULL",
+                (query_key(query),),
+            ).fetchall()
+        return {url for url, _ in rows}, {h for _, h in rows if h}
+
+    def record(
+        self,
+        query: str,
+        articles: List[Article],
+        summaries: List[ArticleSummary],
+        insights: List[ArticleInsight],
+    ) -> None:
+        """Remembers the articles a digest covered, with their summary and insight.
+
+        Articles whose summary failed are left out, so a later incremental run picks them up again.
+        """
+        summaries_by_article = {s.article_id: s for s in summaries}
+        insights_by_article = {i.article_id: i for i in insights}
+        now = time.time()
+        rows = []
+        for article in articles:
+            summary = summaries_by_article.get(article.id)
+            if summary is None:
+                continue
+            insight = insights_by_article.get(article.id)
+            rows.append((
+                query_key(query),
+                canonical_url(article.url),
+                article.content_hash,
+                article.model_dump_json(include={"id", "title", "url", "source", "published_date", "relevance_score"}),
+                summary.model_dump_json(),
+                insight.model_dump_json() if insight else None,
+                now,
+                now,
+            ))
+        with self._lock:
+            self._conn.executemany(
+                """
+                INSERT INTO seen_articles
+                    (query_key, url, content_hash, article, summary, insight, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (query_key, url) DO UPDATE SET
+                    content_hash = COALESCE(excluded.content_hash, content_hash),
+                    article = excluded.article,
+                    summary = excluded.summary,
+                    insight = COALESCE(excluded.insight, insight),
+                    last_seen = excluded.last_seen
+                """,
+                rows,
+            )
+            self._conn.commit()
+
+    def previous(self, query: str, limit: int) -> List[ReportEntry]:
+        """Report entries for the most recently covered articles that have a summary, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT article, summary, insight FROM seen_articles "
+                "WHERE query_key = ? AND summary IS NOT NULL ORDER BY last_seen DESC, first_seen DESC LIMIT ?",
+                (query_key(query), limit),
+            ).fetchall()
+        entries = []
+        for article_json, summary_json, insight_json in rows:
+            article = json.loads(article_json)
+            summary = ArticleSummary.model_validate_json(summary_json)
+            insight = ArticleInsight.model_validate_json(insight_json) if insight_json else None
+            entries.append(ReportEntry(
+                article_id=article["id"],
+                title=article["title"],
+                url=article["url"],
+                source=article["source"],
+                published_date=article.get("published_date"),
+                relevance_score=article.get("relevance_score"),
+                summary=summary.summary,
+                sentiment=summary.sentiment,
+                sentiment_confidence=summary.sentiment_confidence,
+                insights=insight.insights if insight else [],
+                categories=(insight.categories or []) if insight else [],
+                is_new=False,
+            ))
+        return entries
+
+    def purge_expired(self) -> None:
+        if not self.max_age_seconds:
+            return
+        with self._lock:
+            self._conn.execute("DELETE FROM seen_articles WHERE last_seen < ?", (time.time() - self.max_age_seconds,))
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            queries, entries = self._conn.execute(
+                "SELECT COUNT(DISTINCT query_key), COUNT(*) FROM seen_articles"
+            ).fetchone()
+        return {"queries": queries, "entries": entries}
+
+
+_shared_history: Optional[QueryHistory] = None
+_shared_lock = threading.Lock()
+
+
+def get_query_history() -> Optional[QueryHistory]:
+    """Returns the process-wide query history, or None when QUERY_HISTORY_ENABLED=0."""
+    global _shared_history
+    if os.getenv("QUERY_HISTORY_ENABLED", "1") == "0":
+        return None
+    with _shared_lock:
+        if _shared_history is None:
+            _shared_history = QueryHistory(
+                path=os.getenv("QUERY_HISTORY_PATH", "data/cache/query_history.sqlite"),
+                max_age_seconds=float(os.getenv("QUERY_HISTORY_MAX_AGE", str(30 * 86400))),
+            )
+        return _shared_history
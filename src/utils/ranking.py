@@ -0,0 +1,109 @@
+# src/utils/ranking.py
+import math
+import os
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.models import Article
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it", "of",
+    "on", "or", "that", "the", "to", "was", "with", "latest", "news", "today",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    return _WORD_RE.findall((text or "").lower())
+
+
+def query_terms(query: str) -> List[str]:
+    """Distinct query tokens without stopwords (all tokens if the query is only stopwords)."""
+    tokens = tokenize(query)
+    terms = [t for t in dict.fromkeys(tokens) if t not in _STOPWORDS]
+    return terms or list(dict.fromkeys(tokens))
+
+
+def bm25_scores(query: str, documents: Sequence[str], k1: float = 1.5, b: float = 0.75) -> np.ndarray:
+    """Okapi BM25 score of each document for the query, with IDF taken over the documents themselves.
+
+    Only query terms are counted (one regex scan per document), so the term-frequency
+    matrix is documents x query terms and the scoring itself is a few NumPy operations.
+    """
+    terms = query_terms(query)
+    if not documents or not terms:
+        return np.zeros(len(documents))
+    column = {term: i for i, term in enumerate(terms)}
+    pattern = re.compile(r"(?<![a-z0-9])(" + "|".join(map(re.escape, terms)) + r")(?![a-z0-9])")
+    tf = np.zeros((len(documents), len(terms)))
+    lengths = np.empty(len(documents))
+    for row, document in enumerate(documents):
+        lowered = (document or "").lower()
+        lengths[row] = len(lowered.split())
+        for term, count in Counter(pattern.findall(lowered)).items():
+            tf[row, column[term]] = count
+    doc_freq = np.count_nonzero(tf, axis=0)
+    idf = np.log1p((len(documents) - doc_freq + 0.5) / (doc_freq + 0.5))
+    norm = k1 * (1 - b + b * lengths / max(lengths.mean(), 1.0))
+    return ((tf * (k1 + 1)) / (tf + norm[:, None]) * idf).sum(axis=1)
+
+
+class RelevanceRanker:
+    """Picks the candidates most relevant to the query before the expensive LLM stages.
+
+    SerpAPI candidates are first ordered by BM25 over title + snippet so the likeliest
+    ones are downloaded first; ``overfetch`` x max_articles of them are parsed, scored
+    again over title + the lead of the text (``text_chars``), and only the top
+    max_articles are kept.
+    """
+
+    def __init__(
+        self,
+        overfetch: float = 2.0,
+        k1: float = 1.5,
+        b: float = 0.75,
+        title_weight: int = 2,
+        text_chars: int = 3000,
+    ):
+        self.overfetch = max(1.0, overfetch)
+        self.text_chars = text_chars
+        self.k1 = k1
+        self.b = b
+        self.title_weight = title_weight
+
+    def fetch_target(self, max_articles: int) -> int:
+        return int(math.ceil(max_articles * self.overfetch))
+
+    def rank_candidates(self, query: str, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Orders SerpAPI candidates by title/snippet relevance; ties keep SerpAPI order."""
+        documents = [
+            " ".join([c["title"]] * self.title_weight + [c["item"].get("snippet", "")]) for c in candidates
+        ]
+        scores = bm25_scores(query, documents, self.k1, self.b)
+        order = sorted(range(len(candidates)), key=lambda i: -scores[i])
+        return [candidates[i] for i in order]
+
+    def select(self, query: str, articles: List[Article], max_articles: int) -> List[Article]:
+        """Scores parsed articles, records ``relevance_score`` (0-1, best = 1) and keeps the top ones."""
+        documents = [
+            " ".join([a.title] * self.title_weight + [(a.raw_text or "")[:self.text_chars]]) for a in articles
+        ]
+        scores = bm25_scores(query, documents, self.k1, self.b)
+        best = scores.max() if len(scores) else 0.0
+        for article, score in zip(articles, scores):
+            article.relevance_score = round(float(score / best), 3) if best > 0 else 0.0
+        order = sorted(range(len(articles)), key=lambda i: -scores[i])
+        return [articles[i] for i in order[:max_articles]]
+
+
+def ranker_from_env() -> Optional[RelevanceRanker]:
+    """Returns the relevance ranker configured from RANKING_* variables, or None when RANKING_ENABLED=0."""
+    if os.getenv("RANKING_ENABLED", "1") == "0":
+        return None
+    return RelevanceRanker(
+        overfetch=float(os.getenv("RANKING_OVERFETCH", "2")),
+        text_chars=int(os.getenv("RANKING_TEXT_CHARS", "3000")),
+    )
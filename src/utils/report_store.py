@@ -0,0 +1,350 @@
+# src/utils/report_store.py
+import hashlib
+import html
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.models import Article, ArticleInsight, ArticleSummary, DigestReport, ReportEntry
+from src.utils.metrics import timed
+from src.utils.singleflight import SingleFlight
+
+# format -> (file extension, mimetype)
+REPORT_FORMATS = {
+    "pdf": ("pdf", "application/pdf"),
+    "md": ("md", "text/markdown; charset=utf-8"),
+    "html": ("html", "text/html; charset=utf-8"),
+    "json": ("json", "application/json"),
+}
+_MODEL_FILE = "report.json"
+
+
+def safe_filename(base: str) -> str:
+    return "".join(c for c in base if c.isalnum() or c in ("_", "-", ".", " ")).rstrip()
+
+
+def build_report(
+    query: str,
+    articles: List[Article],
+    summaries: List[ArticleSummary],
+    insights: List[ArticleInsight],
+    title: Optional[str] = None,
+    previous: Sequence[ReportEntry] = (),
+    incremental: bool = False,
+) -> DigestReport:
+    """Joins articles with their summary and insights into the report model (article text is left out).
+
+    ``previous`` entries (carried forward by an incremental run) follow the new ones.
+    """
+    summaries_by_article = {s.article_id: s for s in summaries}
+    insights_by_article: Dict[str, List[ArticleInsight]] = {}
+    for record in insights:
+        insights_by_article.setdefault(record.article_id, []).append(record)
+
+    entries = []
+    for article in articles:
+        summary = summaries_by_article.get(article.id)
+        records = insights_by_article.get(article.id, [])
+        entries.append(ReportEntry(
+            article_id=article.id,
+            title=article.title,
+            url=article.url,
+            source=article.source,
+            published_date=article.published_date,
+            relevance_score=article.relevance_score,
+            duplicates=article.duplicates,
+            summary=summary.summary if summary else None,
+            sentiment=summary.sentiment if summary else None,
+            sentiment_confidence=summary.sentiment_confidence if summary else None,
+            insights=[i for r in records for i in r.insights],
+            categories=[c for r in records for c in (r.categories or [])],
+            content_hash=article.content_hash,
+        ))
+    covered = {entry.url for entry in entries}
+    return DigestReport(
+        title=title or f"Daily Research Digest - {query}",
+        query=query,
+        generated_at=datetime.now().isoformat(timespec="seconds"),
+        entries=entries + [entry for entry in previous if entry.url not in covered],
+        incremental=incremental,
+    )
+
+
+def report_id(report: DigestReport) -> str:
+    """Content hash of the report, so identical digests share it.
+
+    The generation time and the per-run article ids are left out, and URLs are
+    canonicalized, so re-running a digest over the same articles with the same
+    summaries and insights gives the same id.
+    """
+    from src.utils.page_cache import canonical_url
+    content = report.model_dump(exclude={"generated_at": True, "entries": {"__all__": {"article_id"}}})
+    for entry in content["entries"]:
+        entry["url"] = canonical_url(entry["url"])
+        entry["duplicates"] = sorted(
+            ({**d, "url": canonical_url(d.get("url", ""))} for d in entry["duplicates"]),
+            key=lambda d: (d["url"], d.get("source") or ""),
+        )
+    canonical = json.dumps(content, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:24]
+
+
+def _generated_on(report: DigestReport) -> str:
+    return datetime.fromisoformat(report.generated_at).strftime("%Y-%m-%d %H:%M")
+
+
+def _also_reported_by(entry: ReportEntry) -> str:
+    return ", ".join(sorted({d.get("source") or "Unknown" for d in entry.duplicates}))
+
+
+NEW_SECTION = "New since the last digest"
+PREVIOUS_SECTION = "Covered in earlier digests"
+
+
+def report_sections(report: DigestReport) -> List[Tuple[Optional[str], List[ReportEntry]]]:
+    """(heading, entries) pairs; a regular digest is a single section without a heading."""
+    new = [e for e in report.entries if e.is_new]
+    previous = [e for e in report.entries if not e.is_new]
+    if not report.incremental and not previous:
+        return [(None, new)]
+    sections = [(NEW_SECTION, new)]
+    if previous:
+        sections.append((PREVIOUS_SECTION, previous))
+    return sections
+
+
+def render_markdown(report: DigestReport) -> str:
+    lines = [f"# {report.title}", "", f"_Generated on {_generated_on(report)}_", ""]
+    idx = 0
+    for heading, entries in report_sections(report):
+        if heading:
+            lines += [f"## {heading}", ""]
+            if not entries:
+                lines += ["_No new articles._", ""]
+        level = "###" if heading else "##"
+        for entry in entries:
+            idx += 1
+            lines += _markdown_entry(idx, entry, level)
+    return "\n".join(lines)
+
+
+def _markdown_entry(idx: int, entry: ReportEntry, level: str) -> List[str]:
+    lines = [f"{level} {idx}. [{entry.title}]({entry.url})", ""]
+    meta = f"**Source:** {entry.source} | **Date:** {entry.published_date or 'N/A'}"
+    if entry.relevance_score is not None:
+        meta += f" | **Relevance:** {entry.relevance_score:.2f}"
+    lines += [meta, ""]
+    if entry.duplicates:
+        lines += [f"_Also reported by: {_also_reported_by(entry)}_", ""]
+    if entry.summary:
+        sentiment = f"Sentiment: {entry.sentiment}"
+        if entry.sentiment_confidence:
+            sentiment += f" (confidence={entry.sentiment_confidence})"
+        lines += [f"{level}# Summary", "", entry.summary, "", f"_{sentiment}_", ""]
+    if entry.insights:
+        lines += [f"{level}# Actionable Insights", ""] + [f"- {i}" for i in entry.insights] + [""]
+    return lines
+
+
+def render_html(report: DigestReport) -> str:
+    """Standalone page; the ``#digest-report`` section uses the frontend's classes so it can be embedded."""
+    esc = html.escape
+    parts = [
+        f"<h2>📊 {esc(report.title)}</h2>",
+        f"<p><strong>Generated on:</strong> {_generated_on(report)}</p>",
+        f"<p><strong>Articles analyzed:</strong> {len(report.entries)}</p>",
+    ]
+    for heading, entries in report_sections(report):
+        if heading:
+            parts.append(f"<h3>{esc(heading)}</h3>")
+            if not entries:
+                parts.append("<p><em>No new articles.</em></p>")
+        elif entries:
+            parts.append("<h3>📰 Article Summaries &amp; Insights</h3>")
+        parts.extend(_html_entry(entry) for entry in entries)
+    body = "\n".join(parts)
+    return (
+        "<!DOCTYPE html>\n<html lang=\"en\">\n<head>\n<meta charset=\"utf-8\">\n"
+        f"<title>{esc(report.title)}</title>\n<link rel=\"stylesheet\" href=\"/styles.css\">\n</head>\n"
+        f"<body>\n<div class=\"container\">\n<section id=\"digest-report\">\n{body}\n</section>\n</div>\n</body>\n</html>\n"
+    )
+
+
+def _html_entry(entry: ReportEntry) -> str:
+    esc = html.escape
+    parts = []
+    badge = ""
+    if entry.sentiment:
+        badge = f' <span class="sentiment-badge sentiment-{esc(entry.sentiment)}">{esc(entry.sentiment)}</span>'
+    meta = f"<strong>Source:</strong> {esc(entry.source)} | <strong>Date:</strong> {esc(entry.published_date or 'N/A')}"
+    if entry.relevance_score is not None:
+        meta += f" | <strong>Relevance:</strong> {entry.relevance_score:.2f}"
+    if entry.duplicates:
+        meta += f"<br><em>Also reported by: {esc(_also_reported_by(entry))}</em>"
+    parts.append('<div class="article-item">')
+    parts.append(
+        f'<div class="article-title"><a href="{esc(entry.url)}" target="_blank" rel="noopener">'
+        f"{esc(entry.title)}</a>{badge}</div>"
+    )
+    parts.append(f'<div class="article-meta">{meta}</div>')
+    if entry.summary:
+        parts.append(f'<div class="article-summary">{esc(entry.summary)}</div>')
+    if entry.insights:
+        items = "".join(f"<li>{esc(i)}</li>" for i in entry.insights)
+        parts.append(f'<div><strong>💡 Key Insights:</strong><ul class="insights-list">{items}</ul></div>')
+    parts.append("</div>")
+    return "\n".join(parts)
+
+
+def render_json(report: DigestReport) -> str:
+    return report.model_dump_json(indent=2)
+
+
+class ReportStore:
+    """Content-addressed on-disk store of digest reports.
+
+    The report model is saved under ``<root>/<report_id>/``; each format is rendered
+    from it the first time it is requested and kept next to it, so viewing or downloading
+    a report again only reads a file. Concurrent requests for the same file render it once.
+    """
+
+    def __init__(self, root: str = "data/reports"):
+        self.root = root
+        self.hits = 0
+        self.misses = 0
+        self._flights = SingleFlight(result_ttl=0)
+        self._lock = threading.Lock()
+
+    def _dir(self, report_id: str) -> str:
+        if not report_id.isalnum():
+            raise ValueError(f"Invalid report id: {report_id!r}")
+        return os.path.join(self.root, report_id)
+
+    def save(self, report: DigestReport) -> str:
+        """Stores the report model and returns its id.
+
+        Saving the same content again keeps the id but refreshes the stored generation time,
+        and drops the formats rendered with the old one so they show this run's date.
+        """
+        rid = report_id(report)
+        path = os.path.join(self._dir(rid), _MODEL_FILE)
+        stored = self.load(rid)
+        if stored is not None and stored.generated_at == report.generated_at:
+            return rid
+        self._write(path, render_json(report).encode("utf-8"))
+        if stored is not None:
+            for fmt in ("pdf", "md", "html"):
+                try:
+                    os.remove(os.path.join(self._dir(rid), self.filename(stored, fmt)))
+                except FileNotFoundError:
+                    pass
+        return rid
+
+    def load(self, report_id: str) -> Optional[DigestReport]:
+        path = os.path.join(self._dir(report_id), _MODEL_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return DigestReport.model_validate_json(f.read())
+
+    def path(self, report_id: str, fmt: str) -> Optional[str]:
+        """Path of the report in ``fmt``, rendering it on first request; None if the report is unknown."""
+        if fmt not in REPORT_FORMATS:
+            raise ValueError(f"Unsupported report format: {fmt!r}")
+        if fmt == "json":
+            path = os.path.join(self._dir(report_id), _MODEL_FILE)
+            self._record(os.path.exists(path))
+            return path if os.path.exists(path) else None
+
+        report = self.load(report_id)
+        if report is None:
+            return None
+        path = os.path.join(self._dir(report_id), self.filename(report, fmt))
+        if os.path.exists(path):
+            self._record(True)
+            return path
+        result, _ = self._flights.do(path, lambda: self._render(report, fmt, path))
+        return result
+
+    @staticmethod
+    def filename(report: DigestReport, fmt: str) -> str:
+        return f"{safe_filename(report.title) or 'report'}.{REPORT_FORMATS[fmt][0]}"
+
+    def _render(self, report: DigestReport, fmt: str, path: str) -> str:
+        if os.path.exists(path):  # rendered by a caller that finished just before us
+            self._record(True)
+            return path
+        self._record(False)
+        with timed("report_render", format=fmt):
+            if fmt == "pdf":
+                self._render_pdf(report, path)
+            else:
+                renderer: Callable[[DigestReport], str] = {"md": render_markdown, "html": render_html}[fmt]
+                self._write(path, renderer(report).encode("utf-8"))
+        return path
+
+    def _render_pdf(self, report: DigestReport, path: str) -> None:
+        from src.utils.pdf_generator import render_daily_report
+        articles = [
+            Article(id=e.article_id, title=e.title, url=e.url, source=e.source, published_date=e.published_date,
+                    relevance_score=e.relevance_score, duplicates=e.duplicates)
+            for e in report.entries
+        ]
+        summaries = [
+            ArticleSummary(article_id=e.article_id, summary=e.summary, sentiment=e.sentiment or "",
+                           sentiment_confidence=e.sentiment_confidence)
+            for e in report.entries if e.summary
+        ]
+        insights = [ArticleInsight(article_id=e.article_id, insights=e.insights) for e in report.entries if e.insights]
+        # Headings go before the first article of each section; an empty "new" section is noted in its heading.
+        headings = {}
+        pending = []
+        for heading, entries in report_sections(report):
+            if heading is None:
+                continue
+            pending.append(heading if entries else f"{heading}: no new articles")
+            if entries:
+                headings[entries[0].article_id] = " · ".join(pending)
+                pending = []
+        tmp_name = f".{uuid.uuid4().hex}.tmp"
+        rendered = render_daily_report(
+            articles, summaries, insights, os.path.dirname(path), report.title,
+            filename=tmp_name, generated_at=datetime.fromisoformat(report.generated_at), headings=headings or None,
+        )
+        os.replace(rendered, path)
+
+    @staticmethod
+    def _write(path: str, data: bytes) -> None:
+        # Write-then-rename so a reader never sees a half-written file.
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def _record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+_shared_store: Optional[ReportStore] = None
+_shared_lock = threading.Lock()
+
+
+def get_report_store() -> ReportStore:
+    """Returns the process-wide report store rooted at REPORT_STORE_PATH."""
+    global _shared_store
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = ReportStore(root=os.getenv("REPORT_STORE_PATH", "data/reports"))
+        return _shared_store
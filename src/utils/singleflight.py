@@ -0,0 +1,75 @@
+# src/utils/singleflight.py
+import threading
+import time
+from typing import Any, Callable, Dict, Tuple
+
+
+def coalesce_key(query: str, max_articles: int, incremental: bool = False, carry_forward: bool = True) -> str:
+    """Normalized key for a digest request: case- and whitespace-insensitive query + article count (+ mode)."""
+    key = f"{' '.join(query.lower().split())}|{max_articles}"
+    if incremental:
+        key += "|incremental" if carry_forward else "|incremental-only"
+    return key
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one execution.
+
+    While a call for a key is running, later callers with the same key wait for it and
+    receive the same result (or exception). Successful results are kept for
+    ``result_ttl`` seconds and served to later callers without running fn again.
+    """
+
+    def __init__(self, result_ttl: float = 300):
+        self.result_ttl = result_ttl
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, _Call] = {}
+        self._results: Dict[str, Tuple[float, Any]] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Returns (result, shared); shared is True when the result came from another caller's run."""
+        with self._lock:
+            self._prune()
+            cached = self._results.get(key)
+            if cached:
+                return cached[1], True
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._in_flight[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+                if call.error is None and self.result_ttl > 0:
+                    self._results[key] = (time.monotonic() + self.result_ttl, call.result)
+            call.done.set()
+        return call.result, False
+
+    def forget(self, key: str) -> None:
+        with self._lock:
+            self._results.pop(key, None)
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        for key in [k for k, (expires, _) in self._results.items() if expires <= now]:
+            del self._results[key]
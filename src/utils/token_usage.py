@@ -0,0 +1,44 @@
+# src/utils/token_usage.py
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.tracers.context import register_configure_hook
+
+
+class TokenUsageHandler(BaseCallbackHandler):
+    """Collects prompt/completion token counts reported by chat models during one call."""
+
+    def __init__(self):
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def on_llm_end(self, response, **kwargs: Any) -> None:
+        usage = None
+        for generations in response.generations:
+            for generation in generations:
+                metadata = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if metadata:
+                    self.prompt_tokens += metadata.get("input_tokens", 0)
+                    self.completion_tokens += metadata.get("output_tokens", 0)
+                    usage = metadata
+        if usage is None:
+            token_usage = (response.llm_output or {}).get("token_usage") or {}
+            self.prompt_tokens += token_usage.get("prompt_tokens", 0)
+            self.completion_tokens += token_usage.get("completion_tokens", 0)
+
+
+# Every LangChain run started while this is set gets the handler attached automatically.
+_usage_handler: ContextVar[Optional[TokenUsageHandler]] = ContextVar("digest_token_usage", default=None)
+register_configure_hook(_usage_handler, inheritable=True)
+
+
+@contextmanager
+def capture_token_usage() -> Iterator[TokenUsageHandler]:
+    handler = TokenUsageHandler()
+    token = _usage_handler.set(handler)
+    try:
+        yield handler
+    finally:
+        _usage_handler.reset(token)
@@ -0,0 +1,33 @@
+# src/utils/tokens.py
+import math
+import os
+
+# Context windows (prompt + completion tokens) of the Groq models we use.
+MODEL_CONTEXT_TOKENS = {
+    "llama3-70b-8192": 8192,
+    "llama3-8b-8192": 8192,
+    "gemma2-9b-it": 8192,
+    "mixtral-8x7b-32768": 32768,
+    "llama-3.1-8b-instant": 131072,
+    "llama-3.3-70b-versatile": 131072,
+}
+DEFAULT_CONTEXT_TOKENS = 8192
+# Tokens kept free in every request on top of the prompt and the completion.
+SAFETY_MARGIN_TOKENS = 256
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap local token estimate (~4 characters or ~0.75 words per token, whichever is larger)."""
+    if not text:
+        return 0
+    by_chars = len(text) / 4
+    by_words = len(text.split()) * 4 / 3
+    return int(math.ceil(max(by_chars, by_words)))
+
+
+def context_window(model_name: str) -> int:
+    """Context window for a model; LLM_CONTEXT_TOKENS overrides the built-in table."""
+    override = os.getenv("LLM_CONTEXT_TOKENS")
+    if override:
+        return int(override)
+    return MODEL_CONTEXT_TOKENS.get(model_name, DEFAULT_CONTEXT_TOKENS)
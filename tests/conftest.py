@@ -0,0 +1,72 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def isolated_environment(tmp_path, monkeypatch):
+    """Keeps every persistent store in a temp directory and the caches off."""
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "0")
+    monkeypatch.setenv("PAGE_CACHE_ENABLED", "0")
+    monkeypatch.setenv("CHECKPOINT_PATH", str(tmp_path / "checkpoints.sqlite"))
+    monkeypatch.setenv("BLOB_STORE_PATH", str(tmp_path / "blobs"))
+    monkeypatch.setenv("QUERY_HISTORY_PATH", str(tmp_path / "query_history.sqlite"))
+    monkeypatch.setenv("SIDE_EFFECTS_PATH", str(tmp_path / "side_effects.sqlite"))
+    monkeypatch.setenv("CALENDAR_EVENTS_PATH", str(tmp_path / "calendar_events.sqlite"))
+    monkeypatch.setenv("REPORT_STORE_PATH", str(tmp_path / "reports"))
+    monkeypatch.setenv("GROQ_API_KEY", "test")
+    monkeypatch.setenv("SERPAPI_API_KEY", "test")
+
+
+@pytest.fixture
+def google_api(tmp_path, monkeypatch):
+    """A stub Calendar/Drive API that the agents' shared clients point at, with anonymous credentials."""
+    from benchmarks.stub_server import StubGoogleAPI
+    from src.utils import google_clients
+    with StubGoogleAPI() as api:
+        monkeypatch.setenv("GOOGLE_API_ROOT_URL", api.base_url)
+        monkeypatch.setenv("GOOGLE_TOKEN_PATH", str(tmp_path / "no-token.json"))
+        monkeypatch.setattr(google_clients, "_shared_clients", {})
+        yield api
+
+
+class _FakeCalendar:
+    def create_report_event(self, report_name, generation_time, calendar_id=None):
+        return "event-1"
+
+
+class _FakeDrive:
+    def upload_report(self, file_path, drive_folder_id=None):
+        return "file-1"
+
+
+@pytest.fixture
+def offline_pipeline(monkeypatch):
+    """The compiled graph with fresh stores, inline side effects and fake Calendar/Drive agents.
+
+    Returns a function that sets the curator's articles; pass an LLM-backed summarizer and
+    insight agent with ``orchestrator.set_agent`` before running the pipeline.
+    """
+    from src.pipelines import checkpoints, orchestrator
+    from src.utils import blob_store, llm_gateway, query_history, report_store
+    for name in ("SIDE_EFFECTS_OUTBOX", "CALENDAR_SINK_ENABLED", "DRIVE_UPLOAD_ASYNC", "PDF_RENDER_PROCESSES"):
+        monkeypatch.setenv(name, "0")
+    monkeypatch.setenv("ARTICLE_RETRY_DELAY", "0")
+    monkeypatch.setattr(orchestrator, "_graph", None)
+    monkeypatch.setattr(orchestrator, "_agents", {"calendar": _FakeCalendar(), "drive": _FakeDrive()})
+    monkeypatch.setattr(checkpoints, "_shared_store", None)
+    monkeypatch.setattr(blob_store, "_shared_store", None)
+    monkeypatch.setattr(report_store, "_shared_store", None)
+    monkeypatch.setattr(query_history, "_shared_history", None)
+    monkeypatch.setattr(llm_gateway, "_shared_gateway", None)
+
+    def use_articles(articles):
+        curator = type("FakeCurator", (), {})()
+        curator.fetch_articles = lambda query, max_articles=5, **kwargs: [a.model_copy() for a in articles[:max_articles]]
+        orchestrator.set_agent("curator", curator)
+
+    return use_articles
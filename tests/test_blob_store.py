@@ -0,0 +1,52 @@
+# tests/test_blob_store.py
+import os
+import time
+
+from src.pipelines import checkpoints
+from src.utils import blob_store
+from src.utils.blob_store import BlobStore
+
+
+def _age(store, key, seconds):
+    path = store._path(key)
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+def test_purge_removes_only_blobs_past_the_max_age(tmp_path):
+    store = BlobStore(root=str(tmp_path), max_age_seconds=3600)
+    old, fresh = store.put("old article"), store.put("fresh article")
+    _age(store, old, 7200)
+    store.purge_expired()
+    assert store.get(old) is None and store.get(fresh) == "fresh article"
+
+
+def test_storing_a_text_again_keeps_its_blob(tmp_path):
+    store = BlobStore(root=str(tmp_path), max_age_seconds=3600)
+    key = store.put("reused article")
+    _age(store, key, 7200)
+    assert store.put("reused article") == key
+    store.purge_expired()
+    assert store.get(key) == "reused article"
+
+
+def test_run_store_startup_purges_old_blobs(tmp_path, monkeypatch):
+    monkeypatch.setenv("BLOB_MAX_AGE", "3600")
+    monkeypatch.setattr(blob_store, "_shared_store", None)
+    monkeypatch.setattr(checkpoints, "_shared_store", None)
+    store = blob_store.get_blob_store()
+    key = store.put("old article")
+    _age(store, key, 7200)
+    checkpoints.get_run_store()
+    assert not os.path.exists(store._path(key))
+
+
+def test_blob_store_startup_purges_old_blobs_without_checkpoints(tmp_path, monkeypatch):
+    monkeypatch.setenv("BLOB_MAX_AGE", "3600")
+    monkeypatch.setenv("CHECKPOINTS_ENABLED", "0")
+    monkeypatch.setattr(blob_store, "_shared_store", None)
+    earlier = BlobStore(root=os.environ["BLOB_STORE_PATH"])
+    key = earlier.put("old article")
+    _age(earlier, key, 7200)
+    blob_store.get_blob_store()
+    assert not os.path.exists(earlier._path(key))
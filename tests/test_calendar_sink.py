@@ -0,0 +1,44 @@
+# tests/test_calendar_sink.py
+from datetime import datetime
+
+from src.agents.calendar_agent import CalendarAgent, event_id_for
+from src.pipelines.calendar_sink import CalendarSink
+
+
+def test_an_insert_whose_id_is_taken_counts_as_existing(google_api):
+    agent = CalendarAgent()
+    event_id = event_id_for("report-1")
+    body = agent.report_event("Report", datetime(2026, 10, 17, 9, 0), event_id)
+
+    assert agent.send_events("primary", [("insert", event_id, body)]) == {event_id: "created"}
+    assert agent.send_events("primary", [("insert", event_id, body)]) == {event_id: "exists"}
+    assert len(google_api.events) == 1
+
+
+def test_a_report_sent_again_by_a_fresh_sink_maps_to_its_event(google_api, tmp_path):
+    when = datetime(2026, 10, 17, 9, 0)
+
+    first = CalendarSink(CalendarAgent, str(tmp_path / "a.sqlite"), batch_window=0)
+    event_id = first.submit("primary", "report-1", "Report", when).result(10)
+    # A process without the first one's records (e.g. after losing its database) sends it again
+    second = CalendarSink(CalendarAgent, str(tmp_path / "b.sqlite"), batch_window=0)
+    assert second.submit("primary", "report-1", "Report", when).result(10) == event_id
+    assert len(google_api.events) == 1
+
+
+def test_daily_merge_patches_the_days_event(google_api, tmp_path):
+
+    def submit(sink, report_id, hour):
+        return sink.submit("primary", report_id, f"Report {report_id}", datetime(2026, 10, 17, hour, 0)).result(10)
+
+    sink = CalendarSink(CalendarAgent, str(tmp_path / "a.sqlite"), batch_window=0, merge_daily=True)
+    event_id = submit(sink, "r1", 9)
+    assert submit(sink, "r2", 10) == event_id
+    # A fresh sink finds the day's event taken, reads what it lists and adds to it
+    fresh = CalendarSink(CalendarAgent, str(tmp_path / "b.sqlite"), batch_window=0, merge_daily=True)
+    assert submit(fresh, "r3", 11) == event_id
+
+    [event] = google_api.events.values()
+    assert event["summary"].endswith("(3 reports)")
+    assert sorted(event["extendedProperties"]["private"]) == ["digest_r1", "digest_r2", "digest_r3"]
+    assert "Report r1" in event["description"] and "Report r3" in event["description"]
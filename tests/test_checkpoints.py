@@ -0,0 +1,115 @@
+# tests/test_checkpoints.py
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from benchmarks.fakes import FakeChatModel
+from src.agents.insight_agent import InsightAgent
+from src.agents.summarizer import SummarizerAgent
+from src.models import Article, ArticleResult
+from src.pipelines import checkpoints, orchestrator
+from src.pipelines.checkpoints import map_articles_resumable
+
+
+@pytest.fixture(autouse=True)
+def fresh_run_store(monkeypatch):
+    monkeypatch.setattr(checkpoints, "_shared_store", None)
+    monkeypatch.setenv("ARTICLE_RETRY_DELAY", "0")
+
+
+class FlakyChatModel(FakeChatModel):
+    """FakeChatModel that raises like a failing Groq call: the first ``failures`` calls, and every
+    call whose prompt contains ``fail_matching``."""
+
+    failures: int = 0
+    fail_matching: str = ""
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt = "\n".join(str(m.content) for m in messages)
+        with _FAIL_LOCK:
+            fail = self.failures > 0 or (self.fail_matching and self.fail_matching in prompt)
+            if self.failures > 0:
+                self.failures -= 1
+        if fail:
+            raise RuntimeError("Error code: 503 - service unavailable")
+        return super()._generate(messages, stop, run_manager, **kwargs)
+
+
+_FAIL_LOCK = threading.Lock()
+
+
+def _texts(count):
+    return [
+        Article(title=f"Story {i}", url=f"https://example.com/{i}", source="test",
+                raw_text=f"Researchers announced result number {i} today. " * 20)
+        for i in range(count)
+    ]
+
+
+def _has_insight(result):
+    return result.insight is not None
+
+
+def test_an_agent_that_swallowed_an_llm_error_is_retried_in_place():
+    llm = FlakyChatModel(latency=0, failures=1)
+    agent = InsightAgent(llm=llm)
+
+    [result] = map_articles_resumable(
+        "insights", "run-1", _texts(1), lambda a: ArticleResult(insight=agent.analyze(a)), _has_insight,
+    )
+    assert result.insight is not None
+    assert llm.calls == 1 and llm.failures == 0
+
+
+def test_an_article_that_keeps_failing_is_recorded_for_the_resume(monkeypatch):
+    monkeypatch.setenv("ARTICLE_MAX_ATTEMPTS", "3")
+    llm = FlakyChatModel(latency=0, fail_matching="result number 1 ")
+    agent = InsightAgent(llm=llm)
+    calls = []
+
+    def analyze(article):
+        calls.append(article.id)
+        return ArticleResult(insight=agent.analyze(article))
+
+    articles = _texts(3)
+    results = map_articles_resumable("insights", "run-2", articles, analyze, _has_insight)
+    assert [r.insight is not None for r in results] == [True, False, True]
+    assert calls.count(articles[1].id) == 3
+    store = checkpoints.get_run_store()
+    assert set(store.completed("run-2", "insights")) == {articles[0].id, articles[2].id}
+    assert store.failed_count("run-2") == 1
+
+
+def test_resuming_a_finished_run_retries_its_failed_articles(offline_pipeline, monkeypatch):
+    monkeypatch.setenv("ARTICLE_MAX_ATTEMPTS", "1")
+    llm = FlakyChatModel(latency=0, fail_matching="result number 1 ")
+    orchestrator.set_agent("summarizer", SummarizerAgent(llm=llm))
+    orchestrator.set_agent("insight", InsightAgent(llm=llm))
+    articles = _texts(3)
+    offline_pipeline(articles)
+
+    first = orchestrator.run_digest_pipeline("chips", 3, run_id="run-3")
+    assert len(first["summaries"]) == 2 and len(first["insights"]) == 2
+
+    llm.fail_matching = ""
+    calls_before = llm.calls
+    resumed = orchestrator.run_digest_pipeline("chips", 3, run_id="run-3")
+    assert sorted(s.article_id for s in resumed["summaries"]) == sorted(a.id for a in articles)
+    assert sorted(i.article_id for i in resumed["insights"]) == sorted(a.id for a in articles)
+    # Only the failed article called the LLM again (one combined summary, one insight)
+    assert llm.calls - calls_before == 2
+    assert checkpoints.get_run_store().failed_count("run-3") == 0
+
+
+def test_run_report_carries_the_checkpoint_run_id(monkeypatch):
+    class FakeGraph:
+        def get_state(self, config):
+            return SimpleNamespace(values={}, next=())
+
+        def invoke(self, graph_input, config):
+            return {"query": graph_input.query}
+
+    monkeypatch.setattr(orchestrator, "_graph", FakeGraph())
+    final_state = orchestrator.run_digest_pipeline("chips", 1, run_id="run-abc")
+    assert final_state["run_report"]["run_id"] == "run-abc"
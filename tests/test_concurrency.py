@@ -0,0 +1,92 @@
+# tests/test_concurrency.py
+import math
+import threading
+import time
+
+import pytest
+
+from benchmarks.fakes import FakeChatModel
+from src.agents.summarizer import SummarizerAgent
+from src.agents.insight_agent import InsightAgent
+from src.models import Article
+from src.pipelines import orchestrator
+from src.utils import llm_gateway
+from src.utils.concurrency import map_concurrently
+
+LATENCY = 0.2
+
+
+def _assert_waves(elapsed, calls, workers):
+    """N calls of LATENCY on W workers take ceil(N/W) waves, well short of one more wave."""
+    waves = math.ceil(calls / workers)
+    assert waves * LATENCY <= elapsed < (waves + 0.75) * LATENCY
+
+
+@pytest.mark.parametrize("calls, workers", [(8, 4), (10, 4), (6, 6)])
+def test_fake_llm_calls_fan_out_in_waves_and_keep_their_order(calls, workers):
+    llm = FakeChatModel(latency=LATENCY)
+    start = time.perf_counter()
+    results = map_concurrently(lambda i: (i, llm.invoke(f"Question {i}").content), range(calls), max_workers=workers)
+    _assert_waves(time.perf_counter() - start, calls, workers)
+    assert [i for i, _ in results] == list(range(calls))
+    assert llm.calls == calls
+
+
+def test_results_keep_input_order_when_later_items_finish_first():
+    def slow_first(i):
+        time.sleep(0.05 * (4 - i))
+        return i
+
+    assert map_concurrently(slow_first, range(5), max_workers=5) == [0, 1, 2, 3, 4]
+
+
+def test_combined_summaries_fan_out_one_call_per_article(monkeypatch):
+    monkeypatch.setattr(llm_gateway, "_shared_gateway", None)
+    llm = FakeChatModel(latency=LATENCY)
+    summarizer = SummarizerAgent(llm=llm)
+    articles = [
+        Article(title=f"Story {i}", url=f"https://example.com/{i}", source="test",
+                raw_text=f"Researchers announced result number {i} today. " * 20)
+        for i in range(8)
+    ]
+    start = time.perf_counter()
+    results = map_concurrently(summarizer.summarize_combined, articles, max_workers=4)
+    _assert_waves(time.perf_counter() - start, len(articles), 4)
+    assert [summary.article_id for summary, _ in results] == [a.id for a in articles]
+    assert llm.calls == len(articles)
+
+
+def test_insights_and_summarizer_nodes_run_at_the_same_time(offline_pipeline):
+    llm = FakeChatModel(latency=LATENCY)
+    spans, lock = {}, threading.Lock()
+
+    def busy(name, fn):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with lock:
+                    first, last = spans.get(name, (start, start))
+                    spans[name] = (min(first, start), max(last, time.perf_counter()))
+        return wrapper
+
+    summarizer, insight = SummarizerAgent(llm=llm), InsightAgent(llm=llm)
+    summarizer.combined_insights = False
+    summarizer.summarize_combined = busy("summarizer", summarizer.summarize_combined)
+    insight.analyze = busy("insights", insight.analyze)
+    orchestrator.set_agent("summarizer", summarizer)
+    orchestrator.set_agent("insight", insight)
+    offline_pipeline([
+        Article(title=f"Story {i}", url=f"https://example.com/{i}", source="test",
+                raw_text=f"Researchers announced result number {i} today. " * 20)
+        for i in range(4)
+    ])
+
+    state = orchestrator.get_graph().invoke(
+        orchestrator._initial_state("chips", 4, llm_workers=2), {"configurable": {"thread_id": "fanout"}}
+    )
+    assert len(state["summaries"]) == 4 and len(state["insights"]) == 4
+    (s_start, s_end), (i_start, i_end) = spans["summarizer"], spans["insights"]
+    # Each branch needs two waves of calls; run one after the other, they would not overlap at all
+    assert min(s_end, i_end) - max(s_start, i_start) >= 1.5 * LATENCY
@@ -0,0 +1,68 @@
+# tests/test_context_budget.py
+from benchmarks.fakes import FakeChatModel
+from src.agents.summarizer import SummarizerAgent
+from src.utils.context_budget import GAP_MARKER, ContextBudgeter
+from src.utils.tokens import estimate_tokens
+
+
+def _article_text(paragraphs):
+    lead = "Regulators fined the chipmaker over export violations on Tuesday."
+    body = [
+        f"Paragraph {i} covers the chipmaker export case and the fine in more detail. "
+        f"Analysts expect the regulators to review further chipmaker licenses."
+        for i in range(paragraphs)
+    ]
+    return "\n\n".join([lead] + body)
+
+
+def test_text_within_the_budget_is_unchanged():
+    text = _article_text(3)
+    result = ContextBudgeter().fit(text, budget=10_000)
+    assert result.text == text and not result.trimmed
+
+
+def test_trimmed_text_fits_the_budget_and_keeps_the_lead_in_order():
+    text = _article_text(200)
+    result = ContextBudgeter().fit(text, budget=300)
+    assert result.trimmed and estimate_tokens(result.text) <= 300
+    assert result.text.startswith("Regulators fined the chipmaker")
+    kept = [s for s in result.text.replace(GAP_MARKER, "").split("\n\n") if s.strip().startswith("Paragraph")]
+    numbers = [int(s.split()[1]) for s in kept]
+    assert numbers == sorted(numbers)
+
+
+def test_max_tokens_caps_the_budget():
+    result = ContextBudgeter(max_tokens=100, strategy="lead").fit(_article_text(50), budget=10_000)
+    assert estimate_tokens(result.text) <= 100
+
+
+def _summarizer(monkeypatch, **env):
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    llm = FakeChatModel(latency=0.0)
+    agent = SummarizerAgent(llm=llm)
+    sent = []
+    agent._summarize_text = lambda text: sent.append(text) or "A one-sentence summary."
+    return agent, sent
+
+
+def test_summarizer_sends_articles_that_fit_the_model_whole(monkeypatch):
+    agent, sent = _summarizer(monkeypatch)
+    text = _article_text(120)  # several thousand tokens, within the model's input budget
+    assert 3000 < estimate_tokens(text) <= agent.input_budget
+    agent._smart_summarize(agent._fit(text, agent.input_budget, "a1"))
+    assert sent == [text]
+
+
+def test_summarizer_map_reduces_long_articles_by_default(monkeypatch):
+    agent, sent = _summarizer(monkeypatch)
+    text = _article_text(400)
+    assert estimate_tokens(text) > agent.input_budget
+    agent._smart_summarize(agent._fit(text, agent.input_budget, "a1"))
+    assert len(sent) > 1  # one request per chunk
+
+
+def test_summarizer_trims_long_articles_when_asked(monkeypatch):
+    agent, sent = _summarizer(monkeypatch, SUMMARIZER_LONG_ARTICLES="trim")
+    agent._smart_summarize(agent._fit(_article_text(400), agent.input_budget, "a1"))
+    assert len(sent) == 1 and estimate_tokens(sent[0]) <= agent.input_budget
@@ -0,0 +1,45 @@
+# tests/test_curator.py
+import threading
+import time
+
+from src.agents.curator import CuratorAgent
+from src.models import Article
+
+
+def _candidates(count):
+    return [
+        {"item": {}, "url": f"https://site{i}.example/story", "title": f"Story {i}"}
+        for i in range(count)
+    ]
+
+
+def _agent(fetch_one, timeout_budget=0.3):
+    agent = CuratorAgent(max_workers=4, per_host_limit=2, timeout_budget=timeout_budget)
+    agent._fetch_one = fetch_one
+    return agent
+
+
+def test_timeout_keeps_finished_downloads_after_a_slow_first_candidate():
+    release = threading.Event()
+
+    def fetch_one(candidate, skip_hashes=()):
+        if candidate["title"] == "Story 0":
+            release.wait(5)
+            return None
+        return Article(title=candidate["title"], url=candidate["url"], source="test", raw_text="x" * 100)
+
+    try:
+        articles = _agent(fetch_one)._fetch_concurrent(_candidates(4), max_articles=3)
+    finally:
+        release.set()
+    assert [a.title for a in articles] == ["Story 1", "Story 2", "Story 3"]
+
+
+def test_early_stop_accepts_articles_in_serpapi_order():
+    def fetch_one(candidate, skip_hashes=()):
+        # Later candidates finish first
+        time.sleep(0.05 * (4 - int(candidate["title"].split()[1])))
+        return Article(title=candidate["title"], url=candidate["url"], source="test", raw_text="x" * 100)
+
+    articles = _agent(fetch_one, timeout_budget=10)._fetch_concurrent(_candidates(4), max_articles=2)
+    assert [a.title for a in articles] == ["Story 0", "Story 1"]
@@ -0,0 +1,36 @@
+# tests/test_google_clients.py
+import os
+import time
+
+from benchmarks.bench_google import write_token
+from benchmarks.stub_server import StubGoogleAPI
+from src.utils.google_clients import GoogleClients
+
+
+def test_an_expiring_token_is_refreshed_once_and_saved(tmp_path):
+    with StubGoogleAPI() as api:
+        token_path = str(tmp_path / "token.json")
+        write_token(token_path, token="old", token_uri=api.token_uri, expires_in=60)
+        clients = GoogleClients(token_path=token_path, refresh_margin=300, root_url=api.base_url)
+
+        assert clients.credentials().token == "stub-token-1"
+        assert clients.credentials().token == "stub-token-1"
+        assert (clients.refreshes, api.token_refreshes) == (1, 1)
+        # Saved, so the next process starts from the refreshed token
+        assert GoogleClients(token_path=token_path, root_url=api.base_url).credentials().token == "stub-token-1"
+
+
+def test_a_token_rewritten_by_another_process_is_reloaded(tmp_path):
+    with StubGoogleAPI() as api:
+        token_path = str(tmp_path / "token.json")
+        write_token(token_path, token="first", token_uri=api.token_uri)
+        clients = GoogleClients(token_path=token_path, root_url=api.base_url)
+        clients.service("drive", "v3")
+
+        write_token(token_path, token="second", token_uri=api.token_uri)
+        later = time.time() + 10
+        os.utime(token_path, (later, later))
+        assert clients.credentials().token == "second"
+        clients.service("drive", "v3")
+        assert clients.stats() == {"refreshes": 0, "service_builds": 2}
+        assert api.token_refreshes == 0
@@ -0,0 +1,152 @@
+# tests/test_jobs.py
+import threading
+import time
+
+import pytest
+
+from src.pipelines.checkpoints import RunStore
+from src.pipelines.jobs import DigestJobManager, JobQueueFull
+from src.utils.dedup import current_dedup_index
+
+
+class SlowEnqueueManager(DigestJobManager):
+    """Widens the gap between the capacity check and queueing, where concurrent resumes used to race."""
+
+    def _enqueue(self, job, pending, context=None):
+        time.sleep(0.05)
+        return super()._enqueue(job, pending, context)
+
+
+def _manager(runner):
+    return SlowEnqueueManager(runner=runner, serialize=lambda state, query: state, max_workers=4, max_queue=4)
+
+
+def _wait_done(job):
+    while not job.done:
+        job.wait_for_events(len(job.events), timeout=1)
+
+
+def test_a_rebuilt_job_keeps_its_mode_options():
+    seen = {}
+    done = threading.Event()
+
+    def runner(query, max_articles, on_progress, run_id, incremental, carry_forward):
+        seen.update(incremental=incremental, carry_forward=carry_forward)
+        done.set()
+        return {}
+
+    job = _manager(runner).resume("job-1", "chips", 3, incremental=True, carry_forward=False)
+    assert done.wait(5)
+    assert (job.incremental, job.carry_forward) == (True, False)
+    assert seen == {"incremental": True, "carry_forward": False}
+
+
+def test_concurrent_resumes_run_a_failed_job_once():
+    calls = []
+    release = threading.Event()
+
+    def runner(query, max_articles, on_progress, run_id, incremental, carry_forward):
+        calls.append(run_id)
+        release.wait(5)
+        return {}
+
+    manager = _manager(runner)
+    job = manager.resume("job-2", "chips", 3)
+    release.set()
+    _wait_done(job)
+    job.set_status("failed")
+    release.clear()
+
+    barrier = threading.Barrier(8)
+
+    def resume():
+        barrier.wait()
+        manager.resume("job-2", "chips", 3)
+
+    threads = [threading.Thread(target=resume) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    release.set()
+    _wait_done(job)
+    assert calls == ["job-2", "job-2"]
+
+
+def test_a_batch_queues_one_job_per_query_sharing_one_dedup_index():
+    indexes = {}
+
+    def runner(query, max_articles, on_progress, run_id, incremental, carry_forward):
+        indexes[query] = current_dedup_index()
+        return {"query": query}
+
+    batch_id, jobs = _manager(runner).submit_batch(["chips", "climate", "Chips "], 3, batch_id="b1")
+    assert batch_id == "b1"
+    assert [query for query, _ in jobs] == ["chips", "climate", "Chips "]
+    assert jobs[0][1] is jobs[2][1]
+    for _, job in jobs:
+        _wait_done(job)
+    assert sorted(indexes) == ["chips", "climate"]
+    assert indexes["chips"] is not None and indexes["chips"] is indexes["climate"]
+
+
+def test_a_batch_that_does_not_fit_the_queue_is_refused_whole():
+    release = threading.Event()
+
+    def runner(query, max_articles, on_progress, run_id, incremental, carry_forward):
+        release.wait(5)
+        return {}
+
+    manager = _manager(runner)
+    manager.submit_batch([f"topic {i}" for i in range(6)], 3)
+    with pytest.raises(JobQueueFull):
+        manager.submit_batch(["a", "b", "c"], 3)
+    _, jobs = manager.submit_batch(["a", "b"], 3)
+    release.set()
+    for _, job in jobs:
+        _wait_done(job)
+
+
+def test_resubmitting_a_batch_reruns_only_its_failed_jobs():
+    calls = []
+
+    def runner(query, max_articles, on_progress, run_id, incremental, carry_forward):
+        calls.append(query)
+        if query == "climate" and calls.count(query) == 1:
+            raise RuntimeError("search failed")
+        return {}
+
+    manager = _manager(runner)
+    _, first = manager.submit_batch(["chips", "climate"], 3, batch_id="b2")
+    for _, job in first:
+        _wait_done(job)
+    assert [job.status for _, job in first] == ["completed", "failed"]
+
+    _, second = manager.submit_batch(["chips", "climate"], 3, batch_id="b2")
+    for _, job in second:
+        _wait_done(job)
+    assert [job.id for _, job in second] == [job.id for _, job in first]
+    assert [job.status for _, job in manager.get_batch("b2")] == ["completed", "completed"]
+    assert sorted(calls) == ["chips", "climate", "climate"]
+
+
+def test_run_store_records_mode_options(tmp_path):
+    store = RunStore(str(tmp_path / "runs.sqlite"))
+    store.register_run("run-1", "chips", 3, incremental=True, carry_forward=False)
+    run = store.get_run("run-1")
+    assert (run["incremental"], run["carry_forward"]) == (True, False)
+
+
+def test_run_store_adds_option_columns_to_an_old_database(tmp_path):
+    import sqlite3
+    path = str(tmp_path / "old.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE digest_runs (run_id TEXT PRIMARY KEY, query TEXT NOT NULL, "
+        "max_articles INTEGER NOT NULL, created_at REAL NOT NULL)"
+    )
+    conn.execute("INSERT INTO digest_runs VALUES ('old', 'chips', 3, 0)")
+    conn.commit()
+    conn.close()
+    run = RunStore(path, max_age_seconds=0).get_run("old")
+    assert run["incremental"] is None and run["carry_forward"] is None
@@ -0,0 +1,68 @@
+# tests/test_llm_gateway.py
+import itertools
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.utils.llm_gateway import LLMGateway, is_rate_limit_error
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+def test_bimodal_latency_does_not_collapse_the_limit():
+    gateway = LLMGateway(max_concurrency=8)
+    # Short JSON calls next to long summary calls, as the summarizer and insight nodes make them
+    for latency in itertools.islice(itertools.cycle([0.05, 2.0, 0.05, 0.05, 3.5]), 500):
+        gateway._on_success(latency)
+    assert gateway.limit == 8
+
+
+def test_bimodal_calls_keep_running_in_parallel():
+    gateway = LLMGateway(max_concurrency=4)
+    delays = itertools.cycle([0.001, 0.03])
+
+    def call(_):
+        delay = next(delays)
+        return gateway.invoke(lambda: time.sleep(delay))
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(call, range(80)))
+    assert gateway.stats()["concurrency_limit"] == 4
+
+
+def test_rate_limits_halve_the_limit_and_successes_grow_it_back():
+    gateway = LLMGateway(max_concurrency=8, base_backoff=0.001, max_backoff=0.001)
+    responses = iter([RateLimited("429 Too Many Requests"), RateLimited("429 Too Many Requests")])
+
+    def call():
+        error = next(responses, None)
+        if error:
+            raise error
+        return "ok"
+
+    assert gateway.invoke(call) == "ok"
+    assert gateway.throttled == 2
+    assert gateway.limit == pytest.approx(2 + 1 / 2)
+    for _ in range(50):
+        gateway._on_success(0.1)
+    assert gateway.limit == 8
+
+
+def test_rate_limits_are_recognized_by_status_code_not_message():
+    import httpx
+    from groq import RateLimitError
+
+    response = httpx.Response(429, request=httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions"))
+    assert is_rate_limit_error(RateLimitError("slow down", response=response, body=None))
+    assert is_rate_limit_error(RateLimited("anything"))
+    try:
+        try:
+            raise RateLimited("inner")
+        except RateLimited as e:
+            raise RuntimeError("LLM call failed") from e
+    except RuntimeError as wrapped:
+        assert is_rate_limit_error(wrapped)
+    assert not is_rate_limit_error(RuntimeError("article 4291 failed: rate limit of the parser exceeded"))
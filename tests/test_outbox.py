@@ -0,0 +1,110 @@
+# tests/test_outbox.py
+import threading
+import time
+
+import pytest
+
+from src.pipelines import calendar_sink, orchestrator, uploads
+from src.pipelines import outbox as outbox_module
+from src.pipelines.calendar_sink import CalendarSink
+from src.pipelines.outbox import SideEffectOutbox
+
+
+def test_long_running_effect_keeps_its_lease(tmp_path):
+    runs = []
+
+    def slow(payload, progress):
+        runs.append(threading.current_thread().name)
+        time.sleep(1.0)  # several leases long, with no progress() calls
+        return "done"
+
+    box = SideEffectOutbox(str(tmp_path / "outbox.sqlite"), {"slow": slow}, workers=3, lease=0.3, poll_interval=0.05)
+    effect_id = box.enqueue("slow", "one", {})
+    assert box.drain(timeout=10)
+    assert len(runs) == 1
+    assert box.get(effect_id)["status"] == "done"
+
+
+def test_failed_effect_is_retried_then_marked_failed(tmp_path):
+    def broken(payload, progress):
+        raise RuntimeError("calendar unavailable")
+
+    box = SideEffectOutbox(str(tmp_path / "outbox.sqlite"), {"k": broken}, workers=1, max_attempts=2, backoff=0.01)
+    effect_id = box.enqueue("k", "key", {})
+    assert box.enqueue("k", "key", {}) == effect_id
+    box.drain(timeout=10)
+    effect = box.get(effect_id)
+    assert (effect["status"], effect["attempts"], effect["error"]) == ("failed", 2, "calendar unavailable")
+    assert box.retry(effect_id) and not box.retry(effect_id)
+
+
+class _StuckSink(CalendarSink):
+    """A sink whose batches never come back, so no event future is ever settled."""
+
+    def _flush(self, batch):
+        pass
+
+
+def test_a_calendar_effect_stuck_on_the_sink_times_out_and_is_retried(tmp_path, monkeypatch):
+    sink = _StuckSink(lambda: None, str(tmp_path / "events.sqlite"), batch_window=0, timeout=0.2)
+    monkeypatch.setattr(calendar_sink, "_shared_sink", sink)
+    monkeypatch.setenv("CALENDAR_SINK_ENABLED", "1")
+    box = SideEffectOutbox(
+        str(tmp_path / "outbox.sqlite"), {"calendar": outbox_module._calendar_effect},
+        workers=1, max_attempts=2, backoff=0.01, lease=0.3, poll_interval=0.05,
+    )
+    effect_id = box.enqueue("calendar", "primary|r1", {
+        "calendar_id": "primary", "report_id": "r1", "report_name": "r1.pdf", "generation_time": "2026-10-17T09:00:00",
+    })
+    assert box.drain(timeout=10)
+    effect = box.get(effect_id)
+    assert (effect["status"], effect["attempts"]) == ("failed", 2)
+    assert "not settled" in effect["error"]
+
+
+class _FakeDrive:
+    def __init__(self):
+        self.batched_creates = []
+        self.uploads = []
+
+    def create_files(self, files):
+        self.batched_creates.append(len(files))
+        return [f"file-{i}" for i in range(len(files))]
+
+    def upload_content(self, file_id, path):
+        self.uploads.append(file_id)
+        return file_id
+
+    def upload_report(self, path, folder_id=None):
+        self.uploads.append("direct")
+        return "file-direct"
+
+
+@pytest.fixture
+def fake_drive(monkeypatch):
+    drive = _FakeDrive()
+    monkeypatch.setitem(orchestrator._agents, "drive", drive)
+    monkeypatch.setattr(uploads, "_shared_queue", None)
+    monkeypatch.setenv("DRIVE_BATCH_WINDOW", "0.3")
+    return drive
+
+
+def test_drive_effects_go_through_the_batching_upload_queue(tmp_path, fake_drive):
+    reports = []
+    for i in range(3):
+        path = tmp_path / f"report-{i}.pdf"
+        path.write_bytes(b"%PDF-1.4 test")
+        reports.append(str(path))
+    box = SideEffectOutbox(
+        str(tmp_path / "outbox.sqlite"), {"drive": outbox_module._drive_effect}, workers=3, poll_interval=0.05
+    )
+    ids = [box.enqueue("drive", path, {"report_path": path, "folder_id": None}) for path in reports]
+    assert box.drain(timeout=10)
+
+    assert fake_drive.batched_creates == [3]
+    queue = uploads.get_upload_queue()
+    for effect_id in ids:
+        effect = box.get(effect_id)
+        assert effect["status"] == "done"
+        assert queue.get(effect["payload"]["upload_id"]).status == "completed"
+        assert effect["result"] == effect["payload"]["file_id"]
@@ -0,0 +1,31 @@
+# tests/test_pdf_generator.py
+import re
+
+import pytest
+from reportlab.platypus import LayoutError, Spacer
+
+from src.models import Article, ArticleInsight, ArticleSummary
+from src.utils.pdf_generator import _FrameWriter, generate_daily_report
+
+
+def _page_count(path):
+    with open(path, "rb") as f:
+        return len(re.findall(rb"/Type /Page\b", f.read()))
+
+
+def test_articles_from_a_generator_are_laid_out_across_pages(tmp_path):
+    def articles():
+        for i in range(3):
+            yield Article(id=f"a{i}", title=f"Story {i}", url=f"https://example.com/{i}", source="test")
+
+    # A summary longer than a page has to be split across frames
+    summaries = [ArticleSummary(article_id="a1", summary="Results were announced today. " * 600, sentiment="neutral")]
+    insights = [ArticleInsight(article_id="a2", insights=["Watch the follow-up work."])]
+    path = generate_daily_report(articles(), summaries, insights, output_dir=str(tmp_path), filename="r.pdf")
+    assert _page_count(path) >= 3
+
+
+def test_a_flowable_taller_than_a_page_is_an_error(tmp_path):
+    writer = _FrameWriter(str(tmp_path / "r.pdf"))
+    with pytest.raises(LayoutError):
+        writer.add(Spacer(1, 2000))
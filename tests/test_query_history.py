@@ -0,0 +1,29 @@
+# tests/test_query_history.py
+from src.models import Article, ArticleSummary
+from src.utils.query_history import QueryHistory, content_hash
+
+
+def _article(n):
+    return Article(title=f"Story {n}", url=f"https://news.example/{n}", source="Example",
+                   content_hash=content_hash(f"text {n}"))
+
+
+def test_articles_whose_summary_failed_are_not_covered(tmp_path):
+    history = QueryHistory(str(tmp_path / "history.sqlite"))
+    covered, failed = _article(1), _article(2)
+    summary = ArticleSummary(article_id=covered.id, summary="Chips are fast.", sentiment="positive")
+    history.record("AI chips", [covered, failed], [summary], [])
+
+    urls, hashes = history.seen("ai  CHIPS")
+    assert urls == {covered.url}
+    assert hashes == {covered.content_hash}
+    assert [entry.url for entry in history.previous("AI chips", 5)] == [covered.url]
+
+
+def test_rows_without_a_summary_from_older_versions_are_retried(tmp_path):
+    history = QueryHistory(str(tmp_path / "history.sqlite"))
+    history._conn.execute(
+        "INSERT INTO seen_articles (query_key, url, content_hash, article, first_seen, last_seen) "
+        "VALUES ('ai chips', 'https://news.example/3', 'h', '{}', 0, 1e12)"
+    )
+    assert history.seen("AI chips") == (set(), set())
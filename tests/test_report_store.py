@@ -0,0 +1,42 @@
+# tests/test_report_store.py
+from src.models import Article, ArticleInsight, ArticleSummary
+from src.utils.report_store import ReportStore, build_report, report_id
+
+
+def _digest(summary="Chip export rules were tightened.", url="https://example.com/chips?utm_source=feed"):
+    # A fresh Article gets a new random id, as it does on every pipeline run
+    article = Article(title="Chip rules", url=url, source="Wire", content_hash="abc123", relevance_score=1.0)
+    return build_report(
+        "chips",
+        [article],
+        [ArticleSummary(article_id=article.id, summary=summary, sentiment="neutral")],
+        [ArticleInsight(article_id=article.id, insights=["Review export licenses"])],
+    )
+
+
+def test_rebuilding_the_same_content_gives_the_same_report_id():
+    first, second = _digest(), _digest()
+    assert first.entries[0].article_id != second.entries[0].article_id
+    assert report_id(first) == report_id(second)
+
+
+def test_tracking_parameters_do_not_change_the_report_id():
+    assert report_id(_digest(url="https://example.com/chips")) == report_id(_digest())
+
+
+def test_different_content_gives_a_different_report_id():
+    assert report_id(_digest()) != report_id(_digest(summary="Chip export rules were loosened."))
+
+
+def test_saving_the_same_content_again_refreshes_the_generation_date(tmp_path):
+    store = ReportStore(root=str(tmp_path))
+    first = _digest().model_copy(update={"generated_at": "2026-01-05T09:00:00"})
+    rid = store.save(first)
+    with open(store.path(rid, "md"), encoding="utf-8") as f:
+        assert "2026-01-05 09:00" in f.read()
+
+    rerun = _digest().model_copy(update={"generated_at": "2026-01-06T09:30:00"})
+    assert store.save(rerun) == rid
+    assert store.load(rid).generated_at == "2026-01-06T09:30:00"
+    with open(store.path(rid, "md"), encoding="utf-8") as f:
+        assert "2026-01-06 09:30" in f.read()
@@ -0,0 +1,47 @@
+# tests/test_uploads.py
+import os
+
+import pytest
+
+from src.agents.drive_upload import DriveUploadAgent
+from src.pipelines.uploads import DriveUploadQueue
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    monkeypatch.setenv("DRIVE_UPLOAD_CHUNK_SIZE", str(256 * 1024))
+    monkeypatch.setenv("DRIVE_UPLOAD_BACKOFF", "0")
+
+
+def _report(tmp_path, name, size):
+    path = tmp_path / name
+    path.write_bytes(os.urandom(size))
+    return str(path)
+
+
+def test_a_resumable_upload_resumes_after_failed_chunks(google_api, tmp_path):
+    google_api.fail_chunks = 2
+    path = _report(tmp_path, "report.pdf", 640 * 1024)
+
+    file_id = DriveUploadAgent().upload_report(path)
+    with open(path, "rb") as f:
+        assert google_api.files[file_id] == f.read()
+    assert google_api.fail_chunks == 0
+
+
+def test_a_failed_queued_upload_is_retried_into_the_file_it_created(google_api, tmp_path, monkeypatch):
+    monkeypatch.setenv("DRIVE_UPLOAD_MAX_ATTEMPTS", "2")
+    google_api.fail_chunks = 2
+    paths = [_report(tmp_path, f"report{i}.pdf", 300 * 1024) for i in range(2)]
+    queue = DriveUploadQueue(agent=DriveUploadAgent, workers=1, batch_window=0.5)
+
+    tasks = [queue.submit(path) for path in paths]
+    assert queue.drain(timeout=30)
+    assert google_api.batches == 1 and all(task.file_id for task in tasks)
+    [failed] = [task for task in tasks if task.status == "failed"]
+
+    retry = queue.submit(failed.report_path)
+    assert retry.wait(30) and retry.status == "completed"
+    assert retry.file_id == failed.file_id
+    with open(failed.report_path, "rb") as f:
+        assert google_api.files[retry.file_id] == f.read()